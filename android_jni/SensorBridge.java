@@ -22,6 +22,20 @@ import java.util.Map;
 
 public class SensorBridge implements NfcAdapter.ReaderCallback {
     
+    /**
+     * Receives every health reading as soon as its tag is read
+     * (called on the NFC reader thread)
+     */
+    public interface TagListener {
+        void onHealthReading(long timestampMillis, float[] sensorData);
+        
+        /**
+         * A tag carrying several readings (e.g. its sample log), as
+         * RECORD_STRIDE doubles per reading: epoch seconds, temp, pH, glucose
+         */
+        void onHealthRecords(double[] records);
+    }
+    
     static {
         // Load native library
         System.loadLibrary("sensor_nhs3152");
@@ -34,9 +48,13 @@ public class SensorBridge implements NfcAdapter.ReaderCallback {
     private boolean isReading = false;
     private Tag currentTag = null;
     private float[] lastSensorData = null;
+    private volatile TagListener tagListener = null;
     
     private static final String TAG = "SensorBridge";
     
+    // Doubles per reading returned by parseHealthRecords()
+    public static final int RECORD_STRIDE = 4;
+    
     // NFC constants
     private static final int NFC_READER_MODE = NfcAdapter.FLAG_READER_NFC_A | 
                                                 NfcAdapter.FLAG_READER_NFC_B |
@@ -139,6 +157,13 @@ public class SensorBridge implements NfcAdapter.ReaderCallback {
         return lastSensorData;
     }
     
+    /**
+     * Push tag reads to a listener (null to stop)
+     */
+    public void setTagListener(TagListener listener) {
+        tagListener = listener;
+    }
+    
     /**
      * Update sensor configuration
      */
@@ -221,11 +246,34 @@ public class SensorBridge implements NfcAdapter.ReaderCallback {
         return null;
     }
     
+    /**
+     * Parse every health record ('H' readings and 'L' sample logs) of a
+     * serialized NDEF message in one native call. Returns RECORD_STRIDE
+     * doubles per reading, or null if the message is malformed
+     */
+    public double[] parseHealthRecords(byte[] ndefMessage, long discoveredAtMillis) {
+        try {
+            double[] records = nativeParseHealthRecords(ndefMessage, discoveredAtMillis);
+            if (records != null && records.length >= RECORD_STRIDE) {
+                int last = records.length - RECORD_STRIDE;
+                lastSensorData = new float[] {
+                    (float) records[last + 1], (float) records[last + 2], (float) records[last + 3]
+                };
+            }
+            return records;
+        } catch (Exception e) {
+            Log.e(TAG, "Error parsing health records: " + e.getMessage());
+            return null;
+        }
+    }
+    
     /**
      * NFC Reader Callback - called when NFC tag is detected
      */
     @Override
     public void onTagDiscovered(Tag tag) {
+        // Stamp the reading with when the tag was seen, not when it is consumed
+        long discoveredAt = System.currentTimeMillis();
         currentTag = tag;
         Log.i(TAG, "NFC tag discovered");
         
@@ -237,6 +285,19 @@ public class SensorBridge implements NfcAdapter.ReaderCallback {
                 NdefMessage ndefMessage = ndef.getNdefMessage();
                 
                 if (ndefMessage != null) {
+                    // Logged tags hold many readings: decode them all in one
+                    // native pass and hand them over as a single array
+                    double[] logged = parseHealthRecords(ndefMessage.toByteArray(), discoveredAt);
+                    if (logged != null && logged.length > RECORD_STRIDE) {
+                        Log.i(TAG, "Read " + (logged.length / RECORD_STRIDE) + " logged readings");
+                        TagListener listener = tagListener;
+                        if (listener != null) {
+                            listener.onHealthRecords(logged);
+                        }
+                        ndef.close();
+                        return;
+                    }
+                    
                     NdefRecord[] records = ndefMessage.getRecords();
                     
                     for (NdefRecord record : records) {
@@ -253,6 +314,10 @@ public class SensorBridge implements NfcAdapter.ReaderCallback {
                                     "Sensor Data - Temp: %.1f°C, pH: %.2f, Glucose: %.0f",
                                     sensorData[0], sensorData[1], sensorData[2]
                                 ));
+                                TagListener listener = tagListener;
+                                if (listener != null) {
+                                    listener.onHealthReading(discoveredAt, sensorData);
+                                }
                             }
                             break;
                         }
@@ -313,4 +378,5 @@ public class SensorBridge implements NfcAdapter.ReaderCallback {
     private native boolean nativeTestConnection();
     private native String nativeFirmwareVersion();
     private native boolean nativeSetNFCData(byte[] nfcData);
+    private native double[] nativeParseHealthRecords(byte[] ndefMessage, long discoveredAtMillis);
 }
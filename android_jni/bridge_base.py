@@ -0,0 +1,72 @@
+"""
+Shared plumbing for off-device NFC bridges
+Listener registration, the emitting thread and the SensorBridge.java
+stubs; subclasses only provide `_run`, the loop producing readings
+"""
+
+import threading
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+class BaseSensorBridge:
+    """Push interface of the JNI SensorBridge, fed by a background thread"""
+
+    THREAD_NAME = 'nfc-bridge'
+    FIRMWARE_VERSION = 'NFC Bridge'
+
+    def __init__(self):
+        self.temp_offset = 0.0
+        self.connected = False
+        self.events_emitted = 0
+        self.readings_emitted = 0
+        self._listener = None
+        self._records_listener = None
+        self._last_reading = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def set_listener(self, listener: Optional[Callable[[float, List[float]], None]]) -> None:
+        """Register `listener(epoch_seconds, [temperature, ph, glucose])` for single readings"""
+        self._listener = listener
+
+    def set_records_listener(self, listener: Optional[Callable[[Sequence[float]], None]]) -> None:
+        """Register `listener(records)` for batches: flat (epoch, temperature, ph, glucose) records"""
+        self._records_listener = listener
+
+    def connect(self, config: Dict) -> bool:
+        """Start (or resume) emitting readings"""
+        self.temp_offset = float(config.get('temp_offset', 0.0))
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.THREAD_NAME, daemon=True)
+            self._thread.start()
+        self.connected = True
+        return True
+
+    def disconnect(self) -> None:
+        """Stop emitting readings"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.connected = False
+
+    def getSensorReading(self) -> Optional[List[float]]:
+        return self._last_reading
+
+    def updateConfig(self, config: Dict) -> bool:
+        self.temp_offset = float(config.get('temp_offset', self.temp_offset))
+        return True
+
+    def calibrate(self) -> bool:
+        return self.connected
+
+    def testConnection(self) -> bool:
+        return self.connected
+
+    def getFirmwareVersion(self) -> str:
+        return self.FIRMWARE_VERSION if self.connected else "NFC Not Connected"
+
+    def _run(self) -> None:
+        """Emit readings until `_stop` is set"""
+        raise NotImplementedError
@@ -0,0 +1,80 @@
+"""
+Mock NFC bridge for off-device testing
+Emits tag-discovery events from a background thread at a configurable rate,
+mirroring the push interface of SensorBridge.java
+"""
+
+import random
+import time
+from array import array
+from typing import List, Optional
+
+from android_jni.bridge_base import BaseSensorBridge
+
+
+class MockSensorBridge(BaseSensorBridge):
+    """Stand-in for the JNI SensorBridge that generates tag reads"""
+
+    THREAD_NAME = 'mock-nfc'
+    FIRMWARE_VERSION = 'Mock NFC Bridge'
+
+    def __init__(self, rate: float = 1.0, jitter: float = 0.0, seed: Optional[int] = None,
+                 log_size: int = 1, log_interval: float = 60.0):
+        """
+        rate: tag reads per second
+        jitter: fraction of the interval each gap is randomly stretched/shrunk by
+        seed: makes the generated values reproducible
+        log_size: readings per tag read; above 1 every tag carries a sample
+                  log, delivered as one flat record array to the records listener
+        log_interval: seconds between logged samples
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        super().__init__()
+        self.rate = rate
+        self.jitter = jitter
+        self.log_size = max(1, int(log_size))
+        self.log_interval = log_interval
+        self._rng = random.Random(seed)
+
+    def _next_values(self) -> List[float]:
+        rng = self._rng
+        return [
+            36.5 + rng.uniform(-1, 1) + self.temp_offset,
+            7.0 + rng.uniform(-0.5, 0.5),
+            float(100 + rng.randint(-20, 20))
+        ]
+
+    def _run(self) -> None:
+        interval = 1.0 / self.rate
+        due = time.monotonic()
+        while True:
+            due += interval * (1 + self._rng.uniform(-self.jitter, self.jitter))
+            # Waits are scheduled against absolute times so high rates don't drift
+            if self._stop.wait(max(due - time.monotonic(), 0)):
+                return
+            if self.log_size > 1:
+                self._emit_log(time.time())
+                continue
+            values = self._next_values()
+            self._last_reading = values
+            self.events_emitted += 1
+            self.readings_emitted += 1
+            listener = self._listener
+            if listener is not None:
+                listener(time.time(), values)
+
+    def _emit_log(self, now: float) -> None:
+        """One tag read carrying `log_size` samples, the newest taken now"""
+        records = array('d')
+        first = now - (self.log_size - 1) * self.log_interval
+        for i in range(self.log_size):
+            values = self._next_values()
+            records.append(first + i * self.log_interval)
+            records.extend(values)
+        self._last_reading = values
+        self.events_emitted += 1
+        self.readings_emitted += self.log_size
+        listener = self._records_listener
+        if listener is not None:
+            listener(records)
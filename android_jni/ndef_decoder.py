@@ -0,0 +1,176 @@
+"""
+Decoder for NHS 3152 NDEF health records, mirroring native_sensor/sensor_nhs3152.c
+
+Used off-device to decode captured tag dumps. Payload bytes are decoded
+in bulk with numpy.frombuffer and a structured big-endian dtype; without
+numpy a struct-based fallback gives the same values.
+
+A health sample is 6 bytes, big-endian:
+
+    int16 temperature (0.1 °C), uint16 pH (0.01 units), uint16 glucose (mg/dL)
+
+A serialized NDEF message may hold 'H' records (one sample, stamped with
+the time the tag was read) and 'L' records (the tag's sample log: uint32
+epoch seconds of the first sample, uint16 seconds between samples, then
+packed samples), as parsed by parse_nfc_ndef_records().
+"""
+
+import struct
+from array import array
+from typing import Dict, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+SAMPLE = struct.Struct('>hHH')
+LOG_HEADER = struct.Struct('>IH')
+FIELDNAMES = ['timestamp', 'temperature', 'ph', 'glucose']
+
+# NDEF record header flags
+NDEF_FLAG_SR = 0x10
+NDEF_FLAG_IL = 0x08
+NDEF_TNF_MASK = 0x07
+NDEF_TNF_WELL_KNOWN = 0x01
+
+if np is not None:
+    SAMPLE_DTYPE = np.dtype([
+        ('temperature', '>i2'),
+        ('ph', '>u2'),
+        ('glucose', '>u2'),
+    ])
+else:
+    SAMPLE_DTYPE = None
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+def decode_samples(payloads: BytesLike, temp_offset: float = 0.0) -> Dict[str, Union[array, 'np.ndarray']]:
+    """
+    Decode concatenated 6 byte health samples into temperature/ph/glucose
+    columns (float64 ndarrays, or array('d') without numpy). A trailing
+    partial sample is ignored.
+    """
+    count = len(payloads) // SAMPLE.size
+    if np is not None:
+        return _decode_samples_numpy(payloads, count, temp_offset)
+    return _decode_samples_python(payloads, count, temp_offset)
+
+
+def _decode_samples_numpy(payloads: BytesLike, count: int, temp_offset: float) -> Dict[str, 'np.ndarray']:
+    raw = np.frombuffer(payloads, dtype=SAMPLE_DTYPE, count=count)
+    return {
+        'temperature': raw['temperature'] / 10.0 + temp_offset,
+        'ph': raw['ph'] / 100.0,
+        'glucose': raw['glucose'].astype(np.float64)
+    }
+
+
+def _decode_samples_python(payloads: BytesLike, count: int, temp_offset: float) -> Dict[str, array]:
+    columns = {name: array('d') for name in FIELDNAMES[1:]}
+    temperature, ph, glucose = columns['temperature'], columns['ph'], columns['glucose']
+    for temp_raw, ph_raw, glucose_raw in SAMPLE.iter_unpack(payloads[:count * SAMPLE.size]):
+        temperature.append(temp_raw / 10.0 + temp_offset)
+        ph.append(ph_raw / 100.0)
+        glucose.append(glucose_raw)
+    return columns
+
+
+def split_records(data: BytesLike) -> List[Tuple[int, bytes, memoryview]]:
+    """
+    Split a serialized NDEF message into (TNF, type, payload) records.
+    Raises ValueError if a record runs past the end of the message.
+    """
+    view = memoryview(data)
+    records = []
+    offset = 0
+    while offset < len(view):
+        if offset + 3 > len(view):
+            raise ValueError("Truncated NDEF record header")
+        header = view[offset]
+        type_length = view[offset + 1]
+        pos = offset + 2
+        if header & NDEF_FLAG_SR:
+            payload_len = view[pos]
+            pos += 1
+        else:
+            if pos + 4 > len(view):
+                raise ValueError("Truncated NDEF record header")
+            payload_len = int.from_bytes(view[pos:pos + 4], 'big')
+            pos += 4
+        id_length = 0
+        if header & NDEF_FLAG_IL:
+            if pos >= len(view):
+                raise ValueError("Truncated NDEF record header")
+            id_length = view[pos]
+            pos += 1
+        record_type = bytes(view[pos:pos + type_length])
+        pos += type_length + id_length
+        if pos + payload_len > len(view):
+            raise ValueError("NDEF record runs past the end of the message")
+        records.append((header & NDEF_TNF_MASK, record_type, view[pos:pos + payload_len]))
+        offset = pos + payload_len
+    return records
+
+
+def decode_message(data: BytesLike, discovered_at: float,
+                   temp_offset: float = 0.0) -> Dict[str, Union[array, 'np.ndarray']]:
+    """
+    Decode every health reading of a serialized NDEF message, like
+    parse_nfc_ndef_records(). Returns columns keyed like
+    ReadingsView.columns() (timestamps in epoch seconds), with all
+    samples decoded in a single pass.
+    """
+    samples = bytearray()
+    # (first timestamp, seconds between samples, sample count) per record
+    runs = []
+    for tnf, record_type, payload in split_records(data):
+        if tnf != NDEF_TNF_WELL_KNOWN or len(record_type) != 1:
+            continue
+        if record_type == b'H' and len(payload) >= SAMPLE.size:
+            samples += payload[:SAMPLE.size]
+            runs.append((discovered_at, 0, 1))
+        elif record_type == b'L' and len(payload) >= LOG_HEADER.size:
+            first, interval = LOG_HEADER.unpack_from(payload)
+            count = (len(payload) - LOG_HEADER.size) // SAMPLE.size
+            samples += payload[LOG_HEADER.size:LOG_HEADER.size + count * SAMPLE.size]
+            runs.append((float(first), interval, count))
+
+    columns = decode_samples(bytes(samples), temp_offset)
+    if np is not None:
+        parts = [first + interval * np.arange(count, dtype=np.float64)
+                 for first, interval, count in runs]
+        columns['timestamp'] = np.concatenate(parts) if parts else np.empty(0)
+    else:
+        columns['timestamp'] = array('d', (
+            first + interval * i for first, interval, count in runs for i in range(count)
+        ))
+    return {name: columns[name] for name in FIELDNAMES}
+
+
+def parse_health_record(data: BytesLike, temp_offset: float = 0.0) -> Optional[Tuple[float, float, float]]:
+    """
+    Decode the first 'H' record the way parse_nfc_ndef_message() does,
+    including its compact record layout (type length in the low nibble
+    of the header byte). Returns (temperature, ph, glucose) or None.
+    """
+    if len(data) < 16:
+        return None
+    offset = 0
+    while offset < len(data) - 8:
+        header = data[offset]
+        if header & 0xC0 == 0x80:
+            type_length = header & 0x0F
+            payload_len = data[offset + 1 + type_length]
+            if type_length > 0 and data[offset + 1] == ord('H'):
+                start = offset + 2 + type_length
+                if start + SAMPLE.size > len(data):
+                    return None
+                temp_raw, ph_raw, glucose_raw = SAMPLE.unpack_from(data, start)
+                return temp_raw / 10.0 + temp_offset, ph_raw / 100.0, float(glucose_raw)
+            offset += 2 + type_length + payload_len
+        else:
+            offset += 1
+    return None
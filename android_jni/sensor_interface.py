@@ -4,15 +4,39 @@ This interface communicates with native C/C++ code through JNI for NFC data exch
 """
 
 import json
+import threading
+from array import array
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict, List, Sequence
 import random
 
 
+# Values per reading in a flat record array from the bridge:
+# epoch seconds, temperature, pH, glucose (SensorBridge.RECORD_STRIDE)
+RECORD_STRIDE = 4
+RECORD_FIELDS = ('timestamp', 'temperature', 'ph', 'glucose')
+
+
 class SensorInterface:
-    """Interface for communicating with NHS 3152 sensor via NFC and JNI"""
+    """
+    Interface for communicating with NHS 3152 sensor via NFC and JNI
     
-    def __init__(self):
+    Readings can be polled with read_sensor_data(), or pushed: after
+    start_listening(callback) every tag the bridge reads is delivered to
+    the callback on the bridge's thread, stamped with the time it was read.
+    Tags carrying many readings (the NHS3152 sample log) arrive from the
+    bridge as one flat record array and are passed on as columns.
+    """
+    
+    def __init__(self, bridge=None, mock_rate: Optional[float] = None,
+                 simulator: Optional[Dict] = None):
+        """
+        bridge: bridge object to use instead of the JNI SensorBridge
+        mock_rate: without the JNI bridge, emit mock tag reads at this rate
+                   (per second) through MockSensorBridge instead of polling
+        simulator: SimulatorBridge config (see SimulatorBridge.from_config)
+                   to replay history or synthetic signals instead of the JNI bridge
+        """
         self.connected = False
         self.nfc_enabled = False
         self.config = {
@@ -25,13 +49,30 @@ class SensorInterface:
             'auto_detect': True,  # Auto-detect NFC tags
         }
         
+        # Listener -> its batch callback (or None to receive batches per reading)
+        self._listeners: Dict[Callable[[Dict], None], Optional[Callable]] = {}
+        self._bridge_listener = None
+        self._listener_lock = threading.Lock()
+        
         # Try to import JNI bridge
+        if bridge is not None:
+            self.bridge = bridge
+            return
+        if simulator:
+            from android_jni.simulator import SimulatorBridge
+            self.bridge = SimulatorBridge.from_config(simulator)
+            return
         try:
             from android_jni.sensor_bridge import SensorBridge
             self.bridge = SensorBridge()
         except ImportError:
-            print("Warning: Running without JNI bridge. Using mock data for testing.")
-            self.bridge = None
+            if mock_rate:
+                from android_jni.mock_bridge import MockSensorBridge
+                print("Warning: Running without JNI bridge. Emitting mock tag reads.")
+                self.bridge = MockSensorBridge(rate=mock_rate)
+            else:
+                print("Warning: Running without JNI bridge. Using mock data for testing.")
+                self.bridge = None
     
     def connect(self) -> bool:
         """Establish NFC connection to NHS 3152 sensor tag"""
@@ -89,6 +130,90 @@ class SensorInterface:
             print(f"Error reading sensor data: {e}")
             return None
     
+    def start_listening(self, callback: Callable[[Dict], None],
+                        batch_callback: Optional[Callable[[Dict[str, array]], None]] = None) -> bool:
+        """
+        Push mode: call `callback(reading)` for every tag read, with the
+        reading's real timestamp. Multi-reading tags go to
+        `batch_callback(columns)` in one call if given (columns keyed like
+        ReadingsView.columns(), timestamps in epoch seconds), otherwise to
+        `callback` one reading at a time. Returns False if the bridge can't
+        push (no bridge or an old bridge), in which case callers should poll.
+        """
+        if self.bridge is None:
+            return False
+        with self._listener_lock:
+            if self._bridge_listener is None:
+                if hasattr(self.bridge, 'set_listener'):
+                    self._bridge_listener = self._on_tag_read
+                    self.bridge.set_listener(self._bridge_listener)
+                    if hasattr(self.bridge, 'set_records_listener'):
+                        self.bridge.set_records_listener(self._on_tag_records)
+                elif hasattr(self.bridge, 'setTagListener'):
+                    self._bridge_listener = _java_tag_listener(self._on_tag_read, self._on_tag_records)
+                    self.bridge.setTagListener(self._bridge_listener)
+                else:
+                    return False
+            self._listeners[callback] = batch_callback
+        
+        if not self.connected:
+            self.connect()
+        return True
+    
+    def stop_listening(self, callback: Optional[Callable[[Dict], None]] = None) -> None:
+        """Stop pushing readings to `callback` (default: to every listener)"""
+        with self._listener_lock:
+            if callback is None:
+                self._listeners.clear()
+            else:
+                self._listeners.pop(callback, None)
+            if self._listeners or self._bridge_listener is None:
+                return
+            self._bridge_listener = None
+        try:
+            if hasattr(self.bridge, 'set_listener'):
+                self.bridge.set_listener(None)
+                if hasattr(self.bridge, 'set_records_listener'):
+                    self.bridge.set_records_listener(None)
+            else:
+                self.bridge.setTagListener(None)
+        except Exception as e:
+            print(f"Error removing tag listener: {e}")
+    
+    def _on_tag_read(self, timestamp: float, values) -> None:
+        """Bridge callback (bridge thread): deliver one tag read to listeners"""
+        reading = {
+            'timestamp': datetime.fromtimestamp(timestamp).isoformat(),
+            'temperature': float(values[0]),
+            'ph': float(values[1]),
+            'glucose': float(values[2])
+        }
+        for callback in list(self._listeners):
+            try:
+                callback(reading)
+            except Exception as e:
+                print(f"Error in sensor listener: {e}")
+    
+    def _on_tag_records(self, records: Sequence[float]) -> None:
+        """Bridge callback (bridge thread): deliver a multi-reading tag to listeners"""
+        columns = records_to_columns(records)
+        if not len(columns['timestamp']):
+            return
+        for callback, batch_callback in list(self._listeners.items()):
+            try:
+                if batch_callback is not None:
+                    batch_callback(columns)
+                    continue
+                for i, epoch in enumerate(columns['timestamp']):
+                    callback({
+                        'timestamp': datetime.fromtimestamp(epoch).isoformat(),
+                        'temperature': columns['temperature'][i],
+                        'ph': columns['ph'][i],
+                        'glucose': columns['glucose'][i]
+                    })
+            except Exception as e:
+                print(f"Error in sensor listener: {e}")
+    
     def _get_mock_data(self) -> Dict:
         """Return mock sensor data for testing (no hardware)"""
         return {
@@ -196,3 +321,32 @@ class SensorInterface:
             'config': self.config.copy(),
             'communication_mode': 'NFC'
         }
+
+
+def records_to_columns(records: Sequence[float]) -> Dict[str, array]:
+    """Split a flat RECORD_STRIDE record array into columns keyed by field name"""
+    flat = records if isinstance(records, array) and records.typecode == 'd' else array('d', records)
+    usable = len(flat) - len(flat) % RECORD_STRIDE
+    return {
+        name: flat[i:usable:RECORD_STRIDE] for i, name in enumerate(RECORD_FIELDS)
+    }
+
+
+def _java_tag_listener(on_tag_read: Callable[[float, List[float]], None],
+                       on_tag_records: Callable[[Sequence[float]], None]):
+    """Wrap Python callbacks as a SensorBridge.TagListener (pyjnius)"""
+    from jnius import PythonJavaClass, java_method
+    
+    class TagListener(PythonJavaClass):
+        __javainterfaces__ = ['com/sensormonitor/android/SensorBridge$TagListener']
+        __javacontext__ = 'app'
+        
+        @java_method('(J[F)V')
+        def onHealthReading(self, timestamp_ms, values):
+            on_tag_read(timestamp_ms / 1000.0, list(values))
+        
+        @java_method('([D)V')
+        def onHealthRecords(self, records):
+            on_tag_records(records)
+    
+    return TagListener()
@@ -0,0 +1,174 @@
+"""
+Simulated NFC bridge for load testing without hardware
+
+SimulatorBridge has the push interface of SensorBridge.java / MockSensorBridge
+and feeds readings from a row source at a configurable rate, up to
+thousands per second or unthrottled. Sources are plain iterators of
+(epoch, temperature, ph, glucose) tuples:
+  - synthetic_signal(): seeded signals with drift, noise, spikes, gaps
+    and out-of-order timestamps
+  - replay_history(): readings recorded in a storage directory
+"""
+
+import itertools
+import math
+import random
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from android_jni.bridge_base import BaseSensorBridge
+from data_management import archive
+from data_management.parallel_loader import FIELDNAMES, csv_seek, read_file_columns
+
+
+Row = Tuple[float, float, float, float]
+
+SOURCES = ('synthetic', 'replay')
+
+
+def synthetic_signal(seed: int = 0, start: Optional[float] = None, interval: float = 1.0,
+                     drift: float = 0.0, noise: float = 1.0, spike_rate: float = 0.0,
+                     gap_rate: float = 0.0, gap_seconds: float = 300.0,
+                     late_rate: float = 0.0, late_seconds: float = 30.0) -> Iterator[Row]:
+    """
+    Endless seeded readings, `interval` seconds apart from `start`
+    (default: now), quantised to the sensor's resolution.
+
+    drift: temperature change per hour (°C)
+    noise: scale of the random noise on every channel
+    spike_rate: fraction of readings with a glucose/temperature spike
+    gap_rate: fraction of readings followed by `gap_seconds` without data
+    late_rate: fraction of readings stamped up to `late_seconds` in the past
+    """
+    rng = random.Random(seed)
+    clock = time.time() if start is None else start
+    origin = clock
+    while True:
+        hours = (clock - origin) / 3600.0
+        temperature = 36.8 + drift * hours + rng.gauss(0, 0.1 * noise)
+        ph = 7.2 + rng.gauss(0, 0.05 * noise)
+        glucose = 100 + 20 * math.sin(2 * math.pi * hours / 3) + rng.gauss(0, 3 * noise)
+        if rng.random() < spike_rate:
+            glucose += rng.choice((-1, 1)) * rng.uniform(40, 80)
+            temperature += rng.uniform(1, 3)
+        timestamp = clock
+        if rng.random() < late_rate:
+            timestamp -= rng.uniform(0, late_seconds)
+        yield (timestamp, round(temperature, 1), round(ph, 2), float(max(round(glucose), 0)))
+
+        clock += interval
+        if rng.random() < gap_rate:
+            clock += gap_seconds
+
+
+def replay_history(storage_path: str, start: Optional[float] = None, end: Optional[float] = None,
+                   rebase: bool = True) -> Iterator[Row]:
+    """
+    Stream recorded readings (CSV, binary or delta daily files, archived
+    or not) oldest file first, optionally limited to start <= timestamp
+    <= end (epoch seconds). With `rebase` timestamps are shifted so the first replayed
+    reading is stamped with the time replay started.
+    """
+    offset = None
+    for path in sorted(Path(storage_path).glob('sensor_data_*')):
+        if archive.data_suffix(path) not in ('.csv', '.bin', '.dlt'):
+            continue
+        columns = read_file_columns(path, start, end, FIELDNAMES, *csv_seek(path, start, end))
+        for row in zip(*(column.tolist() for column in columns)):
+            if rebase:
+                if offset is None:
+                    offset = time.time() - row[0]
+                row = (row[0] + offset,) + row[1:]
+            yield row
+
+
+class SimulatorBridge(BaseSensorBridge):
+    """Stand-in for the JNI SensorBridge that plays rows from a source"""
+
+    THREAD_NAME = 'nfc-simulator'
+    FIRMWARE_VERSION = 'NFC Simulator'
+
+    def __init__(self, source: Iterable[Row], rate: Optional[float] = 1000.0,
+                 batch_size: int = 1, limit: Optional[int] = None):
+        """
+        source: iterable of (epoch, temperature, ph, glucose) rows
+        rate: readings per second, or None to emit as fast as listeners take them
+        batch_size: readings per delivery; above 1 each delivery is one flat
+                    record array to the records listener (like a logged tag)
+        limit: stop after this many readings
+        """
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive or None")
+        super().__init__()
+        self.source = source
+        self.rate = rate
+        self.batch_size = max(1, int(batch_size))
+        self.limit = limit
+        self.finished = threading.Event()
+        self._rows = None
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'SimulatorBridge':
+        """
+        Build a simulator from a config dict: 'source' ('synthetic' or
+        'replay'), 'rate', 'batch_size', 'limit', plus synthetic_signal()
+        keyword arguments or 'path' (and 'start'/'end') for replay.
+        """
+        options = dict(config)
+        kind = options.pop('source', 'synthetic')
+        bridge_args = {name: options.pop(name) for name in ('rate', 'batch_size', 'limit')
+                       if name in options}
+        if kind == 'synthetic':
+            source = synthetic_signal(**options)
+        elif kind == 'replay':
+            source = replay_history(options.pop('path', './sensor_data'), **options)
+        else:
+            raise ValueError(f"source must be one of {SOURCES}")
+        return cls(source, **bridge_args)
+
+    def connect(self, config: Dict) -> bool:
+        """Start (or resume) playing the source"""
+        if self._rows is None:
+            self._rows = iter(self.source)
+            if self.limit is not None:
+                self._rows = itertools.islice(self._rows, self.limit)
+        return super().connect(config)
+
+    def _run(self) -> None:
+        started = time.monotonic()
+        first = self.readings_emitted
+        while not self._stop.is_set():
+            rows = list(itertools.islice(self._rows, self.batch_size))
+            if not rows:
+                self.finished.set()
+                return
+            self._deliver(rows)
+            if self.rate is not None:
+                # Only wait when ahead of schedule, so the average rate holds
+                # even when a single reading is due sooner than a sleep lasts
+                due = started + (self.readings_emitted - first) / self.rate
+                delay = due - time.monotonic()
+                if delay > 0 and self._stop.wait(delay):
+                    return
+
+    def _deliver(self, rows: List[Row]) -> None:
+        offset = self.temp_offset
+        self.events_emitted += 1
+        self.readings_emitted += len(rows)
+        last = rows[-1]
+        self._last_reading = [last[1] + offset, last[2], last[3]]
+
+        records_listener = self._records_listener
+        if self.batch_size > 1 and records_listener is not None:
+            records = array('d')
+            for epoch, temperature, ph, glucose in rows:
+                records.extend((epoch, temperature + offset, ph, glucose))
+            records_listener(records)
+            return
+        listener = self._listener
+        if listener is not None:
+            for epoch, temperature, ph, glucose in rows:
+                listener(epoch, [temperature + offset, ph, glucose])
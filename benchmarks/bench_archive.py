@@ -0,0 +1,66 @@
+"""
+Archived daily files: compression ratio and read-throughput cost
+
+Writes `--days` daily files of `--rows` readings (CSV or binary) to a
+temporary directory, then for plain files and each archive codec reports
+the bytes on disk, the time to archive and the read throughput of
+load_range() and iter_readings().
+
+    python -m benchmarks.bench_archive --days 7 --rows 20000
+"""
+
+import argparse
+import shutil
+import tempfile
+from datetime import date
+from pathlib import Path
+
+from benchmarks.bench_parallel_loader import timed, write_history
+from data_management import archive
+from data_management.csv_handler import CSVHandler
+
+
+def disk_usage(path: str) -> int:
+    return sum(p.stat().st_size for p in Path(path).glob('sensor_data_*') if p.suffix != '.idx')
+
+
+def read_rates(path: str, file_format: str, total: int) -> dict:
+    """Rows/s of the column and row-streaming readers"""
+    with CSVHandler(path, file_format=file_format) as handler:
+        columns, _ = timed(handler.load_range)
+        rows, _ = timed(lambda: sum(1 for _ in handler.iter_readings(output='tuple')))
+    return {'columns': total / columns, 'rows': total / rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--rows', type=int, default=10000, help='readings per day')
+    parser.add_argument('--format', choices=['csv', 'binary'], default='csv')
+    args = parser.parse_args()
+
+    total = args.days * args.rows
+    print(f"{args.days} {args.format} files, {total} readings")
+    print(f"{'storage':<8} {'bytes':>12} {'ratio':>6} {'archive s':>10} "
+          f"{'columns k/s':>12} {'rows k/s':>10}")
+    plain_size = None
+    for codec in [None] + sorted(archive.CODECS):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            write_history(temp_dir, args.days, args.rows, args.format)
+            seconds = 0.0
+            if codec is not None:
+                # Every written day is in the past, so all of them are archived
+                with CSVHandler(temp_dir, file_format=args.format) as handler:
+                    seconds, _ = timed(handler.archive_closed_days, codec, date.max)
+            size = disk_usage(temp_dir)
+            plain_size = plain_size or size
+            rates = read_rates(temp_dir, args.format, total)
+            print(f"{codec or 'plain':<8} {size:12d} {plain_size / size:6.1f} {seconds:10.2f} "
+                  f"{rates['columns'] / 1e3:12.0f} {rates['rows'] / 1e3:10.0f}")
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Loading one large daily CSV file: per-row parsing vs the vectorised path
+
+Compares the original DictReader + fromisoformat + float() loop with
+CSVHandler.load_sensor_readings() in each output mode, which parse the
+file with np.loadtxt and vectorised timestamps (fast_csv.py).
+
+    python -m benchmarks.bench_csv_parse --rows 100000
+"""
+
+import argparse
+import csv
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from android_jni.simulator import synthetic_signal
+from data_management.csv_handler import CSVHandler
+
+
+def dictreader_load(path) -> list:
+    """The per-row loader CSVHandler.load_sensor_readings() started from"""
+    readings = []
+    with open(path, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            readings.append({
+                'timestamp': datetime.fromisoformat(row['timestamp']),
+                'temperature': float(row['temperature']),
+                'ph': float(row['ph']),
+                'glucose': float(row['glucose'])
+            })
+    return readings
+
+
+def best_of(repeat: int, func, *args, **kwargs) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        day = datetime(2024, 3, 1)
+        source = synthetic_signal(seed=1, start=day.timestamp(), interval=80000.0 / args.rows)
+        rows = [next(source) for _ in range(args.rows)]
+        with CSVHandler(temp_dir, flush_rows=10000) as handler:
+            handler.save_columns(dict(zip(('timestamp', 'temperature', 'ph', 'glucose'), zip(*rows))))
+            path = handler.storage_path / f"sensor_data_{day.date()}.csv"
+
+            baseline = best_of(args.repeat, dictreader_load, path)
+            runs = [('DictReader loop', baseline)]
+            for output in ('dict', 'readings', 'columns'):
+                seconds = best_of(args.repeat, handler.load_sensor_readings, day.date(), output=output)
+                runs.append((f"output='{output}'", seconds))
+
+        print(f"{args.rows} rows")
+        for name, seconds in runs:
+            print(f"{name:<18} {seconds * 1e3:9.1f} ms  {baseline / seconds:5.1f}x")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
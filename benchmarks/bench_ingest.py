@@ -0,0 +1,72 @@
+"""
+Throughput ceiling of the ingest path without hardware
+
+Drives SimulatorBridge (unthrottled synthetic signal) through
+SensorInterface -> IngestPipeline -> SensorData + CSVHandler and reports
+readings/s for each storage format, single tag reads and batched deliveries.
+
+    python -m benchmarks.bench_ingest --readings 50000
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+
+from android_jni.sensor_interface import SensorInterface
+from android_jni.simulator import SimulatorBridge, synthetic_signal
+from data_management.csv_handler import CSVHandler
+from data_management.ingest import IngestPipeline
+from data_management.sensor_data import SensorData
+
+
+def run(readings: int, file_format: str, batch_size: int, late_rate: float) -> dict:
+    """Push `readings` simulated readings through the pipeline and time it"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        sensor_data = SensorData()
+        handler = CSVHandler(temp_dir, flush_rows=500, file_format=file_format)
+        pipeline = IngestPipeline(sensor_data, handler, max_queue=10000, batch_size=200,
+                                  policy='block', block_timeout=60.0)
+        source = synthetic_signal(seed=1, start=1704067200.0, interval=0.1, late_rate=late_rate)
+        bridge = SimulatorBridge(source, rate=None, batch_size=batch_size, limit=readings)
+        interface = SensorInterface(bridge=bridge)
+
+        pipeline.start()
+        started = time.perf_counter()
+        interface.start_listening(pipeline.submit, pipeline.submit_columns)
+        bridge.finished.wait()
+        produced = time.perf_counter() - started
+        pipeline.stop(timeout=600)
+        elapsed = time.perf_counter() - started
+        interface.stop_listening()
+        interface.disconnect()
+        handler.close()
+        stats = pipeline.get_stats()
+        return {
+            'written': stats['written'],
+            'dropped': stats['dropped'],
+            'produce_rate': readings / produced,
+            'rate': stats['written'] / elapsed,
+        }
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--readings', type=int, default=20000, help='readings per run')
+    parser.add_argument('--late-rate', type=float, default=0.0,
+                        help='fraction of out-of-order readings')
+    args = parser.parse_args()
+
+    print(f"{'format':<8} {'delivery':<12} {'offered/s':>12} {'stored/s':>12} {'dropped':>8}")
+    for file_format in ('csv', 'binary'):
+        for batch_size, label in ((1, 'single'), (100, 'batch x100')):
+            result = run(args.readings, file_format, batch_size, args.late_rate)
+            print(f"{file_format:<8} {label:<12} {result['produce_rate']:12.0f} "
+                  f"{result['rate']:12.0f} {result['dropped']:8d}")
+
+
+if __name__ == '__main__':
+    main()
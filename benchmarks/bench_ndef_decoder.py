@@ -0,0 +1,66 @@
+"""
+Throughput of the NDEF health record decoder (android_jni/ndef_decoder.py)
+
+Builds a tag dump holding one long 'L' sample log and times decoding it
+with the numpy.frombuffer path and with the struct fallback.
+
+    python -m benchmarks.bench_ndef_decoder --samples 200000
+"""
+
+import argparse
+import random
+import struct
+import time
+
+from android_jni import ndef_decoder
+
+
+def build_log_message(samples: int, seed: int = 0) -> bytes:
+    """Serialized NDEF message with one 'L' record of `samples` readings"""
+    rng = random.Random(seed)
+    payload = bytearray(ndef_decoder.LOG_HEADER.pack(1704067200, 60))
+    for _ in range(samples):
+        payload += ndef_decoder.SAMPLE.pack(
+            rng.randint(350, 380), rng.randint(650, 750), rng.randint(70, 180)
+        )
+    # Long record (no SR flag): MB | ME | TNF well-known
+    header = struct.pack('>BBI', 0xC0 | ndef_decoder.NDEF_TNF_WELL_KNOWN, 1, len(payload))
+    return header + b'L' + bytes(payload)
+
+
+def best_of(repeat: int, func, *args) -> float:
+    """Fastest wall time of `repeat` calls, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--samples', type=int, default=100000, help='readings in the tag log')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per measurement (best is kept)')
+    args = parser.parse_args()
+
+    message = build_log_message(args.samples)
+    payloads = message[-args.samples * ndef_decoder.SAMPLE.size:]
+    print(f"{args.samples} samples, {len(message) / 1e6:.2f} MB message")
+
+    runs = [('decode_message', ndef_decoder.decode_message, message, 0.0)]
+    if ndef_decoder.np is not None:
+        runs.append(('samples (numpy)', ndef_decoder._decode_samples_numpy,
+                     payloads, args.samples, 0.0))
+    else:
+        print("numpy not installed: only the struct fallback is measured")
+    runs.append(('samples (struct)', ndef_decoder._decode_samples_python,
+                 payloads, args.samples, 0.0))
+
+    for name, func, *call_args in runs:
+        seconds = best_of(args.repeat, func, *call_args)
+        print(f"{name:<18} {seconds * 1e3:9.2f} ms  {args.samples / seconds / 1e6:8.2f} M readings/s")
+
+
+if __name__ == '__main__':
+    main()
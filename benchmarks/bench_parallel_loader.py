@@ -0,0 +1,72 @@
+"""
+Multi-day history load: serial loaders vs the parallel loader
+
+Writes `--days` daily files of `--rows` readings (CSV or binary) to a
+temporary directory, then times load_all_readings(), load_range() and
+load_range_parallel() with a range of worker counts.
+
+    python -m benchmarks.bench_parallel_loader --days 30 --rows 20000
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from android_jni.simulator import synthetic_signal
+from data_management.csv_handler import CSVHandler
+
+
+def write_history(path: str, days: int, rows: int, file_format: str) -> None:
+    """Fill `path` with `days` daily files of `rows` synthetic readings"""
+    source = synthetic_signal(seed=1, start=1704067200.0, interval=86400.0 / rows)
+    columns = {'timestamp': [], 'temperature': [], 'ph': [], 'glucose': []}
+    with CSVHandler(path, flush_rows=10000, file_format=file_format) as handler:
+        for _ in range(days):
+            for name in columns:
+                columns[name].clear()
+            for _ in range(rows):
+                for name, value in zip(columns, next(source)):
+                    columns[name].append(value)
+            handler.save_columns(columns)
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=14)
+    parser.add_argument('--rows', type=int, default=10000, help='readings per day')
+    parser.add_argument('--format', choices=['csv', 'binary'], default='csv')
+    parser.add_argument('--workers', type=int, nargs='*',
+                        default=sorted({2, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        write_history(temp_dir, args.days, args.rows, args.format)
+        handler = CSVHandler(temp_dir, file_format=args.format)
+        total = args.days * args.rows
+        print(f"{args.days} {args.format} files, {total} readings, {os.cpu_count()} CPUs")
+
+        baseline, _ = timed(handler.load_all_readings)
+        runs = [('load_all_readings', baseline), ('load_range', timed(handler.load_range)[0])]
+        for workers in args.workers:
+            seconds, _ = timed(handler.load_range_parallel, workers=workers)
+            runs.append((f'parallel x{workers}', seconds))
+
+        for name, seconds in runs:
+            print(f"{name:<18} {seconds:8.3f} s  {total / seconds / 1e3:8.0f} k rows/s  "
+                  f"{baseline / seconds:5.1f}x")
+        handler.close()
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
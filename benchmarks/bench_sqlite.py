@@ -0,0 +1,108 @@
+"""
+SQLite backend vs daily CSV files: insert rate and range-query latency
+
+Stores `--days` days of `--rows` synthetic readings per day in each
+backend, once as single save_sensor_reading() calls (`--flush-rows`
+buffered per flush) and once as save_columns() batches, then times
+load_range() over windows that don't line up with day boundaries and
+get_statistics() over the whole history.
+
+    python -m benchmarks.bench_sqlite --days 7 --rows 10000
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from android_jni.simulator import synthetic_signal
+from data_management.csv_handler import CSVHandler
+from data_management.sqlite_store import SQLiteHandler
+
+
+START = 1704067200.0
+WINDOWS = [('1 min', timedelta(minutes=1)), ('1 h', timedelta(hours=1)),
+           ('1 day across midnight', timedelta(days=1))]
+
+
+def make_handler(backend: str, path: str, flush_rows: int):
+    if backend == 'sqlite':
+        return SQLiteHandler(path, flush_rows=flush_rows)
+    return CSVHandler(path, flush_rows=flush_rows, file_format=backend)
+
+
+def insert_rate(backend: str, rows: list, flush_rows: int, batched: bool) -> float:
+    """Readings stored per second"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        handler = make_handler(backend, temp_dir, flush_rows)
+        started = time.perf_counter()
+        if batched:
+            for i in range(0, len(rows), 1000):
+                chunk = rows[i:i + 1000]
+                handler.save_columns(dict(zip(('timestamp', 'temperature', 'ph', 'glucose'), zip(*chunk))))
+        else:
+            for epoch, temperature, ph, glucose in rows:
+                handler.save_sensor_reading({
+                    'timestamp': datetime.fromtimestamp(epoch).isoformat(),
+                    'temperature': temperature, 'ph': ph, 'glucose': glucose
+                })
+        handler.close()
+        return len(rows) / (time.perf_counter() - started)
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def query_latency(backend: str, rows: list, repeats: int = 5) -> dict:
+    """Best-of-`repeats` milliseconds per query"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        handler = make_handler(backend, temp_dir, 10000)
+        for i in range(0, len(rows), 10000):
+            handler.save_columns(dict(zip(('timestamp', 'temperature', 'ph', 'glucose'), zip(*rows[i:i + 10000]))))
+        handler.flush()
+        # Windows start mid-afternoon of day 2, so the 1 day window crosses midnight
+        start = datetime.fromtimestamp(START) + timedelta(days=1, hours=15, minutes=7)
+        queries = [(name, lambda span=span: handler.load_range(start, start + span)) for name, span in WINDOWS]
+        queries.append(('statistics', handler.get_statistics))
+
+        latency = {}
+        for name, query in queries:
+            best = float('inf')
+            for _ in range(repeats):
+                began = time.perf_counter()
+                query()
+                best = min(best, time.perf_counter() - began)
+            latency[name] = best * 1e3
+        handler.close()
+        return latency
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--rows', type=int, default=10000, help='readings per day')
+    parser.add_argument('--flush-rows', type=int, default=50, help='rows per flush for single saves')
+    parser.add_argument('--backends', nargs='*', default=['csv', 'binary', 'sqlite'])
+    args = parser.parse_args()
+
+    source = synthetic_signal(seed=1, start=START, interval=86400.0 / args.rows)
+    rows = [next(source) for _ in range(args.days * args.rows)]
+    print(f"{len(rows)} readings over {args.days} days")
+
+    names = [name for name, _ in WINDOWS] + ['statistics']
+    print(f"{'backend':<8} {'single/s':>10} {'batched/s':>10} " +
+          ' '.join(f"{name + ' ms':>{max(len(name) + 3, 8)}}" for name in names))
+    for backend in args.backends:
+        single = insert_rate(backend, rows[:min(len(rows), 20000)], args.flush_rows, batched=False)
+        batched = insert_rate(backend, rows, args.flush_rows, batched=True)
+        latency = query_latency(backend, rows)
+        print(f"{backend:<8} {single:10.0f} {batched:10.0f} " +
+              ' '.join(f"{latency[name]:>{max(len(name) + 3, 8)}.2f}" for name in names))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Storage formats compared: bytes per reading, write and read rates
+
+Writes `--days` daily files of `--rows` synthetic readings in each
+CSVHandler file format, then reports the bytes on disk per reading, the
+save_columns() rate and the rates of a full load_range() and of a one
+hour window.
+
+    python -m benchmarks.bench_storage_formats --days 3 --rows 20000
+"""
+
+import argparse
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.bench_parallel_loader import timed, write_history
+from data_management.csv_handler import FILE_FORMATS, CSVHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=3)
+    parser.add_argument('--rows', type=int, default=10000, help='readings per day')
+    args = parser.parse_args()
+
+    total = args.days * args.rows
+    window_start = datetime.fromtimestamp(1704067200.0) + timedelta(hours=30)
+    print(f"{args.days} days, {total} readings")
+    print(f"{'format':<8} {'bytes/row':>10} {'write k/s':>10} {'load k/s':>10} {'1 h window ms':>14}")
+    for file_format in FILE_FORMATS:
+        temp_dir = tempfile.mkdtemp()
+        try:
+            write_seconds, _ = timed(write_history, temp_dir, args.days, args.rows, file_format)
+            size = sum(p.stat().st_size for p in Path(temp_dir).glob('sensor_data_*'))
+            with CSVHandler(temp_dir, file_format=file_format) as handler:
+                load_seconds, _ = timed(handler.load_range)
+                window_seconds, _ = timed(handler.load_range, window_start,
+                                          window_start + timedelta(hours=1))
+            print(f"{file_format:<8} {size / total:10.1f} {total / write_seconds / 1e3:10.0f} "
+                  f"{total / load_seconds / 1e3:10.0f} {window_seconds * 1e3:14.2f}")
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+"""
+Compressed archival of closed daily files
+
+Daily files of past days never change, so they can be kept compressed:
+sensor_data_<date>.csv becomes sensor_data_<date>.csv.gz (gzip) or
+.csv.xz (lzma), binary files likewise. Both codecs are in the standard
+library and are read back as streams, so a reader decompresses a chunk at
+a time and never holds a whole day of text in memory.
+
+If a late reading recreates the plain file of an archived day, archiving
+it again appends a new gzip member / xz stream (without the file header)
+to the existing archive; both formats read concatenated members as one.
+
+commit() records each swap in a sensor_data_<date>.<ext>.archived marker
+(archive size after the swap, plain file size and mtime) before it, so a
+crash between moving the archive into place and deleting the plain file
+is finished by finish_commits() instead of archiving the same rows twice.
+
+    python -m data_management.archive ./sensor_data --codec lzma
+"""
+
+import argparse
+import gzip
+import json
+import lzma
+import os
+import shutil
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import List, Optional
+
+from data_management import binary_format
+
+
+# Codec -> archive suffix, and archive suffix -> opener
+CODECS = {'gzip': '.gz', 'lzma': '.xz'}
+OPENERS = {'.gz': gzip.open, '.xz': lzma.open}
+DEFAULT_CODEC = 'gzip'
+DATA_SUFFIXES = ('.csv', '.bin', '.dlt')
+# Bytes copied per read while compressing
+COPY_CHUNK = 1 << 20
+
+
+class ArchiveResult:
+    """Outcome of archiving one daily file"""
+
+    __slots__ = ('source', 'target', 'original_size', 'archived_size', 'seconds')
+
+    def __init__(self, source: Path, target: Path, original_size: int,
+                 archived_size: int, seconds: float):
+        self.source = source
+        self.target = target
+        self.original_size = original_size
+        self.archived_size = archived_size  # Bytes added to the archive
+        self.seconds = seconds
+
+    @property
+    def ratio(self) -> float:
+        """Original size / compressed size"""
+        return self.original_size / self.archived_size if self.archived_size else 0.0
+
+    def __repr__(self):
+        return (f"ArchiveResult({self.source.name} -> {self.target.name}, "
+                f"{self.original_size} -> {self.archived_size} bytes, {self.ratio:.1f}x)")
+
+
+def is_archived(path) -> bool:
+    """Whether a daily file is a compressed archive"""
+    return Path(path).suffix in OPENERS
+
+
+def data_suffix(path) -> str:
+    """Storage suffix of a daily file ('.csv' or '.bin'), archived or not"""
+    path = Path(path)
+    return Path(path.stem).suffix if is_archived(path) else path.suffix
+
+
+def file_day(path) -> date:
+    """Date of a daily file from its name (ValueError if it isn't one)"""
+    return date.fromisoformat(Path(path).name.split('.')[0].replace('sensor_data_', ''))
+
+
+def open_daily(path, mode: str = 'rb'):
+    """Open a daily file for reading, decompressing archives as a stream"""
+    opener = OPENERS.get(Path(path).suffix)
+    if 't' in mode:
+        return (opener or open)(path, mode, newline='')
+    return (opener or open)(path, mode)
+
+
+def archive_path(path, codec: str = DEFAULT_CODEC) -> Path:
+    """Name of the archive of a plain daily file"""
+    if codec not in CODECS:
+        raise ValueError(f"codec must be one of {tuple(CODECS)}")
+    path = Path(path)
+    return path.with_name(path.name + CODECS[codec])
+
+
+def compress(source, codec: str = DEFAULT_CODEC) -> Path:
+    """
+    Write the archive of `source` (appended to any existing archive) to a
+    temporary file next to it and return that file's path; the caller
+    moves it into place with commit().
+    """
+    source = Path(source)
+    target = archive_path(source, codec)
+    tmp = target.with_name(target.name + '.tmp')
+    appending = target.exists()
+    if appending:
+        shutil.copyfile(target, tmp)
+
+    with open(source, 'rb') as src, OPENERS[target.suffix](tmp, 'ab' if appending else 'wb') as dst:
+        if appending:
+            # The archive already starts with a header (binary and delta
+            # headers have the same size)
+            if source.suffix in ('.bin', '.dlt'):
+                src.read(binary_format.HEADER.size)
+            else:
+                src.readline()
+        shutil.copyfileobj(src, dst, COPY_CHUNK)
+    return tmp
+
+
+def marker_path(source) -> Path:
+    """Marker of an archive swap in progress for a plain daily file"""
+    source = Path(source)
+    return source.with_name(source.name + '.archived')
+
+
+def commit(source, tmp) -> Path:
+    """Move a compressed temporary file into place and remove the plain file"""
+    source, tmp = Path(source), Path(tmp)
+    target = tmp.with_name(tmp.name[:-len('.tmp')])
+    stat = os.stat(source)
+    marker = marker_path(source)
+    with open(marker, 'w') as f:
+        json.dump({'target': target.name, 'target_size': os.path.getsize(tmp),
+                   'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, target)
+    _remove_plain(source)
+    marker.unlink()
+    return target
+
+
+def _remove_plain(source: Path) -> None:
+    source.unlink(missing_ok=True)
+    if data_suffix(source) == '.csv':
+        # The sparse index holds offsets into the uncompressed CSV file
+        source.with_suffix('.idx').unlink(missing_ok=True)
+
+
+def finish_commits(storage_path) -> int:
+    """
+    Complete archive swaps interrupted by a crash: a plain file whose
+    archive was already moved into place (and that hasn't changed since)
+    is removed. Returns the number of files removed.
+    """
+    finished = 0
+    for marker in Path(storage_path).glob('sensor_data_*.archived'):
+        source = marker.with_name(marker.name[:-len('.archived')])
+        try:
+            with open(marker) as f:
+                entry = json.load(f)
+            stat = os.stat(source)
+            target = source.with_name(entry['target'])
+            if (os.path.getsize(target) == entry['target_size'] and
+                    (stat.st_size, stat.st_mtime_ns) == (entry['size'], entry['mtime_ns'])):
+                _remove_plain(source)
+                finished += 1
+        except (OSError, ValueError, KeyError, TypeError):
+            pass  # Torn marker (nothing was moved yet), no plain file or no archive
+        marker.unlink()
+    return finished
+
+
+def archive_file(path, codec: str = DEFAULT_CODEC) -> ArchiveResult:
+    """Compress one closed daily file in place"""
+    source = Path(path)
+    if source.suffix == '.dlt':
+        from data_management import delta_format  # delta_format imports this module
+        delta_format.recover(source)
+    started = time.perf_counter()
+    original_size = os.path.getsize(source)
+    target = archive_path(source, codec)
+    previous_size = os.path.getsize(target) if target.exists() else 0
+    target = commit(source, compress(source, codec))
+    return ArchiveResult(source, target, original_size, os.path.getsize(target) - previous_size,
+                         time.perf_counter() - started)
+
+
+def closed_files(storage_path, before: Optional[date] = None) -> List[Path]:
+    """Plain daily files dated before `before` (default: today), oldest first"""
+    before = before or datetime.now().date()
+    files = []
+    for path in Path(storage_path).glob('sensor_data_*'):
+        if path.suffix not in DATA_SUFFIXES:
+            continue
+        try:
+            day = file_day(path)
+        except ValueError:
+            continue  # Not a daily file
+        if day < before:
+            files.append((day, path))
+    return [path for _, path in sorted(files)]
+
+
+def archive_directory(storage_path, codec: str = DEFAULT_CODEC,
+                      before: Optional[date] = None) -> List[ArchiveResult]:
+    """
+    Archive every closed daily file of a storage directory. Only for
+    directories no CSVHandler is writing to; a running app uses
+    CSVHandler.archive_closed_days().
+    """
+    finish_commits(storage_path)
+    return [archive_file(path, codec) for path in closed_files(storage_path, before)]
+
+
+def format_report(results: List[ArchiveResult]) -> str:
+    """One line per archived file plus the overall ratio"""
+    lines = [f"{r.source.name:<32} {r.original_size:>12} -> {r.archived_size:>10} bytes  "
+             f"{r.ratio:5.1f}x  {r.seconds:6.2f} s" for r in results]
+    original = sum(r.original_size for r in results)
+    archived = sum(r.archived_size for r in results)
+    ratio = original / archived if archived else 0.0
+    lines.append(f"{len(results)} file(s), {original} -> {archived} bytes ({ratio:.1f}x)")
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compress closed daily sensor files')
+    parser.add_argument('storage_path', help='Directory holding sensor_data_*.csv/.bin files')
+    parser.add_argument('--codec', choices=sorted(CODECS), default=DEFAULT_CODEC)
+    parser.add_argument('--before', type=date.fromisoformat, default=None,
+                        help='Archive days before this date (default: today)')
+    args = parser.parse_args()
+    print(format_report(archive_directory(args.storage_path, args.codec, args.before)))
@@ -0,0 +1,188 @@
+"""
+Fixed-width binary storage format for sensor readings
+
+A daily binary file is a 16 byte header followed by 20 byte records:
+
+    header: magic b'SNSB', uint16 version, uint16 record size, 8 reserved bytes
+    record: float64 epoch seconds, float32 temperature, float32 pH, float32 glucose
+
+All values are little-endian, so a file can be mapped directly with
+numpy.fromfile(path, dtype=RECORD_DTYPE, offset=HEADER.size) or read with
+struct.iter_unpack, without any text parsing.
+"""
+
+import argparse
+import csv
+import struct
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Iterator, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+MAGIC = b'SNSB'
+VERSION = 1
+HEADER = struct.Struct('<4sHH8x')
+RECORD = struct.Struct('<dfff')
+VALUES = struct.Struct('<fff')  # The channel part of a record
+FIELDNAMES = ['timestamp', 'temperature', 'ph', 'glucose']
+
+# Records read per chunk when streaming
+CHUNK_RECORDS = 4096
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([
+        ('timestamp', '<f8'),
+        ('temperature', '<f4'),
+        ('ph', '<f4'),
+        ('glucose', '<f4'),
+    ])
+else:
+    RECORD_DTYPE = None
+
+
+def write_header(f: BinaryIO) -> None:
+    """Write the file header at the current position"""
+    f.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+
+
+def read_header(f: BinaryIO) -> None:
+    """Read and validate the file header"""
+    data = f.read(HEADER.size)
+    if len(data) < HEADER.size:
+        raise ValueError("Binary sensor file is missing its header")
+    magic, version, record_size = HEADER.unpack(data)
+    if magic != MAGIC or record_size != RECORD.size:
+        raise ValueError("Not a binary sensor data file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported binary sensor file version {version}")
+
+
+def pack_record(timestamp: float, temperature: float, ph: float, glucose: float) -> bytes:
+    """Pack one reading (timestamp as epoch seconds)"""
+    return RECORD.pack(timestamp, temperature, ph, glucose)
+
+
+def round_values(temperature: float, ph: float, glucose: float) -> Tuple[float, float, float]:
+    """Readings as they read back from a binary file (float32 channels)"""
+    return VALUES.unpack(VALUES.pack(temperature, ph, glucose))
+
+
+def iter_records(path) -> Iterator[Tuple[float, float, float, float]]:
+    """Stream (epoch, temperature, ph, glucose) tuples from a binary file"""
+    with open(path, 'rb') as f:
+        yield from iter_stream(f)
+
+
+def iter_stream(f: BinaryIO) -> Iterator[Tuple[float, float, float, float]]:
+    """Stream records from an open binary file object (e.g. a decompressing one)"""
+    read_header(f)
+    while True:
+        chunk = f.read(RECORD.size * CHUNK_RECORDS)
+        # A torn final record (e.g. after a crash) is ignored
+        usable = len(chunk) - len(chunk) % RECORD.size
+        if usable:
+            yield from RECORD.iter_unpack(chunk[:usable])
+        if len(chunk) < RECORD.size * CHUNK_RECORDS:
+            return
+
+
+def read_records(path):
+    """Read a whole binary file as a NumPy structured array"""
+    if np is None:
+        raise ImportError("numpy is required to read binary files as arrays")
+    with open(path, 'rb') as f:
+        read_header(f)
+        size = f.seek(0, 2)
+    count = (size - HEADER.size) // RECORD.size
+    return np.fromfile(path, dtype=RECORD_DTYPE, count=count, offset=HEADER.size)
+
+
+def read_stream(f: BinaryIO):
+    """Read the records of an open binary file object as a NumPy structured array"""
+    if np is None:
+        raise ImportError("numpy is required to read binary files as arrays")
+    read_header(f)
+    data = f.read()
+    # A torn final record (e.g. after a crash) is ignored
+    return np.frombuffer(data, dtype=RECORD_DTYPE, count=len(data) // RECORD.size)
+
+
+def format_float32(value: float) -> str:
+    """Shortest decimal text that reads back as the same float32"""
+    target = struct.pack('<f', value)
+    for digits in range(10):
+        candidate = round(value, digits)
+        if struct.pack('<f', candidate) == target:
+            return repr(candidate)
+    return repr(value)
+
+
+def csv_to_binary(csv_path, binary_path) -> int:
+    """Convert a daily CSV file to the binary format, returning the record count"""
+    count = 0
+    with open(csv_path, 'r', newline='') as src, open(binary_path, 'wb') as dst:
+        write_header(dst)
+        reader = csv.reader(src)
+        header = next(reader, None) or FIELDNAMES
+        cols = [header.index(name) for name in FIELDNAMES]
+        for row in reader:
+            if not row:
+                continue
+            dst.write(RECORD.pack(
+                datetime.fromisoformat(row[cols[0]]).timestamp(),
+                *(float(row[col]) for col in cols[1:])
+            ))
+            count += 1
+    return count
+
+
+def binary_to_csv(binary_path, csv_path) -> int:
+    """Convert a binary file to the daily CSV format, returning the row count"""
+    count = 0
+    with open(csv_path, 'w', newline='') as dst:
+        writer = csv.writer(dst)
+        writer.writerow(FIELDNAMES)
+        for epoch, temperature, ph, glucose in iter_records(binary_path):
+            writer.writerow([
+                datetime.fromtimestamp(epoch).isoformat(),
+                format_float32(temperature),
+                format_float32(ph),
+                format_float32(glucose)
+            ])
+            count += 1
+    return count
+
+
+def convert_directory(storage_path, to_format: str, remove_source: bool = False) -> int:
+    """Convert every daily file in a storage directory to 'csv' or 'binary'"""
+    if to_format not in ('csv', 'binary'):
+        raise ValueError("to_format must be 'csv' or 'binary'")
+    storage_path = Path(storage_path)
+    source_ext, convert = ('.csv', csv_to_binary) if to_format == 'binary' else ('.bin', binary_to_csv)
+    target_ext = '.bin' if to_format == 'binary' else '.csv'
+
+    converted = 0
+    for source in sorted(storage_path.glob(f'sensor_data_*{source_ext}')):
+        target = source.with_suffix(target_ext)
+        if target.exists():
+            print(f"Skipping {source.name}: {target.name} already exists")
+            continue
+        convert(source, target)
+        if remove_source:
+            source.unlink()
+        converted += 1
+    return converted
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert daily sensor files between CSV and binary')
+    parser.add_argument('storage_path', help='Directory holding sensor_data_*.csv/.bin files')
+    parser.add_argument('to_format', choices=['csv', 'binary'])
+    parser.add_argument('--remove-source', action='store_true', help='Delete files after converting')
+    args = parser.parse_args()
+    print(f"Converted {convert_directory(args.storage_path, args.to_format, args.remove_source)} file(s)")
@@ -4,108 +4,710 @@ CSV data handler for persistent storage
 
 import csv
 import os
-from datetime import datetime
+import threading
+import time
+from array import array
+from datetime import date, datetime
 from pathlib import Path
-from typing import List
-from data_management.sensor_data import SensorReading
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from data_management import archive, binary_format, delta_format, fast_csv, parallel_loader
+from data_management.csv_index import INDEX_STRIDE, CSVIndex
+from data_management.rollup import RollupStore
+from data_management.summary_store import SummaryStore
+from data_management.mmap_reader import MappedDayFile
+from data_management.sensor_data import ReadingsView, SensorReading, to_epoch
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+FIELDNAMES = ['timestamp', 'temperature', 'ph', 'glucose']
+DURABILITY_MODES = ('flush', 'fsync')
+# Storage format -> daily file extension
+FILE_FORMATS = {'csv': '.csv', 'binary': '.bin', 'delta': '.dlt'}
+OUTPUT_MODES = ('dict', 'tuple', 'columns')
+LOAD_OUTPUTS = ('dict', 'columns', 'readings')
+
+
+def write_export(export_path: Path, readings: Sequence[SensorReading],
+                 index_stride: int = INDEX_STRIDE) -> None:
+    """Write readings to a CSV file with its sparse index"""
+    index = CSVIndex(index_stride)
+    with open(export_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        offset = writer.writeheader()
+        
+        for reading in readings:
+            length = writer.writerow({
+                'timestamp': reading.timestamp.isoformat(),
+                'temperature': reading.temperature,
+                'ph': reading.ph,
+                'glucose': reading.glucose
+            })
+            index.add_row(offset, reading.timestamp.timestamp(), length)
+            offset += length
+    
+    index.mark_current(export_path)
+    index.save(export_path)
 
 
 class CSVHandler:
-    """Handles reading and writing sensor data to CSV files"""
+    """
+    Handles reading and writing sensor data to CSV files.
     
-    def __init__(self, storage_path: str = './sensor_data'):
+    The daily file is kept open for appending. Rows are flushed once
+    `flush_rows` rows are pending or `flush_interval` seconds have passed
+    since the last flush, and always on flush()/close(). With durability
+    'fsync' every flush is also forced to storage. Writes and flushes are
+    serialised by a lock so a background writer thread can own the saves.
+    
+    New rows are written in `file_format`: 'csv', the fixed-width
+    'binary' format (binary_format.py) or 'delta', blocks of delta-encoded
+    readings at sensor resolution (delta_format.py). Reads accept daily
+    files in any of them. CSV files get a sparse sidecar index (csv_index.py)
+    with the byte offset of every `index_stride`-th row, which time range
+    reads use to seek past earlier rows. Every saved row is also folded
+    into 1 min / 15 min / 1 h rollup tiers (rollup.py) for long-range views.
+    
+    Closed days can be compressed with archive_closed_days() (archive.py);
+    every reader streams archived days transparently.
+    """
+    
+    def __init__(self, storage_path: str = './sensor_data', flush_rows: int = 1,
+                 flush_interval: Optional[float] = None, durability: str = 'flush',
+                 file_format: str = 'csv', index_stride: int = INDEX_STRIDE):
         """Initialize CSV handler"""
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {DURABILITY_MODES}")
+        if file_format not in FILE_FORMATS:
+            raise ValueError(f"file_format must be one of {tuple(FILE_FORMATS)}")
+        self.file_format = file_format
+        
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
         
-        # Create daily CSV file names
+        # Write buffering
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval = flush_interval
+        self.durability = durability
+        self._handle = None
+        self._writer = None
+        self._pending_rows = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+        self._mapped = {}  # Path -> MappedDayFile
+        self.index_stride = index_stride
+        self._index = None  # CSVIndex of the open daily CSV file
+        self._index_saved_entries = 0
+        # Per-file aggregates for multi-day statistics (summary_store.py)
+        self._summaries = SummaryStore(self.storage_path, self._scan_rows)
+        self._summary = None  # FileSummary of the open daily file
+        self._rollups = RollupStore(self.storage_path)
+        # Before anything is appended to a plain file that is already archived
+        archive.finish_commits(self.storage_path)
+        
+        # Create daily file names
         self.current_date = datetime.now().date()
-        self.csv_file = self.storage_path / f"sensor_data_{self.current_date}.csv"
+        self.csv_file = self._daily_path(self.current_date)
         
-        # Initialize CSV file if it doesn't exist
-        self._initialize_csv_file()
+        # Initialize daily file if it doesn't exist
+        self._initialize_daily_file()
+    
+    def __enter__(self):
+        return self
     
-    def _initialize_csv_file(self):
-        """Create CSV file with headers if it doesn't exist"""
-        if not self.csv_file.exists():
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _daily_path(self, day: date) -> Path:
+        return self.storage_path / f"sensor_data_{day}{FILE_FORMATS[self.file_format]}"
+    
+    def _initialize_daily_file(self):
+        """Create the daily file with its header if it doesn't exist (or is empty)"""
+        if self.csv_file.exists() and self.csv_file.stat().st_size:
+            return
+        if self.file_format == 'binary':
+            with open(self.csv_file, 'wb') as f:
+                binary_format.write_header(f)
+        elif self.file_format == 'delta':
+            with open(self.csv_file, 'wb') as f:
+                delta_format.write_header(f)
+        else:
             with open(self.csv_file, 'w', newline='') as f:
-                writer = csv.DictWriter(
-                    f,
-                    fieldnames=['timestamp', 'temperature', 'ph', 'glucose']
-                )
+                writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
                 writer.writeheader()
     
+    def _open_daily_file(self, day: date) -> None:
+        """Point the append handle at the daily file for `day`"""
+        if self._handle is not None and day == self.current_date:
+            return
+        
+        # Rotating: close the previous day's file so no buffered rows are lost
+        self._close_handle()
+        self.current_date = day
+        self.csv_file = self._daily_path(day)
+        if self.csv_file.exists():
+            self._trim_torn_tail()
+        self._initialize_daily_file()
+        self._summary = self._summaries.get(self.csv_file)
+        if self.file_format == 'binary':
+            self._handle = open(self.csv_file, 'ab')
+        elif self.file_format == 'delta':
+            self._handle = delta_format.BlockWriter(self.csv_file, durable=self.durability == 'fsync')
+        else:
+            self._index = CSVIndex.for_file(self.csv_file, self.index_stride)
+            self._index.end_offset = os.path.getsize(self.csv_file)
+            self._index_saved_entries = len(self._index.offsets)
+            self._handle = open(self.csv_file, 'a', newline='')
+            self._writer = csv.DictWriter(self._handle, fieldnames=FIELDNAMES)
+    
+    def _trim_torn_tail(self) -> None:
+        """
+        Cut a row left half-written by a crash off the end of the daily
+        file, so new rows are not appended onto it (delta files are
+        repaired by BlockWriter)
+        """
+        if self.file_format == 'delta':
+            return
+        with open(self.csv_file, 'rb+') as f:
+            size = end = f.seek(0, os.SEEK_END)
+            if self.file_format == 'binary':
+                # Back to the last whole record; a torn header leaves an empty file
+                if size >= binary_format.HEADER.size:
+                    end -= (size - binary_format.HEADER.size) % binary_format.RECORD.size
+                else:
+                    end = 0
+                if end != size:
+                    f.truncate(end)
+                return
+            # Back to the last newline, reading 4 KiB blocks from the end
+            while end > 0:
+                block = max(end - 4096, 0)
+                f.seek(block)
+                newline = f.read(end - block).rfind(b'\n')
+                if newline >= 0:
+                    end = block + newline + 1
+                    break
+                end = block
+            if end != size:
+                f.truncate(end)
+    
+    def _close_handle(self) -> None:
+        """Flush and close the append handle if one is open"""
+        if self._handle is None:
+            return
+        try:
+            self._flush_handle()
+            if self._index is not None:
+                self._save_index()
+            self._summaries.save_if_due(0)
+            self._rollups.flush()
+        finally:
+            self._handle.close()
+            self._handle = None
+            self._writer = None
+            self._index = None
+            self._summary = None
+    
+    def _flush_handle(self) -> None:
+        self._handle.flush()
+        if self.durability == 'fsync':
+            os.fsync(self._handle.fileno())
+        self._pending_rows = 0
+        self._last_flush = time.monotonic()
+        self._summaries.mark_current(self.csv_file)
+        self._summaries.save_if_due()
+        self._rollups.flush(force=False)
+        # Rows appended since the last save are re-indexed from the tail on
+        # reopen, so the sidecar only needs rewriting when entries were added
+        if self._index is not None and len(self._index.offsets) != self._index_saved_entries:
+            self._save_index()
+    
+    def _save_index(self) -> None:
+        try:
+            self._index.mark_current(self.csv_file)
+            self._index.save(self.csv_file)
+            self._index_saved_entries = len(self._index.offsets)
+        except OSError as e:
+            print(f"Error saving CSV index: {e}")
+    
     def save_sensor_reading(self, data: dict) -> bool:
         """Save a single sensor reading to CSV"""
         try:
-            # Check if we need to create a new daily file
-            today = datetime.now().date()
-            if today != self.current_date:
-                self.current_date = today
-                self.csv_file = self.storage_path / f"sensor_data_{self.current_date}.csv"
-                self._initialize_csv_file()
-            
-            with open(self.csv_file, 'a', newline='') as f:
-                writer = csv.DictWriter(
-                    f,
-                    fieldnames=['timestamp', 'temperature', 'ph', 'glucose']
-                )
-                writer.writerow({
-                    'timestamp': data.get('timestamp', datetime.now().isoformat()),
-                    'temperature': data.get('temperature', 0),
-                    'ph': data.get('ph', 7.0),
-                    'glucose': data.get('glucose', 0)
-                })
+            with self._lock:
+                self._write_row(data)
+                self.flush_if_due()
             return True
         except Exception as e:
             print(f"Error saving sensor reading: {e}")
             return False
     
-    def load_sensor_readings(self, date=None) -> List[dict]:
-        """Load sensor readings from CSV"""
+    def save_sensor_readings(self, readings: List[dict]) -> int:
+        """Save a batch of readings, returning how many were written"""
+        saved = 0
+        try:
+            with self._lock:
+                for data in readings:
+                    self._write_row(data)
+                    saved += 1
+                self.flush_if_due()
+        except Exception as e:
+            print(f"Error saving sensor readings: {e}")
+        return saved
+    
+    def save_columns(self, columns: Dict[str, Sequence[float]]) -> int:
+        """
+        Save a batch of readings given column-wise (as returned by
+        ReadingsView.columns(), timestamps in epoch seconds), returning
+        how many were written. Skips the per-reading dicts and ISO
+        timestamp parsing of save_sensor_readings().
+        """
+        saved = 0
+        try:
+            with self._lock:
+                rows = zip(columns['timestamp'], columns['temperature'],
+                           columns['ph'], columns['glucose'])
+                if self.file_format != 'csv':
+                    saved = self._write_binary_rows(rows)
+                else:
+                    for epoch, *values in rows:
+                        dt = datetime.fromtimestamp(epoch)
+                        self._write_csv_row(dt.isoformat(), dt, tuple(map(float, values)))
+                        saved += 1
+                self.flush_if_due()
+        except Exception as e:
+            print(f"Error saving sensor readings: {e}")
+        return saved
+    
+    def _write_binary_rows(self, rows) -> int:
+        """
+        Append (epoch, temperature, ph, glucose) rows, one write per daily
+        run. The whole batch is converted to its stored values first, so a
+        reading the format can't hold rejects the batch before anything is
+        written, and rows reach the summaries and rollups once written.
+        """
+        records = []
+        for row in rows:
+            epoch, *values = map(float, row)
+            records.append((epoch,) + self._stored_values(values))
+        
+        start = 0
+        while start < len(records):
+            day = datetime.fromtimestamp(records[start][0]).date()
+            stop = start + 1
+            while stop < len(records) and datetime.fromtimestamp(records[stop][0]).date() == day:
+                stop += 1
+            self._open_daily_file(day)
+            self._write_records(records[start:stop])
+            for epoch, *values in records[start:stop]:
+                self._summary.add(epoch, *values)
+                self._rollups.add(epoch, values)
+            self._pending_rows += stop - start
+            start = stop
+        return len(records)
+    
+    def _write_records(self, records: List[tuple]) -> None:
+        """Append (epoch, temperature, ph, glucose) records to the open binary or delta file"""
+        if self.file_format == 'delta':
+            self._handle.write_records(records)
+        else:
+            self._handle.write(b''.join(binary_format.pack_record(*record) for record in records))
+    
+    def _stored_values(self, values) -> tuple:
+        """
+        Channel values as they will read back (float32 in binary files,
+        sensor resolution in delta files), so summaries and rollups match
+        a rescan of the file
+        """
+        if self.file_format == 'binary':
+            return binary_format.round_values(*values)
+        if self.file_format == 'delta':
+            return delta_format.round_values(*values)
+        return tuple(values)
+    
+    def _write_row(self, data: dict) -> None:
+        timestamp = data.get('timestamp', datetime.now().isoformat())
+        values = (
+            float(data.get('temperature', 0)),
+            float(data.get('ph', 7.0)),
+            float(data.get('glucose', 0))
+        )
+        if self.file_format != 'csv':
+            epoch = to_epoch(timestamp)
+            self._open_daily_file(datetime.fromtimestamp(epoch).date())
+            values = self._stored_values(values)
+            self._write_records([(epoch,) + values])
+            self._summary.add(epoch, *values)
+            self._rollups.add(epoch, values)
+            self._pending_rows += 1
+            return
+        
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.isoformat()
+        self._write_csv_row(timestamp, datetime.fromisoformat(timestamp), values, data)
+    
+    def _write_csv_row(self, timestamp: str, dt: datetime, values: Tuple[float, float, float],
+                       data: Optional[dict] = None) -> None:
+        # Rows go to the daily file of their own timestamp
+        self._open_daily_file(dt.date())
+        offset = self._index.end_offset
+        if data is None:
+            row = dict(zip(FIELDNAMES[1:], values))
+        else:
+            row = {
+                'temperature': data.get('temperature', 0),
+                'ph': data.get('ph', 7.0),
+                'glucose': data.get('glucose', 0)
+            }
+        row['timestamp'] = timestamp
+        length = self._writer.writerow(row)
+        # Rows are ASCII, so characters written == bytes written
+        epoch = dt.timestamp()
+        self._index.add_row(offset, epoch, length)
+        self._summary.add(epoch, *values)
+        self._rollups.add(epoch, values)
+        self._pending_rows += 1
+    
+    def flush_if_due(self) -> bool:
+        """Flush pending rows if the row-count or time threshold is reached"""
+        with self._lock:
+            if not self._pending_rows:
+                return False
+            if self._pending_rows >= self.flush_rows or (
+                    self.flush_interval is not None and
+                    time.monotonic() - self._last_flush >= self.flush_interval):
+                return self.flush()
+            return False
+    
+    def flush(self) -> bool:
+        """Write pending rows to the daily file"""
+        try:
+            with self._lock:
+                if self._handle is not None:
+                    self._flush_handle()
+            return True
+        except Exception as e:
+            print(f"Error flushing sensor readings: {e}")
+            return False
+    
+    def close(self) -> None:
+        """Flush pending rows and release the daily file handle"""
+        try:
+            with self._lock:
+                self._close_handle()
+                for mapped in self._mapped.values():
+                    mapped.close()
+                self._mapped.clear()
+        except Exception as e:
+            print(f"Error closing CSV file: {e}")
+    
+    def load_sensor_readings(self, date=None, output: str = 'dict'):
+        """
+        Load sensor readings from the daily file(s) of a date.
+        
+        `output` is 'dict' (a list of dicts, file order), 'columns' (a dict
+        of arrays in time order, as load_range returns) or 'readings' (a
+        ReadingsView in time order that builds SensorReading objects only
+        when they are accessed).
+        """
+        if output not in LOAD_OUTPUTS:
+            raise ValueError(f"output must be one of {LOAD_OUTPUTS}")
+        self.flush()
         try:
             if date is None:
                 date = datetime.now().date()
             
-            csv_file = self.storage_path / f"sensor_data_{date}.csv"
-            
-            if not csv_file.exists():
-                return []
-            
+            mode = 'dict' if output == 'dict' else 'columns'
             readings = []
-            with open(csv_file, 'r', newline='') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    readings.append({
-                        'timestamp': datetime.fromisoformat(row['timestamp']),
-                        'temperature': float(row['temperature']),
-                        'ph': float(row['ph']),
-                        'glucose': float(row['glucose'])
-                    })
-            return readings
+            for day, daily_file in self._daily_files():
+                if str(day) == str(date):
+                    readings.extend(self._iter_file(daily_file, None, None, FIELDNAMES, mode))
+            if output == 'dict':
+                return readings
+            parts = [[chunk[name] for name in FIELDNAMES] for chunk in readings]
+            return self._load_output(dict(zip(FIELDNAMES, self._merge_parts(parts, FIELDNAMES))), output)
         except Exception as e:
             print(f"Error loading sensor readings: {e}")
-            return []
+            return [] if output == 'dict' else self._load_output(None, output)
     
-    def load_all_readings(self) -> List[dict]:
-        """Load all sensor readings from all CSV files"""
+    def load_all_readings(self, output: str = 'dict'):
+        """Load all sensor readings from all daily files (`output` as for load_sensor_readings)"""
+        if output not in LOAD_OUTPUTS:
+            raise ValueError(f"output must be one of {LOAD_OUTPUTS}")
+        if output != 'dict':
+            return self._load_output(self.load_range(), output)
+        
         all_readings = []
         try:
-            for csv_file in sorted(self.storage_path.glob('sensor_data_*.csv')):
-                with open(csv_file, 'r', newline='') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        all_readings.append({
-                            'timestamp': datetime.fromisoformat(row['timestamp']),
-                            'temperature': float(row['temperature']),
-                            'ph': float(row['ph']),
-                            'glucose': float(row['glucose'])
-                        })
+            all_readings.extend(self.iter_readings())
         except Exception as e:
             print(f"Error loading all readings: {e}")
         
         return all_readings
     
+    def _load_output(self, columns: Optional[Dict[str, object]], output: str):
+        """Shape loaded columns as requested (None: nothing could be loaded)"""
+        if columns is None:
+            columns = dict(zip(FIELDNAMES, self._merge_parts([], FIELDNAMES)))
+        if output == 'readings':
+            return ReadingsView(*(columns[name] for name in FIELDNAMES))
+        return columns
+    
+    def iter_readings(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      fields: Optional[Sequence[str]] = None,
+                      output: str = 'dict') -> Iterator:
+        """
+        Stream readings with start <= timestamp <= end across daily files.
+        
+        Files whose date (from the filename) lies outside the range are
+        skipped unopened, and iteration stops at the first file past `end`.
+        `output` selects what is yielded:
+          - 'dict': one dict per row with a datetime timestamp
+          - 'tuple': one tuple per row in `fields` order, timestamp as epoch seconds
+          - 'columns': one dict of columns per daily file (NumPy arrays for
+            CSV files when numpy is installed, otherwise array('d'))
+        """
+        fields = parallel_loader.check_fields(fields)
+        if output not in OUTPUT_MODES:
+            raise ValueError(f"output must be one of {OUTPUT_MODES}")
+        
+        self.flush()
+        start_epoch = None if start is None else to_epoch(start)
+        end_epoch = None if end is None else to_epoch(end)
+        
+        for path in self._files_in_range(start_epoch, end_epoch):
+            yield from self._iter_file(path, start_epoch, end_epoch, fields, output)
+    
+    def load_range(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   fields: Optional[Sequence[str]] = None) -> Dict[str, object]:
+        """
+        Load readings with start <= timestamp <= end as per-channel arrays.
+        
+        Binary daily files are memory-mapped and sliced by binary search on
+        the timestamp column, so only the requested window is read; a window
+        inside one binary file is returned as zero-copy views. CSV files and
+        archived days are streamed and filtered. Arrays are NumPy arrays
+        when numpy is installed, otherwise array('d').
+        """
+        fields = parallel_loader.check_fields(fields)
+        
+        self.flush()
+        start_epoch = None if start is None else to_epoch(start)
+        end_epoch = None if end is None else to_epoch(end)
+        parts = []
+        try:
+            for path in self._files_in_range(start_epoch, end_epoch):
+                if path.suffix == FILE_FORMATS['binary'] and np is not None:
+                    window = self._mapped_file(path).slice_range(start_epoch, end_epoch)
+                    if len(window):
+                        parts.append([window[name] for name in fields])
+                elif archive.data_suffix(path) != FILE_FORMATS['csv'] and np is not None:
+                    # Archived binary or delta day: decoded into arrays
+                    parts.append(parallel_loader.read_file_columns(path, start_epoch, end_epoch, fields))
+                else:
+                    for chunk in self._iter_file(path, start_epoch, end_epoch, fields, 'columns'):
+                        parts.append([chunk[name] for name in fields])
+        except Exception as e:
+            print(f"Error loading sensor range: {e}")
+            parts = []
+        
+        return dict(zip(fields, self._merge_parts(parts, fields)))
+    
+    def load_range_parallel(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                            fields: Optional[Sequence[str]] = None, workers: Optional[int] = None,
+                            min_parallel_files: int = parallel_loader.MIN_PARALLEL_FILES
+                            ) -> Dict[str, object]:
+        """
+        Like load_range(), but daily files are parsed concurrently (see
+        parallel_loader.py): CSV files in worker processes, binary files
+        in threads. `workers` defaults to the CPU count; small ranges
+        (fewer than `min_parallel_files` files) are loaded serially.
+        """
+        fields = parallel_loader.check_fields(fields)
+        
+        self.flush()
+        start_epoch = None if start is None else to_epoch(start)
+        end_epoch = None if end is None else to_epoch(end)
+        try:
+            paths = list(self._files_in_range(start_epoch, end_epoch))
+            parts = parallel_loader.load_files(
+                paths, start_epoch, end_epoch, fields, workers, min_parallel_files
+            )
+        except Exception as e:
+            print(f"Error loading sensor range: {e}")
+            parts = []
+        
+        return dict(zip(fields, self._merge_parts(parts, fields)))
+    
+    def load_rollup(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    points: int = 500, tier: Optional[str] = None) -> dict:
+        """
+        Downsampled history for long-range views (see RollupStore.query).
+        
+        Picks the coarsest rollup tier that still gives at least `points`
+        buckets over the range unless `tier` ('1m', '15m' or '1h') is given.
+        Buckets still being filled are included. `end` defaults to now and
+        `start` to 24 hours before `end`.
+        """
+        end_epoch = to_epoch(end)
+        start_epoch = end_epoch - 86400 if start is None else to_epoch(start)
+        with self._lock:
+            return self._rollups.query(start_epoch, end_epoch, points, tier)
+    
+    def rebuild_rollups(self) -> int:
+        """Recreate the rollup tiers from every daily file, returning the row count"""
+        self.flush()
+        with self._lock:
+            rows = (row for _, path in self._daily_files() for row in self._scan_rows(path))
+            return self._rollups.rebuild(rows)
+    
+    def _merge_parts(self, parts: List[list], fields: List[str]) -> list:
+        """Concatenate per-file column chunks into one array per field"""
+        if np is None:
+            merged = [array('d') for _ in fields]
+            for part in parts:
+                for column, chunk in zip(merged, part):
+                    column.extend(chunk)
+            return merged
+        
+        if not parts:
+            return [np.empty(0) for _ in fields]
+        if len(parts) == 1:
+            merged = [np.asarray(chunk) for chunk in parts[0]]
+        else:
+            merged = [np.concatenate([np.asarray(part[i]) for part in parts])
+                      for i in range(len(fields))]
+        
+        # Late rows appended out of order: return the window in time order
+        if 'timestamp' in fields:
+            timestamps = merged[fields.index('timestamp')]
+            if np.any(timestamps[1:] < timestamps[:-1]):
+                order = np.argsort(timestamps, kind='stable')
+                merged = [column[order] for column in merged]
+        return merged
+    
+    def _mapped_file(self, path: Path) -> MappedDayFile:
+        """Get a memory map of a binary daily file, remapping it if it changed"""
+        mapped = self._mapped.get(path)
+        if mapped is None or not mapped.is_current():
+            if mapped is not None:
+                mapped.close()
+            # Appended to since: only the new records are checked for order
+            mapped = MappedDayFile(path, mapped)
+            self._mapped[path] = mapped
+        return mapped
+    
+    def _files_in_range(self, start: Optional[float], end: Optional[float]) -> Iterator[Path]:
+        """Daily files whose date (from the filename) can hold the epoch range"""
+        first_day = None if start is None else datetime.fromtimestamp(start).date()
+        last_day = None if end is None else datetime.fromtimestamp(end).date()
+        for day, path in self._daily_files():
+            if first_day is not None and day < first_day:
+                continue
+            if last_day is not None and day > last_day:
+                break
+            yield path
+    
+    def _daily_files(self) -> List[Tuple[date, Path]]:
+        """Get (date, path) of every daily file (archived or not), oldest first"""
+        files = []
+        for path in self.storage_path.glob('sensor_data_*'):
+            if archive.data_suffix(path) not in FILE_FORMATS.values():
+                continue
+            try:
+                day = archive.file_day(path)
+            except ValueError:
+                continue  # Not a daily file
+            files.append((day, path))
+        files.sort()
+        return files
+    
+    def _iter_file(self, path: Path, start: Optional[float], end: Optional[float],
+                   fields: List[str], output: str) -> Iterator:
+        """Stream the rows of one daily file, decompressing archived days as they are read"""
+        if archive.data_suffix(path) != FILE_FORMATS['csv']:
+            yield from self._iter_binary_file(path, start, end, fields, output)
+            return
+        
+        # With a time-ordered file the sparse index lets us seek to the
+        # first candidate row and stop at the first row past `end`
+        offset, stop_early = None, False
+        if not archive.is_archived(path) and (start is not None or end is not None):
+            index = self._csv_index(path)
+            stop_early = index.monotonic
+            offset = None if start is None else index.seek_offset(start)
+        
+        if np is not None:
+            # Vectorised parse (fast_csv.py), None if the file needs the fallback
+            columns = fast_csv.read_csv_range(path, fields, start, end, offset)
+            if columns is not None:
+                if output == 'columns':
+                    if fields and len(columns[0]):
+                        yield dict(zip(fields, columns))
+                elif output == 'tuple':
+                    yield from zip(*(column.tolist() for column in columns))
+                else:
+                    yield from fast_csv.to_readings(dict(zip(fields, columns)))
+                return
+        
+        rows = parallel_loader.iter_csv_rows(path, start, end, fields, offset, stop_early)
+        if output == 'columns':
+            columns = [array('d') for _ in fields]
+            for _, values in rows:
+                for column, value in zip(columns, values):
+                    column.append(value)
+            if fields and len(columns[0]):
+                yield dict(zip(fields, columns))
+        elif output == 'tuple':
+            for _, values in rows:
+                yield tuple(values)
+        else:
+            for dt, values in rows:
+                reading = dict(zip(fields, values))
+                if 'timestamp' in reading:
+                    reading['timestamp'] = dt
+                yield reading
+    
+    def _csv_index(self, path: Path) -> CSVIndex:
+        """Get the sparse index of a CSV daily file"""
+        with self._lock:
+            if self._index is not None and path == self.csv_file:
+                return self._index  # Tracks our own appends, already flushed
+        return CSVIndex.for_file(path, self.index_stride)
+    
+    def _iter_binary_file(self, path: Path, start: Optional[float], end: Optional[float],
+                          fields: List[str], output: str) -> Iterator:
+        """Stream the records of one binary or delta daily file"""
+        positions = [FIELDNAMES.index(name) for name in fields]
+        columns = [array('d') for _ in fields] if output == 'columns' else None
+        
+        with archive.open_daily(path) as f:
+            if archive.data_suffix(path) == FILE_FORMATS['delta']:
+                records = delta_format.iter_stream(f, start, end)  # Skips blocks outside the range
+            else:
+                records = binary_format.iter_stream(f)
+            for record in records:
+                epoch = record[0]
+                if (start is not None and epoch < start) or (end is not None and epoch > end):
+                    continue
+                
+                values = [record[i] for i in positions]
+                if output == 'dict':
+                    reading = dict(zip(fields, values))
+                    if 'timestamp' in reading:
+                        reading['timestamp'] = datetime.fromtimestamp(epoch)
+                    yield reading
+                elif output == 'tuple':
+                    yield tuple(values)
+                else:
+                    for column, value in zip(columns, values):
+                        column.append(value)
+        
+        if columns is not None and fields and len(columns[0]):
+            yield dict(zip(fields, columns))
+    
     def export_all_data(self, readings: List[SensorReading], filename: str = None) -> str:
         """Export all readings to a named CSV file"""
         try:
@@ -113,40 +715,103 @@ class CSVHandler:
                 filename = f"sensor_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
             
             export_path = self.storage_path / filename
-            
-            with open(export_path, 'w', newline='') as f:
-                writer = csv.DictWriter(
-                    f,
-                    fieldnames=['timestamp', 'temperature', 'ph', 'glucose']
-                )
-                writer.writeheader()
-                
-                for reading in readings:
-                    writer.writerow({
-                        'timestamp': reading.timestamp.isoformat(),
-                        'temperature': reading.temperature,
-                        'ph': reading.ph,
-                        'glucose': reading.glucose
-                    })
-            
+            write_export(export_path, readings, self.index_stride)
             return str(export_path)
         except Exception as e:
             print(f"Error exporting data: {e}")
             return ""
     
+    def archive_closed_days(self, codec: str = archive.DEFAULT_CODEC,
+                            before: Optional[date] = None) -> List[archive.ArchiveResult]:
+        """
+        Compress the plain daily files dated before `before` (default:
+        today) and report each file's compression ratio.
+        
+        Meant for a background thread: files are compressed without holding
+        the write lock, which is only taken to swap the archive in. A file
+        that received a late reading meanwhile is left for the next run.
+        """
+        results = []
+        for path in archive.closed_files(self.storage_path, before):
+            try:
+                with self._lock:
+                    if self._handle is not None and path == self.csv_file:
+                        continue  # Reopened for late readings
+                    if path.suffix == FILE_FORMATS['delta']:
+                        delta_format.recover(path)  # Before the journal is left behind
+                    self._summaries.get(path)
+                    stat = os.stat(path)
+                
+                started = time.perf_counter()
+                target = archive.archive_path(path, codec)
+                previous_size = os.path.getsize(target) if target.exists() else 0
+                tmp = archive.compress(path, codec)
+                
+                with self._lock:
+                    current = os.stat(path)
+                    if (self._handle is not None and path == self.csv_file) or (
+                            current.st_size, current.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+                        os.remove(tmp)
+                        continue
+                    mapped = self._mapped.pop(path, None)
+                    if mapped is not None:
+                        mapped.close()
+                    archive.commit(path, tmp)
+                    self._summaries.rename(path, target)
+                    self._summaries.save_if_due(0)
+                
+                results.append(archive.ArchiveResult(
+                    path, target, stat.st_size, os.path.getsize(target) - previous_size,
+                    time.perf_counter() - started
+                ))
+            except Exception as e:
+                print(f"Error archiving {path.name}: {e}")
+        return results
+    
     def get_storage_path(self) -> str:
         """Get the storage directory path"""
         return str(self.storage_path)
     
     def get_available_dates(self) -> List[str]:
-        """Get list of dates with available data"""
+        """Get list of dates with available data (answered from file summaries)"""
+        self.flush()
         dates = []
         try:
-            for csv_file in sorted(self.storage_path.glob('sensor_data_*.csv')):
-                # Extract date from filename
-                date_str = csv_file.stem.replace('sensor_data_', '')
-                dates.append(date_str)
+            with self._lock:
+                files = self._daily_files()
+                for day, path in files:
+                    date_str = str(day)
+                    if self._summaries.get(path).count and (not dates or dates[-1] != date_str):
+                        dates.append(date_str)
+                self._summaries.prune(path.name for _, path in files)
+                self._summaries.save_if_due(0)
         except Exception as e:
             print(f"Error getting available dates: {e}")
         
         return dates
+    
+    def get_statistics(self, start_date=None, end_date=None) -> dict:
+        """
+        Statistics over the daily files from start_date to end_date
+        (inclusive, default all), combined from per-file summaries in O(days).
+        Shaped like SensorData.get_statistics, plus first/last timestamps.
+        """
+        self.flush()
+        try:
+            start_date = date.fromisoformat(start_date) if isinstance(start_date, str) else start_date
+            end_date = date.fromisoformat(end_date) if isinstance(end_date, str) else end_date
+            with self._lock:
+                paths = [
+                    path for day, path in self._daily_files()
+                    if (start_date is None or day >= start_date) and (end_date is None or day <= end_date)
+                ]
+                stats = self._summaries.statistics(paths)
+                self._summaries.save_if_due(0)
+            return stats
+        except Exception as e:
+            print(f"Error computing statistics: {e}")
+            return {}
+    
+    def _scan_rows(self, path: Path) -> Iterator[tuple]:
+        """Rows of a daily file as (epoch, temperature, ph, glucose)"""
+        return self._iter_file(path, None, None, FIELDNAMES, 'tuple')
@@ -0,0 +1,162 @@
+"""
+Sparse sidecar time index for daily CSV files
+
+Every `stride`-th data row of sensor_data_<date>.csv is recorded in
+sensor_data_<date>.idx as (byte offset, epoch timestamp), so a time range
+query can seek close to its first row instead of parsing the whole day.
+"""
+
+import json
+import os
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+INDEX_STRIDE = 100
+INDEX_VERSION = 1
+
+
+class CSVIndex:
+    """Sparse byte-offset index of one daily CSV file"""
+
+    def __init__(self, stride: int = INDEX_STRIDE):
+        self.stride = max(1, int(stride))
+        self.rows = 0
+        self.offsets = []  # Byte offset of every stride-th row
+        self.epochs = []  # Timestamp of that row
+        self.monotonic = True  # Rows are in non-decreasing timestamp order
+        self.last_epoch = None
+        self.end_offset = 0  # Bytes of the file covered by the index
+        self.size = -1  # File size and mtime when last validated
+        self.mtime_ns = -1
+
+    @staticmethod
+    def sidecar_path(csv_path) -> Path:
+        return Path(csv_path).with_suffix('.idx')
+
+    def add_row(self, offset: int, epoch: float, length: int) -> None:
+        """Record a row of `length` bytes starting at `offset`"""
+        if self.rows % self.stride == 0:
+            self.offsets.append(offset)
+            self.epochs.append(epoch)
+        if self.last_epoch is not None and epoch < self.last_epoch:
+            self.monotonic = False
+        self.last_epoch = epoch
+        self.rows += 1
+        self.end_offset = offset + length
+
+    def scan(self, csv_path, from_offset: int = 0) -> None:
+        """Index rows from `from_offset` (0 = start of file) to the end of the file"""
+        with open(csv_path, 'rb') as f:
+            f.seek(from_offset)
+            offset = from_offset
+            if from_offset == 0:
+                header = f.readline()
+                offset = self.end_offset = len(header)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Torn final row, cut off when the file is next appended to
+                timestamp = line.split(b',', 1)[0].strip()
+                try:
+                    epoch = datetime.fromisoformat(timestamp.decode()).timestamp() if timestamp else None
+                except ValueError:
+                    epoch = None  # Unparseable row: skipped, like readers skip it
+                if epoch is not None:
+                    self.add_row(offset, epoch, len(line))
+                offset += len(line)
+                self.end_offset = offset
+
+    def seek_offset(self, start: float) -> Optional[int]:
+        """
+        Byte offset to start reading from so no row with timestamp >= start
+        is skipped, or None if the file must be scanned from the top.
+        """
+        if not self.monotonic or not self.offsets:
+            return None
+        i = bisect_left(self.epochs, start) - 1
+        return self.offsets[max(i, 0)]
+
+    def _spot_check(self, csv_path) -> bool:
+        """Cheaply confirm the indexed part of the file was not rewritten"""
+        if not self.offsets:
+            return False
+        with open(csv_path, 'rb') as f:
+            f.seek(self.end_offset - 1)
+            if f.read(1) != b'\n':
+                return False
+            f.seek(self.offsets[-1])
+            timestamp = f.readline().split(b',', 1)[0].strip()
+        try:
+            return datetime.fromisoformat(timestamp.decode()).timestamp() == self.epochs[-1]
+        except ValueError:
+            return False
+
+    def mark_current(self, csv_path) -> None:
+        """Record the file's size and mtime as matching this index"""
+        stat = os.stat(csv_path)
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+
+    def save(self, csv_path) -> None:
+        """Write the sidecar file atomically"""
+        sidecar = self.sidecar_path(csv_path)
+        tmp = sidecar.with_suffix('.idx.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                'stride': self.stride,
+                'rows': self.rows,
+                'monotonic': self.monotonic,
+                'last_epoch': self.last_epoch,
+                'end_offset': self.end_offset,
+                'size': self.size,
+                'mtime_ns': self.mtime_ns,
+                'offsets': self.offsets,
+                'epochs': self.epochs,
+            }, f)
+        os.replace(tmp, sidecar)
+
+    @classmethod
+    def load(cls, csv_path) -> Optional['CSVIndex']:
+        """Read the sidecar file, or None if it is missing or unreadable"""
+        try:
+            with open(cls.sidecar_path(csv_path)) as f:
+                data = json.load(f)
+            if data.get('version') != INDEX_VERSION:
+                return None
+            index = cls(data['stride'])
+            for key in ('rows', 'monotonic', 'last_epoch', 'end_offset',
+                        'size', 'mtime_ns', 'offsets', 'epochs'):
+                setattr(index, key, data[key])
+            return index
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    @classmethod
+    def for_file(cls, csv_path, stride: int = INDEX_STRIDE) -> 'CSVIndex':
+        """
+        Get a valid index for a CSV file.
+        The sidecar is trusted when the file's size and mtime match it. If
+        the file only grew (rows appended after the last save), the new tail
+        is indexed; if it was rewritten or the sidecar is missing, the index
+        is rebuilt from the CSV. Any change is written back to the sidecar.
+        """
+        stat = os.stat(csv_path)
+        index = cls.load(csv_path)
+        if index is not None and index.size == stat.st_size and index.mtime_ns == stat.st_mtime_ns:
+            return index
+
+        if index is not None and stat.st_size >= index.end_offset and index._spot_check(csv_path):
+            index.scan(csv_path, index.end_offset)
+        else:
+            index = cls(stride)
+            index.scan(csv_path)
+
+        index.mark_current(csv_path)
+        try:
+            index.save(csv_path)
+        except OSError as e:
+            print(f"Error saving CSV index: {e}")
+        return index
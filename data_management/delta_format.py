@@ -0,0 +1,482 @@
+"""
+Delta-encoded block storage format for sensor readings
+
+The sensor reports temperature in 0.1 degC, pH in 0.01 units and glucose in
+1 mg/dL steps at regular intervals, so a daily delta file stores readings
+at that resolution in blocks of up to BLOCK_SAMPLES readings:
+
+    file header:  magic b'SNSD', uint16 version, uint16 block samples, 8 reserved bytes
+    block header: uint16 count, uint32 payload size,
+                  int64 first / min / max timestamp (microseconds),
+                  int16 first / min / max value per channel (quantised)
+    payload:      zigzag varint delta-of-delta timestamps (the first one is
+                  the plain delta), then count - 1 int16 deltas per channel
+
+With a regular interval every delta-of-delta is 0 (one byte) and every
+channel delta is two bytes, about 7 bytes per reading instead of 20
+(binary) or ~45 (CSV). Channel deltas wrap modulo 2**16, so any int16
+value round-trips. Range scans read only block headers and skip the
+payload of blocks outside the requested time window.
+
+All values are little-endian. The block being filled is rewritten in place
+on every flush, so flushing often doesn't cut blocks short. Every block is
+first written to sensor_data_<date>.dlt.journal (offset, size, CRC-32 and
+the block), so a crash during the rewrite tears nothing that was flushed
+before: the torn final block is ignored on read and restored from the
+journal when the file is reopened for appending (or archived). A torn
+journal means the file itself was not touched yet.
+
+    python -m data_management.delta_format ./sensor_data --remove-source
+"""
+
+import argparse
+import csv
+import os
+import struct
+import zlib
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from data_management import archive, binary_format
+
+
+MAGIC = b'SNSD'
+VERSION = 1
+HEADER = struct.Struct('<4sHH8x')
+BLOCK_HEADER = struct.Struct('<HIqqq9h')
+BLOCK_SAMPLES = 256
+FIELDNAMES = ['timestamp', 'temperature', 'ph', 'glucose']
+# Sensor resolution: stored value = round(reading * scale)
+SCALES = (10, 100, 1)
+INT16_MIN, INT16_MAX = -32768, 32767
+# Journal header: offset of the block in the file, block size, CRC-32 of the block
+JOURNAL = struct.Struct('<QII')
+
+Record = Tuple[float, float, float, float]
+
+
+def write_header(f: BinaryIO, block_samples: int = BLOCK_SAMPLES) -> None:
+    """Write the file header at the current position"""
+    f.write(HEADER.pack(MAGIC, VERSION, block_samples))
+
+
+def read_header(f: BinaryIO) -> int:
+    """Read and validate the file header, returning the samples per block"""
+    data = f.read(HEADER.size)
+    if len(data) < HEADER.size:
+        raise ValueError("Delta sensor file is missing its header")
+    magic, version, block_samples = HEADER.unpack(data)
+    if magic != MAGIC:
+        raise ValueError("Not a delta sensor data file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported delta sensor file version {version}")
+    return block_samples
+
+
+def quantise(temperature: float, ph: float, glucose: float) -> Tuple[int, int, int]:
+    """Channel values as integers at sensor resolution (ValueError if out of int16 range)"""
+    values = tuple(int(round(value * scale)) for value, scale in zip((temperature, ph, glucose), SCALES))
+    for value in values:
+        if not INT16_MIN <= value <= INT16_MAX:
+            raise ValueError(f"Reading outside the delta format's range: {(temperature, ph, glucose)}")
+    return values
+
+
+def dequantise(values: Sequence[int]) -> Tuple[float, float, float]:
+    """Readings from quantised values (the nearest float to the decimal reading)"""
+    return tuple(value / scale for value, scale in zip(values, SCALES))
+
+
+def round_values(temperature: float, ph: float, glucose: float) -> Tuple[float, float, float]:
+    """Readings as they read back from a delta file"""
+    return dequantise(quantise(temperature, ph, glucose))
+
+
+def to_micros(epoch: float) -> int:
+    return int(round(epoch * 1e6))
+
+
+def from_micros(micros: int) -> float:
+    # Combined like datetime.timestamp(), so ISO timestamps round-trip exactly
+    seconds, fraction = divmod(micros, 1000000)
+    return seconds + fraction / 1e6
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _put_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def encode_block(records: Sequence[Record]) -> bytes:
+    """Encode up to 65535 (epoch, temperature, ph, glucose) records as one block"""
+    micros = [to_micros(record[0]) for record in records]
+    channels = list(zip(*(quantise(*record[1:]) for record in records)))
+
+    payload = bytearray()
+    previous = 0
+    for i in range(1, len(micros)):
+        delta = micros[i] - micros[i - 1]
+        _put_varint(payload, _zigzag(delta - previous))
+        previous = delta
+    for channel in channels:
+        deltas = [(b - a + 32768) % 65536 - 32768 for a, b in zip(channel, channel[1:])]
+        payload += struct.pack(f'<{len(deltas)}h', *deltas)
+
+    header = BLOCK_HEADER.pack(
+        len(records), len(payload), micros[0], min(micros), max(micros),
+        *(channel[0] for channel in channels),
+        *(min(channel) for channel in channels),
+        *(max(channel) for channel in channels)
+    )
+    return header + bytes(payload)
+
+
+class BlockHeader:
+    """Decoded block header"""
+
+    __slots__ = ('count', 'payload_size', 'first', 'min_time', 'max_time',
+                 'first_values', 'min_values', 'max_values')
+
+    def __init__(self, data: bytes):
+        count, self.payload_size, self.first, min_micros, max_micros, *values = BLOCK_HEADER.unpack(data)
+        self.count = count
+        self.min_time = from_micros(min_micros)
+        self.max_time = from_micros(max_micros)
+        self.first_values = values[0:3]
+        self.min_values = dequantise(values[3:6])
+        self.max_values = dequantise(values[6:9])
+
+    def overlaps(self, start: Optional[float], end: Optional[float]) -> bool:
+        """Whether the block can hold readings with start <= timestamp <= end"""
+        return (start is None or self.max_time >= start) and (end is None or self.min_time <= end)
+
+
+def iter_blocks(f: BinaryIO, start: Optional[float] = None,
+                end: Optional[float] = None) -> Iterator[Tuple[BlockHeader, bytes]]:
+    """
+    Yield (header, payload) of the blocks of an open delta file that can
+    hold readings in the time range, skipping the payload of the others
+    """
+    read_header(f)
+    while True:
+        data = f.read(BLOCK_HEADER.size)
+        if len(data) < BLOCK_HEADER.size:
+            return  # End of file or a torn header
+        header = BlockHeader(data)
+        if not header.overlaps(start, end):
+            f.seek(header.payload_size, os.SEEK_CUR)
+            continue
+        payload = f.read(header.payload_size)
+        if len(payload) < header.payload_size:
+            return  # Torn final block
+        yield header, payload
+
+
+def decode_block(header: BlockHeader, payload: bytes) -> List[Record]:
+    """Records of one block"""
+    count = header.count
+    micros = [header.first]
+    pos = 0
+    delta = 0
+    for _ in range(count - 1):
+        value = shift = 0
+        while True:
+            byte = payload[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            if byte < 0x80:
+                break
+        delta += _unzigzag(value)
+        micros.append(micros[-1] + delta)
+
+    channels = []
+    for first in header.first_values:
+        deltas = struct.unpack_from(f'<{count - 1}h', payload, pos)
+        pos += 2 * (count - 1)
+        values = [first]
+        for d in deltas:
+            values.append((values[-1] + d + 32768) % 65536 - 32768)
+        channels.append(values)
+
+    return [(from_micros(m),) + dequantise(values) for m, *values in zip(micros, *channels)]
+
+
+def decode_block_arrays(header: BlockHeader, payload: bytes) -> list:
+    """Columns (epoch, temperature, ph, glucose) of one block as NumPy arrays"""
+    if np is None:
+        raise ImportError("numpy is required to decode blocks as arrays")
+    count = header.count
+    channel_bytes = 6 * (count - 1)
+    varints = np.frombuffer(payload, dtype=np.uint8, count=len(payload) - channel_bytes)
+
+    micros = np.full(count, header.first, dtype=np.int64)
+    if count > 1:
+        # Varints end at bytes without the continuation bit; each group's
+        # 7-bit digits are shifted into place and summed per group
+        ends = np.flatnonzero(varints < 0x80)
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        positions = np.arange(len(varints)) - np.repeat(starts, ends - starts + 1)
+        digits = (varints & 0x7F).astype(np.uint64) << (7 * positions).astype(np.uint64)
+        zigzag = np.add.reduceat(digits, starts)
+        dods = (zigzag >> np.uint64(1)).astype(np.int64) ^ -(zigzag & np.uint64(1)).astype(np.int64)
+        micros[1:] += np.cumsum(np.cumsum(dods))
+
+    seconds, fraction = np.divmod(micros, 1000000)
+    columns = [seconds.astype(np.float64) + fraction / 1e6]
+    deltas = np.frombuffer(payload, dtype='<i2', offset=len(varints)).reshape(3, count - 1)
+    for first, channel_deltas, scale in zip(header.first_values, deltas, SCALES):
+        values = np.empty(count, dtype=np.int16)
+        values[0] = first
+        # int16 arithmetic wraps like the encoder's modulo 2**16 deltas
+        np.cumsum(channel_deltas, dtype=np.int16, out=values[1:])
+        values[1:] += np.int16(first)
+        columns.append(values / scale)
+    return columns
+
+
+def iter_stream(f: BinaryIO, start: Optional[float] = None,
+                end: Optional[float] = None) -> Iterator[Record]:
+    """Stream records of an open delta file from the blocks overlapping the range"""
+    for header, payload in iter_blocks(f, start, end):
+        yield from decode_block(header, payload)
+
+
+def iter_records(path) -> Iterator[Record]:
+    """Stream (epoch, temperature, ph, glucose) tuples from a delta file"""
+    with archive.open_daily(path) as f:
+        yield from iter_stream(f)
+
+
+def read_columns(path, start: Optional[float] = None, end: Optional[float] = None,
+                 fields: Sequence[str] = FIELDNAMES) -> list:
+    """
+    One column per field of the readings with start <= timestamp <= end
+    (NumPy arrays when numpy is installed, otherwise array('d'))
+    """
+    positions = [FIELDNAMES.index(name) for name in fields]
+    with archive.open_daily(path) as f:
+        if np is None:
+            columns = [array('d') for _ in fields]
+            for record in iter_stream(f, start, end):
+                if (start is not None and record[0] < start) or (end is not None and record[0] > end):
+                    continue
+                for column, i in zip(columns, positions):
+                    column.append(record[i])
+            return columns
+
+        parts = []
+        for header, payload in iter_blocks(f, start, end):
+            block = decode_block_arrays(header, payload)
+            if (start is not None and header.min_time < start) or (end is not None and header.max_time > end):
+                mask = np.ones(header.count, dtype=bool)
+                if start is not None:
+                    mask &= block[0] >= start
+                if end is not None:
+                    mask &= block[0] <= end
+                block = [column[mask] for column in block]
+            parts.append([block[i] for i in positions])
+    if not parts:
+        return [np.empty(0) for _ in fields]
+    return [np.concatenate([part[i] for part in parts]) for i in range(len(fields))]
+
+
+def journal_path(path) -> Path:
+    """Journal of the block last written to a delta file"""
+    path = Path(path)
+    return path.with_name(path.name + '.journal')
+
+
+def recover(path, durable: bool = False) -> bool:
+    """
+    Restore the block a crash tore while it was being written from the
+    journal, then remove the journal. Returns whether the file changed.
+    """
+    journal = journal_path(path)
+    try:
+        data = journal.read_bytes()
+    except FileNotFoundError:
+        return False
+    restored = False
+    if len(data) >= JOURNAL.size:
+        offset, size, crc = JOURNAL.unpack_from(data)
+        block = data[JOURNAL.size:JOURNAL.size + size]
+        # A torn journal: the file was not written after it
+        if len(block) == size and zlib.crc32(block) == crc and offset >= HEADER.size:
+            with open(path, 'r+b') as f:
+                end = f.seek(0, os.SEEK_END)
+                f.seek(offset)
+                if offset <= end and f.read(size) != block:
+                    # The last write went to this block (the journal is
+                    # rewritten before any later block), so nothing valid follows it
+                    f.seek(offset)
+                    f.write(block)
+                    f.truncate()
+                    restored = True
+                    f.flush()
+                    if durable:
+                        os.fsync(f.fileno())
+    journal.unlink()
+    return restored
+
+
+class BlockWriter:
+    """
+    Append handle of a delta file. Records collect in the open block,
+    which is written out when full and rewritten in place on flush(),
+    each time after journaling it. With `durable` every block and its
+    journal are also forced to storage, so an fsync'ed block is never
+    lost to a torn rewrite.
+    """
+
+    def __init__(self, path, block_samples: int = BLOCK_SAMPLES, durable: bool = False):
+        self.path = Path(path)
+        self.durable = durable
+        if not self.path.exists():
+            with open(self.path, 'wb') as f:
+                write_header(f, block_samples)
+        recover(self.path, durable)
+        self._file = open(self.path, 'r+b')
+        self._journal = None
+        self.block_samples = read_header(self._file)
+        self._pending: List[Record] = []
+        self._dirty = False
+        self._block_offset = self._resume()
+
+    def _resume(self) -> int:
+        """Find where the next block goes, reopening a partial last block"""
+        f = self._file
+        offset = HEADER.size
+        while True:
+            f.seek(offset)
+            data = f.read(BLOCK_HEADER.size)
+            if len(data) < BLOCK_HEADER.size:
+                break
+            header = BlockHeader(data)
+            payload = f.read(header.payload_size)
+            if len(payload) < header.payload_size:
+                break
+            if header.count < self.block_samples:
+                # Kept on disk as it is until new records are appended
+                self._pending = decode_block(header, payload)
+                f.truncate(offset + BLOCK_HEADER.size + header.payload_size)
+                return offset
+            offset += BLOCK_HEADER.size + header.payload_size
+        f.truncate(offset)
+        return offset
+
+    def write_records(self, records) -> None:
+        """Append (epoch, temperature, ph, glucose) records"""
+        for record in records:
+            self._pending.append(record)
+            self._dirty = True
+            if len(self._pending) >= self.block_samples:
+                self._write_block()
+                self._block_offset = self._file.tell()
+                self._pending = []
+
+    def _write_block(self) -> None:
+        block = encode_block(self._pending)
+        self._write_journal(block)
+        self._file.seek(self._block_offset)
+        self._file.write(block)
+        self._file.truncate()
+        if self.durable:
+            # Durable before the journal moves on to the next block
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._dirty = False
+
+    def _write_journal(self, block: bytes) -> None:
+        if self._journal is None:
+            self._journal = open(journal_path(self.path), 'wb')
+        journal = self._journal
+        journal.seek(0)
+        journal.write(JOURNAL.pack(self._block_offset, len(block), zlib.crc32(block)) + block)
+        journal.truncate()
+        journal.flush()
+        if self.durable:
+            os.fsync(journal.fileno())
+
+    def flush(self) -> None:
+        """Write the open block and flush the file"""
+        if self._dirty and self._pending:
+            self._write_block()
+        self._file.flush()
+
+    def fileno(self) -> int:
+        return self._file.fileno()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+            if self.durable:
+                os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+            if self._journal is not None:
+                # The file is consistent again
+                self._journal.close()
+                journal_path(self.path).unlink(missing_ok=True)
+
+
+def convert_file(source, target, block_samples: int = BLOCK_SAMPLES) -> int:
+    """Write a CSV or binary daily file (archived or not) as a delta file, returning the record count"""
+    source = Path(source)
+    if archive.data_suffix(source) == '.bin':
+        with archive.open_daily(source) as f:
+            records = list(binary_format.iter_stream(f))
+    else:
+        with archive.open_daily(source, 'rt') as f:
+            reader = csv.reader(f)
+            header = next(reader, None) or FIELDNAMES
+            cols = [header.index(name) for name in FIELDNAMES]
+            records = [
+                (datetime.fromisoformat(row[cols[0]]).timestamp(),) +
+                tuple(float(row[col]) for col in cols[1:])
+                for row in reader if row
+            ]
+
+    with open(target, 'wb') as f:
+        write_header(f, block_samples)
+        for i in range(0, len(records), block_samples):
+            f.write(encode_block(records[i:i + block_samples]))
+    return len(records)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert daily sensor files to the delta format')
+    parser.add_argument('storage_path', help='Directory holding sensor_data_* files')
+    parser.add_argument('--remove-source', action='store_true', help='Delete files after converting')
+    args = parser.parse_args()
+    converted = 0
+    for path in sorted(Path(args.storage_path).glob('sensor_data_*')):
+        if archive.data_suffix(path) not in ('.csv', '.bin'):
+            continue
+        target = path.with_name(path.name.split('.')[0] + '.dlt')
+        if target.exists():
+            print(f"Skipping {path.name}: {target.name} already exists")
+            continue
+        convert_file(path, target)
+        if args.remove_source:
+            path.unlink()
+            path.with_suffix('.idx').unlink(missing_ok=True)
+        converted += 1
+    print(f"Converted {converted} file(s)")
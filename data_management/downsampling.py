@@ -0,0 +1,164 @@
+"""
+Downsampling of sensor series for display
+
+Reduces a series to roughly one point per pixel column while keeping its
+visual shape:
+
+  - 'lttb': Largest-Triangle-Three-Buckets keeps the point of each bucket
+    that forms the largest triangle with its neighbours (exactly
+    `threshold` points, first and last always kept)
+  - 'minmax': the minimum and maximum of each bucket in time order (at
+    most 2 points per bucket), so spikes are never lost
+
+Functions return indices into the input so several channels sharing a
+timestamp column can be reduced consistently. NumPy is used when
+installed; otherwise a pure-Python path gives the same results.
+"""
+
+import math
+from typing import Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+DOWNSAMPLE_MODES = ('lttb', 'minmax')
+
+
+def _lttb_edges(length: int, threshold: int) -> list:
+    """Bucket boundaries for the points between the first and the last"""
+    every = (length - 2) / (threshold - 2)
+    return [int(math.floor(i * every)) + 1 for i in range(threshold - 2)] + [length - 1]
+
+
+def lttb_indices(x: Sequence[float], y: Sequence[float], threshold: int):
+    """Indices of the points kept by Largest-Triangle-Three-Buckets"""
+    length = len(x)
+    if threshold >= length or threshold < 3:
+        return np.arange(length) if np is not None else list(range(length))
+
+    edges = _lttb_edges(length, threshold)
+    if np is not None:
+        return _lttb_numpy(np.asarray(x, dtype=float), np.asarray(y, dtype=float), edges)
+
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else length
+        avg_x = sum(x[next_lo:next_hi]) / (next_hi - next_lo)
+        avg_y = sum(y[next_lo:next_hi]) / (next_hi - next_lo)
+        ax, ay = x[a], y[a]
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((ax - avg_x) * (y[j] - ay) - (ax - x[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(length - 1)
+    return selected
+
+
+def _lttb_numpy(x, y, edges: list):
+    """LTTB with each bucket's triangle areas computed as one vector operation"""
+    length = len(x)
+    buckets = len(edges) - 1
+    bounds = np.array(edges + [length])
+    # Averages of every bucket at once from cumulative sums
+    cum_x = np.concatenate(([0.0], np.cumsum(x)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+    counts = bounds[2:] - bounds[1:-1]
+    avg_x = (cum_x[bounds[2:]] - cum_x[bounds[1:-1]]) / counts
+    avg_y = (cum_y[bounds[2:]] - cum_y[bounds[1:-1]]) / counts
+
+    selected = np.empty(buckets + 2, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = length - 1
+    a = 0
+    for i in range(buckets):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        areas = np.abs((ax - avg_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (avg_y[i] - ay))
+        a = lo + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y: Sequence[float], buckets: int):
+    """Indices of the minimum and maximum of each of `buckets` equal-size buckets"""
+    length = len(y)
+    if buckets < 1 or 2 * buckets >= length:
+        return np.arange(length) if np is not None else list(range(length))
+
+    size = -(-length // buckets)
+    if np is not None:
+        values = np.asarray(y, dtype=float)
+        rows = -(-length // size)
+        padded = np.full(rows * size, np.nan)
+        padded[:length] = values
+        grid = padded.reshape(rows, size)
+        offsets = np.arange(rows) * size
+        lows = offsets + np.argmin(np.where(np.isnan(grid), np.inf, grid), axis=1)
+        highs = offsets + np.argmax(np.where(np.isnan(grid), -np.inf, grid), axis=1)
+        pairs = np.stack((np.minimum(lows, highs), np.maximum(lows, highs)), axis=1).ravel()
+        # Flat buckets select the same point twice
+        keep = np.ones(len(pairs), dtype=bool)
+        keep[1::2] = pairs[1::2] != pairs[0::2]
+        return pairs[keep]
+
+    selected = []
+    for lo in range(0, length, size):
+        hi = min(lo + size, length)
+        low = min(range(lo, hi), key=y.__getitem__)
+        high = max(range(lo, hi), key=y.__getitem__)
+        selected.extend(sorted({low, high}))
+    return selected
+
+
+def downsample(x: Sequence[float], y: Sequence[float], width: int,
+               mode: str = 'lttb') -> Tuple[Sequence[float], Sequence[float]]:
+    """
+    Reduce a series to O(width) points for a plot `width` pixels wide.
+    Returns (x, y) as NumPy arrays when numpy is installed, else lists.
+    """
+    if mode not in DOWNSAMPLE_MODES:
+        raise ValueError(f"mode must be one of {DOWNSAMPLE_MODES}")
+    width = max(int(width), 3)
+    if mode == 'lttb':
+        indices = lttb_indices(x, y, width)
+    else:
+        indices = minmax_indices(y, width // 2)
+
+    if np is not None:
+        return np.asarray(x, dtype=float)[indices], np.asarray(y, dtype=float)[indices]
+    return [x[i] for i in indices], [y[i] for i in indices]
+
+
+def downsample_columns(columns: dict, channels: Sequence[str], width: int,
+                       mode: str = 'lttb') -> dict:
+    """
+    Reduce several channels sharing one 'timestamp' column together.
+    Keeps the union of the points each channel selects (at most
+    len(channels) times the single-channel count) so every channel keeps
+    its shape and all returned columns stay row-aligned.
+    """
+    if mode not in DOWNSAMPLE_MODES:
+        raise ValueError(f"mode must be one of {DOWNSAMPLE_MODES}")
+    x = columns['timestamp']
+    width = max(int(width), 3)
+    selected = set()
+    for name in channels:
+        if mode == 'lttb':
+            selected.update(int(i) for i in lttb_indices(x, columns[name], width))
+        else:
+            selected.update(int(i) for i in minmax_indices(columns[name], width // 2))
+    indices = sorted(selected)
+
+    keys = ['timestamp'] + list(channels)
+    if np is not None:
+        return {key: np.asarray(columns[key], dtype=float)[indices] for key in keys}
+    return {key: [columns[key][i] for i in indices] for key in keys}
@@ -0,0 +1,136 @@
+"""
+Vectorised parsing of daily CSV files
+
+np.loadtxt parses a whole file in C: column positions are resolved once
+from the header, timestamps are read straight into a datetime64 column
+and the numeric fields into float64, with no dict, datetime or float
+object per row. Wall-clock timestamps are turned into epoch seconds with
+one constant local UTC offset when the offset is the same at both ends
+of every time-ordered run of rows (a daily file can't span two DST
+transitions), otherwise row by row.
+
+Rows are streamed from the file (decompressing archived days, see
+archive.py) rather than read into one string first.
+
+Files this can't parse (no numpy, quoted fields, timezone suffixes,
+torn rows) make read_csv_columns() return None so callers can fall back
+to the csv.reader path.
+"""
+
+import csv
+import itertools
+import warnings
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from data_management import archive
+
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def read_csv_columns(path, fields: Sequence[str], offset: Optional[int] = None) -> Optional[list]:
+    """
+    Parse the rows of a daily CSV file into one array per field (epoch
+    seconds for 'timestamp', float64 otherwise), starting at byte
+    `offset` if given. Returns None if the fast path can't be used.
+    """
+    if np is None:
+        return None
+    dtype = np.dtype([(name, 'M8[us]' if name == 'timestamp' else 'f8') for name in fields])
+    # Archived days are decompressed as the parser reads them
+    with archive.open_daily(path, 'rt') as f:
+        header = next(csv.reader([f.readline()]), None)
+        if not header:
+            return None
+        try:
+            positions = [header.index(name) for name in fields]
+        except ValueError:
+            return None
+        if offset is not None:
+            f.seek(offset)
+        first = f.readline()
+        while first and not first.strip():
+            first = f.readline()
+
+        if not first:
+            table = np.empty(0, dtype=dtype)
+        else:
+            try:
+                # numpy only warns about timezone suffixes; treat that as unparseable
+                with warnings.catch_warnings():
+                    warnings.simplefilter('error')
+                    table = np.loadtxt(itertools.chain([first], f), delimiter=',', dtype=dtype,
+                                       usecols=positions, ndmin=1, comments=None)
+            except (ValueError, Warning):
+                return None
+
+    return [local_epochs(table[name]) if name == 'timestamp' else table[name]
+            for name in fields]
+
+
+def read_csv_range(path, fields: Sequence[str], start: Optional[float] = None,
+                   end: Optional[float] = None, offset: Optional[int] = None) -> Optional[list]:
+    """
+    read_csv_columns() keeping only rows with start <= timestamp <= end
+    (epoch seconds). `offset` may point at the first candidate row.
+    """
+    fields = list(fields)
+    if start is None and end is None:
+        return read_csv_columns(path, fields, offset)
+    wanted = fields if 'timestamp' in fields else fields + ['timestamp']
+    columns = read_csv_columns(path, wanted, offset)
+    if columns is None:
+        return None
+
+    timestamps = columns[wanted.index('timestamp')]
+    mask = np.ones(len(timestamps), dtype=bool)
+    if start is not None:
+        mask &= timestamps >= start
+    if end is not None:
+        mask &= timestamps <= end
+    return [column[mask] for column in columns[:len(fields)]]
+
+
+def local_epochs(naive: 'np.ndarray') -> 'np.ndarray':
+    """
+    Epoch seconds of naive local datetime64[us] values, equal to
+    datetime.fromisoformat(text).timestamp() for each row
+    """
+    if not len(naive):
+        return np.empty(0)
+    micros = naive.astype('int64')
+    # Late rows start a new run; the offset can only change inside a run
+    # if it differs between the run's first and last rows
+    descents = np.flatnonzero(micros[1:] < micros[:-1])
+    ends = np.unique(naive[np.concatenate(([0, len(naive) - 1], descents, descents + 1))])
+    offsets = {_utc_offset(dt) for dt in ends.tolist()}
+    if len(offsets) > 1:
+        # A DST transition inside the file: let datetime resolve each row
+        return np.array([dt.timestamp() for dt in naive.tolist()])
+    offset = offsets.pop()
+    # Whole seconds and the microsecond fraction are combined the way
+    # datetime.timestamp() does, so results match it exactly
+    seconds, fraction = np.divmod(micros, 1000000)
+    return (seconds - offset).astype(np.float64) + fraction / 1e6
+
+
+def _utc_offset(dt: datetime) -> int:
+    """Local UTC offset (seconds) in effect at a naive local datetime"""
+    wall = dt.replace(microsecond=0)
+    return int((wall - EPOCH).total_seconds()) - int(wall.timestamp())
+
+
+def to_readings(columns: dict) -> List[dict]:
+    """Row dicts (datetime timestamps) from parsed columns"""
+    fields = list(columns)
+    rows = [dict(zip(fields, values)) for values in zip(*(columns[name].tolist() for name in fields))]
+    if 'timestamp' in columns:
+        for row in rows:
+            row['timestamp'] = datetime.fromtimestamp(row['timestamp'])
+    return rows
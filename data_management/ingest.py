@@ -0,0 +1,210 @@
+"""
+Ingest pipeline decoupling sensor acquisition from storage I/O
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Sequence
+
+from data_management.csv_handler import CSVHandler
+from data_management.sensor_data import SensorData
+
+
+QUEUE_POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+
+class ColumnBatch:
+    """Readings queued column-wise, written with one call each to SensorData and CSVHandler"""
+
+    __slots__ = ('columns',)
+
+    def __init__(self, columns: Dict[str, Sequence[float]]):
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns['timestamp'])
+
+
+class IngestPipeline:
+    """
+    Bounded queue drained by a background writer thread.
+
+    The producer (the Kivy Clock tick) only calls submit(). The writer
+    thread takes up to `batch_size` readings at a time, adds them to
+    SensorData and saves them through CSVHandler. A bulk read (e.g. a
+    tag's sample log) is queued with submit_columns() as one entry and
+    written without building a dict per reading. When the queue is full
+    the policy decides what happens:
+      - 'drop_oldest': discard the oldest queued entry
+      - 'drop_newest': reject the new reading
+      - 'block': wait up to `block_timeout` seconds for space (backpressure),
+        then reject the new reading
+    """
+
+    def __init__(self, sensor_data: SensorData, csv_handler: CSVHandler,
+                 max_queue: int = 1000, batch_size: int = 50,
+                 policy: str = 'drop_oldest', block_timeout: float = 0.1,
+                 idle_interval: float = 1.0):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"policy must be one of {QUEUE_POLICIES}")
+
+        self.sensor_data = sensor_data
+        self.csv_handler = csv_handler
+        self.max_queue = max(1, int(max_queue))
+        self.batch_size = max(1, int(batch_size))
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.idle_interval = idle_interval
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._busy = False
+
+        # Counters
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.max_depth = 0
+
+    def start(self) -> None:
+        """Start the writer thread"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name='sensor-ingest-writer', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Drain queued readings and stop the writer thread"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.csv_handler.flush()
+
+    def submit(self, data: dict) -> bool:
+        """Queue a reading for storage; returns False if it was dropped"""
+        return self._enqueue(data, 1)
+
+    def submit_columns(self, columns: Dict[str, Sequence[float]]) -> bool:
+        """
+        Queue a batch of readings given column-wise (timestamps in epoch
+        seconds); the batch takes one queue slot and is kept or dropped
+        as a whole. Returns False if it was dropped.
+        """
+        batch = ColumnBatch(columns)
+        if not len(batch):
+            return True
+        return self._enqueue(batch, len(batch))
+
+    def _enqueue(self, item, count: int) -> bool:
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                if self.policy == 'drop_oldest':
+                    self.dropped += self._size(self._queue.popleft())
+                elif self.policy == 'block':
+                    deadline = time.monotonic() + self.block_timeout
+                    while len(self._queue) >= self.max_queue:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0 or not self._running:
+                            self.dropped += count
+                            return False
+                        self._cond.wait(remaining)
+                else:
+                    self.dropped += count
+                    return False
+
+            self._queue.append(item)
+            self.submitted += count
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._cond.notify_all()
+            return True
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Wait until queued readings are written, then flush storage"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while (self._queue or self._busy) and self._running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return self.csv_handler.flush()
+
+    @staticmethod
+    def _size(item) -> int:
+        return len(item) if isinstance(item, ColumnBatch) else 1
+
+    def _take_batch(self) -> List[dict]:
+        """Wait for readings and pop up to batch_size (caller holds the lock)"""
+        if not self._queue and self._running:
+            self._cond.wait(self.idle_interval)
+        count = min(len(self._queue), self.batch_size)
+        batch = [self._queue.popleft() for _ in range(count)]
+        self._busy = bool(batch)
+        if batch:
+            # Wake producers blocked on a full queue
+            self._cond.notify_all()
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                batch = self._take_batch()
+                if not batch and not self._running:
+                    return
+
+            if batch:
+                try:
+                    self._write(batch)
+                    self.batches += 1
+                except Exception as e:
+                    print(f"Error writing sensor batch: {e}")
+            else:
+                # Idle: let the time-based flush threshold fire
+                self.csv_handler.flush_if_due()
+
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _write(self, batch: list) -> None:
+        """Write queued entries in order, grouping consecutive single readings"""
+        readings = []
+        for item in batch + [None]:
+            if isinstance(item, dict):
+                readings.append(item)
+                continue
+            if readings:
+                self.sensor_data.add_readings(readings)
+                self.written += self.csv_handler.save_sensor_readings(readings)
+                readings = []
+            if item is not None:
+                self.sensor_data.add_columns(item.columns)
+                self.written += self.csv_handler.save_columns(item.columns)
+
+    def queue_depth(self) -> int:
+        """Get the number of readings waiting to be written"""
+        with self._cond:
+            return len(self._queue)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get pipeline counters"""
+        with self._cond:
+            return {
+                'queue_depth': len(self._queue),
+                'max_depth': self.max_depth,
+                'submitted': self.submitted,
+                'written': self.written,
+                'dropped': self.dropped,
+                'batches': self.batches,
+            }
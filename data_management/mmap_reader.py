@@ -0,0 +1,119 @@
+"""
+Memory-mapped zero-copy reader for binary daily sensor files
+"""
+
+import mmap
+import os
+from typing import Dict, Optional
+
+from data_management import binary_format
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class MappedDayFile:
+    """
+    Read-only memory map of a binary daily file.
+
+    `records` is a NumPy structured array backed directly by the mapping,
+    so per-channel columns and time slices are views: pages are only read
+    from storage when the requested window is touched.
+    """
+
+    def __init__(self, path, previous: Optional['MappedDayFile'] = None):
+        """
+        `previous`: an earlier mapping of the same file, which has only
+        grown since (binary daily files are append-only), so sortedness is
+        only checked for the appended records
+        """
+        if np is None:
+            raise ImportError("numpy is required for memory-mapped reads")
+
+        self.path = str(path)
+        stat = os.stat(self.path)
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        count = max(self.size - binary_format.HEADER.size, 0) // binary_format.RECORD.size
+        self.count = count
+
+        with open(self.path, 'rb') as f:
+            binary_format.read_header(f)
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.records = np.frombuffer(
+            self._mmap, dtype=binary_format.RECORD_DTYPE,
+            count=count, offset=binary_format.HEADER.size
+        )
+        self._sorted = None
+        self._sorted_records = 0  # Leading records known to be in timestamp order
+        if (previous is not None and previous.path == self.path and previous.size <= self.size
+                and previous._sorted is not None):
+            if previous._sorted:
+                self._sorted_records = previous.count
+            else:
+                self._sorted = False
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def is_current(self) -> bool:
+        """Check whether the file is unchanged since it was mapped"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns
+
+    @property
+    def timestamps(self):
+        """Epoch timestamp column (view)"""
+        return self.records['timestamp']
+
+    def channel(self, name: str):
+        """Column of one field (view)"""
+        return self.records[name]
+
+    def is_sorted(self) -> bool:
+        """
+        Whether records were appended in timestamp order (checked once,
+        from the last record the previous mapping already checked)
+        """
+        if self._sorted is None:
+            timestamps = self.timestamps[max(self._sorted_records - 1, 0):]
+            self._sorted = bool(np.all(timestamps[1:] >= timestamps[:-1]))
+        return self._sorted
+
+    def slice_range(self, start: Optional[float] = None, end: Optional[float] = None):
+        """
+        Records with start <= timestamp <= end (epoch seconds).
+        Binary searches the timestamp column and returns a view when the
+        file is in time order; otherwise falls back to a filtered copy.
+        """
+        timestamps = self.timestamps
+        if self.is_sorted():
+            lo = 0 if start is None else int(np.searchsorted(timestamps, start, 'left'))
+            hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, 'right'))
+            return self.records[lo:hi]
+
+        mask = np.ones(len(timestamps), dtype=bool)
+        if start is not None:
+            mask &= timestamps >= start
+        if end is not None:
+            mask &= timestamps <= end
+        window = self.records[mask]
+        return window[np.argsort(window['timestamp'], kind='stable')]
+
+    def columns(self, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, object]:
+        """Per-channel views of the records in a time range"""
+        window = self.slice_range(start, end)
+        return {name: window[name] for name in binary_format.FIELDNAMES}
+
+    def close(self) -> None:
+        """Release the mapping once no views of it are alive"""
+        self.records = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # Views handed out still reference the mapping
@@ -0,0 +1,195 @@
+"""
+Parallel multi-day history loader
+
+Daily files are independent, so months of history can be parsed on every
+core: CSV and delta files (parsing is CPU bound and holds the GIL) are
+spread over a ProcessPoolExecutor, binary files (numpy.fromfile releases
+the GIL) over a ThreadPoolExecutor. Each file comes back as per-field columns which the
+caller merges in timestamp order (CSVHandler.load_range_parallel).
+Sparse CSV indexes are looked up (and their sidecars written) in the
+calling process only; workers just get the offset to seek to.
+"""
+
+import csv
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from data_management import archive, binary_format, delta_format, fast_csv
+from data_management.csv_index import CSVIndex
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+FIELDNAMES = ['timestamp', 'temperature', 'ph', 'glucose']
+# Below this many files a pool costs more to start than it saves
+MIN_PARALLEL_FILES = 4
+
+
+def check_fields(fields: Optional[Sequence[str]]) -> List[str]:
+    """The requested fields as a list (all of them for None), rejecting unknown names"""
+    fields = list(FIELDNAMES if fields is None else fields)
+    unknown = set(fields) - set(FIELDNAMES)
+    if unknown:
+        raise ValueError(f"Unknown fields: {sorted(unknown)}")
+    return fields
+
+
+def csv_seek(path, start: Optional[float], end: Optional[float]) -> Tuple[Optional[int], bool]:
+    """
+    Where to start reading an uncompressed CSV daily file for the range
+    and whether the scan may stop at the first row past `end`, from its
+    sparse index. (None, False) for other files or an unbounded range.
+    """
+    if (start is None and end is None) or archive.is_archived(path) \
+            or archive.data_suffix(path) != '.csv':
+        return None, False
+    index = CSVIndex.for_file(path)
+    return (None if start is None else index.seek_offset(start)), index.monotonic
+
+
+def read_file_columns(path: str, start: Optional[float], end: Optional[float],
+                      fields: Sequence[str], offset: Optional[int] = None,
+                      stop_early: bool = False) -> list:
+    """
+    Parse one daily file into a column per field, keeping rows with
+    start <= timestamp <= end. `offset` and `stop_early` (see csv_seek)
+    apply to CSV files. Module level so process workers can run it.
+    """
+    path = Path(path)
+    if archive.data_suffix(path) == '.bin':
+        return _read_binary_columns(path, start, end, fields)
+    if archive.data_suffix(path) == '.dlt':
+        return delta_format.read_columns(path, start, end, fields)
+    return _read_csv_columns(path, start, end, fields, offset, stop_early)
+
+
+def iter_csv_rows(path, start: Optional[float], end: Optional[float], fields: Sequence[str],
+                  offset: Optional[int] = None, stop_early: bool = False
+                  ) -> Iterator[Tuple[datetime, list]]:
+    """
+    Stream a CSV daily file with csv.reader, the fallback when fast_csv
+    can't parse it. Yields (datetime, values in `fields` order with the
+    timestamp as epoch seconds) for rows with start <= timestamp <= end,
+    skipping rows torn by a crash. Reading starts at `offset` if given;
+    `stop_early` ends it at the first row past `end`.
+    """
+    with archive.open_daily(path, 'rt') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        # Resolve column positions once instead of building a dict per row
+        ts_col = header.index('timestamp')
+        cols = [None if name == 'timestamp' else header.index(name) for name in fields]
+        if offset is not None:
+            f.seek(offset)
+
+        for row in reader:
+            if not row:
+                continue
+            try:
+                dt = datetime.fromisoformat(row[ts_col])
+                epoch = dt.timestamp()
+                if start is not None and epoch < start:
+                    continue
+                if end is not None and epoch > end:
+                    if stop_early:
+                        break
+                    continue
+                values = [epoch if col is None else float(row[col]) for col in cols]
+            except (ValueError, IndexError):
+                continue  # Row torn by a crash
+            yield dt, values
+
+
+def _read_binary_columns(path: Path, start: Optional[float], end: Optional[float],
+                         fields: Sequence[str]) -> list:
+    if np is None:
+        positions = [FIELDNAMES.index(name) for name in fields]
+        columns = [array('d') for _ in fields]
+        with archive.open_daily(path) as f:
+            for record in binary_format.iter_stream(f):
+                epoch = record[0]
+                if (start is not None and epoch < start) or (end is not None and epoch > end):
+                    continue
+                for column, i in zip(columns, positions):
+                    column.append(record[i])
+        return columns
+
+    if archive.is_archived(path):
+        with archive.open_daily(path) as f:
+            records = binary_format.read_stream(f)
+    else:
+        records = binary_format.read_records(path)
+    if start is not None or end is not None:
+        timestamps = records['timestamp']
+        mask = np.ones(len(records), dtype=bool)
+        if start is not None:
+            mask &= timestamps >= start
+        if end is not None:
+            mask &= timestamps <= end
+        records = records[mask]
+    return [np.ascontiguousarray(records[name]) for name in fields]
+
+
+def _read_csv_columns(path: Path, start: Optional[float], end: Optional[float],
+                      fields: Sequence[str], offset: Optional[int], stop_early: bool) -> list:
+    columns = fast_csv.read_csv_range(path, fields, start, end, offset)
+    if columns is not None:
+        return columns
+
+    columns = [array('d') for _ in fields]
+    for _, values in iter_csv_rows(path, start, end, fields, offset, stop_early):
+        for column, value in zip(columns, values):
+            column.append(value)
+    return columns
+
+
+def load_files(paths: Sequence[Path], start: Optional[float] = None, end: Optional[float] = None,
+               fields: Sequence[str] = FIELDNAMES, workers: Optional[int] = None,
+               min_parallel_files: int = MIN_PARALLEL_FILES) -> List[list]:
+    """
+    Parse daily files concurrently, returning their columns in `paths`
+    order. `workers` defaults to the CPU count; with one worker or fewer
+    than `min_parallel_files` files the files are parsed serially, as
+    they are if a process pool can't be started on this platform.
+    """
+    paths = [str(path) for path in paths]
+    fields = list(fields)
+    # Index lookups stay in this process so workers never write sidecars
+    seeks = [csv_seek(path, start, end) for path in paths]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(paths) < min_parallel_files:
+        return [read_file_columns(path, start, end, fields, *seek) for path, seek in zip(paths, seeks)]
+
+    results = [None] * len(paths)
+    binary = [i for i, path in enumerate(paths) if archive.data_suffix(path) == '.bin']
+    text = [i for i, path in enumerate(paths) if archive.data_suffix(path) != '.bin']
+    groups = [(binary, ThreadPoolExecutor), (text, ProcessPoolExecutor)]
+    for positions, executor_class in groups:
+        if not positions:
+            continue
+        try:
+            with executor_class(max_workers=min(workers, len(positions))) as executor:
+                parsed = executor.map(
+                    read_file_columns,
+                    [paths[i] for i in positions],
+                    *([value] * len(positions) for value in (start, end, fields)),
+                    [seeks[i][0] for i in positions],
+                    [seeks[i][1] for i in positions]
+                )
+                for i, columns in zip(positions, parsed):
+                    results[i] = columns
+        except (OSError, RuntimeError, ImportError) as e:
+            # e.g. no working multiprocessing (BrokenProcessPool is a RuntimeError)
+            print(f"Parallel load failed, loading serially: {e}")
+            for i in positions:
+                results[i] = read_file_columns(paths[i], start, end, fields, *seeks[i])
+    return results
@@ -0,0 +1,312 @@
+"""
+Multi-resolution rollups of sensor history
+
+Raw readings are aggregated into 1 minute, 15 minute and 1 hour buckets
+holding count, min, max, mean and last value per channel. Rollup files sit
+next to the daily files:
+
+    rollup_1m_<YYYY-MM-DD>.csv   (one file per day)
+    rollup_15m_<YYYY-MM>.csv     (one file per month)
+    rollup_1h_<YYYY-MM>.csv      (one file per month)
+
+Buckets start on local wall-clock minutes, quarter hours and hours (at a
++5:30 offset the hourly buckets start at :00 local time, not :30). Tiers
+written by earlier versions used UTC boundaries; rebuild_rollups()
+realigns them.
+
+Rows are appended as partial aggregates and rows for the same bucket are
+merged on read, so late readings and restarts never require rewriting a
+file. Buckets still being filled are kept in memory and written out
+periodically and on flush(force=True). Once COMPACT_ROWS partial rows
+have been appended to a file it is rewritten atomically with one row per
+bucket, so coarse tiers stay as small as their bucket count. Appends are
+folded into the parsed-file cache, so a query doesn't reparse a file this
+store just wrote to.
+"""
+
+import csv
+import math
+import os
+import time
+from array import array
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+CHANNELS = ('temperature', 'ph', 'glucose')
+# (name, bucket seconds, one file per 'day' or 'month'), finest first
+TIERS = (
+    ('1m', 60, 'day'),
+    ('15m', 900, 'month'),
+    ('1h', 3600, 'month'),
+)
+ROLLUP_FIELDS = ['bucket', 'count', 'last_timestamp'] + [
+    f"{name}_{stat}" for name in CHANNELS for stat in ('min', 'max', 'sum', 'last')
+]
+# Minimum seconds between writes of in-progress buckets
+WRITE_INTERVAL = 60.0
+# Partial rows appended to a rollup file before it is compacted
+COMPACT_ROWS = 64
+
+
+class Bucket:
+    """Aggregates of the readings in one time bucket"""
+
+    __slots__ = ('count', 'last_timestamp', 'mins', 'maxs', 'sums', 'lasts')
+
+    def __init__(self):
+        self.count = 0
+        self.last_timestamp = -math.inf
+        self.mins = [math.inf] * len(CHANNELS)
+        self.maxs = [-math.inf] * len(CHANNELS)
+        self.sums = [0.0] * len(CHANNELS)
+        self.lasts = [0.0] * len(CHANNELS)
+
+    def add(self, timestamp: float, values: Tuple[float, float, float]) -> None:
+        self.count += 1
+        for i, value in enumerate(values):
+            if value < self.mins[i]:
+                self.mins[i] = value
+            if value > self.maxs[i]:
+                self.maxs[i] = value
+            self.sums[i] += value
+        if timestamp >= self.last_timestamp:
+            self.last_timestamp = timestamp
+            self.lasts = list(values)
+
+    def merge(self, other: 'Bucket') -> None:
+        self.count += other.count
+        for i in range(len(CHANNELS)):
+            self.mins[i] = min(self.mins[i], other.mins[i])
+            self.maxs[i] = max(self.maxs[i], other.maxs[i])
+            self.sums[i] += other.sums[i]
+        if other.last_timestamp >= self.last_timestamp:
+            self.last_timestamp = other.last_timestamp
+            self.lasts = list(other.lasts)
+
+    def to_row(self, start: float) -> list:
+        row = [start, self.count, self.last_timestamp]
+        for i in range(len(CHANNELS)):
+            row += [self.mins[i], self.maxs[i], self.sums[i], self.lasts[i]]
+        return row
+
+    @classmethod
+    def from_row(cls, row: List[str]) -> Tuple[float, 'Bucket']:
+        bucket = cls()
+        bucket.count = int(row[1])
+        bucket.last_timestamp = float(row[2])
+        values = [float(v) for v in row[3:]]
+        bucket.mins = values[0::4]
+        bucket.maxs = values[1::4]
+        bucket.sums = values[2::4]
+        bucket.lasts = values[3::4]
+        return float(row[0]), bucket
+
+
+class RollupStore:
+    """Incrementally maintained rollup tiers stored next to the daily files"""
+
+    def __init__(self, storage_path, write_interval: float = WRITE_INTERVAL):
+        self.storage_path = Path(storage_path)
+        self.write_interval = write_interval
+        self._pending: Dict[str, Dict[float, Bucket]] = {name: {} for name, _, _ in TIERS}
+        self._last_write = time.monotonic()
+        # Parsed rollup files: path -> (size, mtime_ns, {bucket start: Bucket})
+        self._cache: Dict[Path, Tuple[int, int, Dict[float, Bucket]]] = {}
+        self._appended: Dict[Path, int] = {}  # Partial rows written since compaction
+        self._offset = (None, 0)  # (UTC quarter hour, local UTC offset in seconds)
+
+    def _utc_offset(self, timestamp: float) -> int:
+        """Local UTC offset at `timestamp` (offsets only change on UTC quarter hours)"""
+        quarter = timestamp // 900
+        if self._offset[0] != quarter:
+            self._offset = (quarter, time.localtime(timestamp).tm_gmtoff)
+        return self._offset[1]
+
+    def _bucket_start(self, timestamp: float, seconds: int) -> float:
+        """Start of the local wall-clock bucket of `seconds` holding `timestamp`"""
+        offset = self._utc_offset(timestamp)
+        return math.floor((timestamp + offset) / seconds) * seconds - offset
+
+    def add(self, timestamp: float, values: Tuple[float, float, float]) -> None:
+        """Fold one raw reading into every tier"""
+        offset = self._utc_offset(timestamp)
+        for name, seconds, _ in TIERS:
+            start = math.floor((timestamp + offset) / seconds) * seconds - offset
+            pending = self._pending[name]
+            bucket = pending.get(start)
+            if bucket is None:
+                bucket = pending[start] = Bucket()
+            bucket.add(timestamp, values)
+
+    def _file_for(self, name: str, period: str, start: float) -> Path:
+        day = datetime.fromtimestamp(start).date()
+        key = str(day) if period == 'day' else day.strftime('%Y-%m')
+        return self.storage_path / f"rollup_{name}_{key}.csv"
+
+    def flush(self, force: bool = True) -> None:
+        """Append pending partial buckets (if forced or the write interval passed)"""
+        if not force and time.monotonic() - self._last_write < self.write_interval:
+            return
+        for name, _, period in TIERS:
+            pending = self._pending[name]
+            by_file: Dict[Path, List[list]] = {}
+            for start in sorted(pending):
+                by_file.setdefault(self._file_for(name, period, start), []).append(
+                    pending[start].to_row(start)
+                )
+            for path, rows in by_file.items():
+                self._append(path, rows, [pending[row[0]] for row in rows])
+            pending.clear()
+        self._last_write = time.monotonic()
+
+    def _append(self, path: Path, rows: List[list], buckets: List[Bucket]) -> None:
+        """Append partial rows to a rollup file, compacting it every COMPACT_ROWS rows"""
+        cached = self._cache.get(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stat = None
+        with open(path, 'a', newline='') as f:
+            writer = csv.writer(f)
+            if stat is None:
+                writer.writerow(ROLLUP_FIELDS)
+            writer.writerows(rows)
+
+        appended = self._appended.get(path, 0) + len(rows)
+        if appended >= COMPACT_ROWS:
+            self._compact(path)
+            return
+        self._appended[path] = appended
+        if cached is not None and stat is not None and (cached[0], cached[1]) == (stat.st_size, stat.st_mtime_ns):
+            # The cache matched the file before this append: fold the rows in
+            merged = cached[2]
+            for row, bucket in zip(rows, buckets):
+                merged.setdefault(row[0], Bucket()).merge(bucket)
+            stat = os.stat(path)
+            self._cache[path] = (stat.st_size, stat.st_mtime_ns, merged)
+
+    def _compact(self, path: Path) -> None:
+        """Rewrite a rollup file with one row per bucket"""
+        buckets = self._load_file(path)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(ROLLUP_FIELDS)
+            writer.writerows(buckets[start].to_row(start) for start in sorted(buckets))
+        os.replace(tmp, path)
+        stat = os.stat(path)
+        self._cache[path] = (stat.st_size, stat.st_mtime_ns, buckets)
+        self._appended[path] = 0
+
+    def clear(self) -> None:
+        """Delete all rollup files and pending buckets"""
+        for name, _, _ in TIERS:
+            self._pending[name].clear()
+            for path in self.storage_path.glob(f"rollup_{name}_*.csv"):
+                path.unlink()
+        self._cache.clear()
+        self._appended.clear()
+
+    def rebuild(self, rows: Iterable[Tuple[float, float, float, float]]) -> int:
+        """Recreate every tier from raw (epoch, temperature, ph, glucose) rows"""
+        self.clear()
+        count = 0
+        for timestamp, *values in rows:
+            self.add(timestamp, tuple(values))
+            count += 1
+        self.flush()
+        return count
+
+    def _load_file(self, path: Path) -> Dict[float, Bucket]:
+        """Parse a rollup file, merging partial rows of the same bucket"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return {}
+        cached = self._cache.get(path)
+        if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        buckets: Dict[float, Bucket] = {}
+        with open(path, 'r', newline='') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if len(row) != len(ROLLUP_FIELDS):
+                    continue  # Torn row
+                start, bucket = Bucket.from_row(row)
+                if start in buckets:
+                    buckets[start].merge(bucket)
+                else:
+                    buckets[start] = bucket
+        self._cache[path] = (stat.st_size, stat.st_mtime_ns, buckets)
+        return buckets
+
+    def _tier_files(self, name: str, period: str, start: float, end: float) -> Iterator[Path]:
+        day = datetime.fromtimestamp(start).date()
+        last = datetime.fromtimestamp(end).date()
+        if period == 'month':
+            day = day.replace(day=1)
+        while day <= last:
+            yield self._file_for(name, period, datetime(day.year, day.month, day.day).timestamp())
+            if period == 'day':
+                day += timedelta(days=1)
+            else:
+                day = date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+    def buckets(self, name: str, start: float, end: float) -> List[Tuple[float, Bucket]]:
+        """Merged (bucket start, Bucket) pairs of one tier overlapping [start, end]"""
+        seconds, period = next((s, p) for n, s, p in TIERS if n == name)
+        first = self._bucket_start(start, seconds)
+        merged: Dict[float, Bucket] = {}
+        sources = [self._load_file(path) for path in self._tier_files(name, period, first, end)]
+        sources.append(self._pending[name])
+        for source in sources:
+            for bucket_start, bucket in source.items():
+                if first <= bucket_start <= end:
+                    if bucket_start not in merged:
+                        merged[bucket_start] = Bucket()
+                    merged[bucket_start].merge(bucket)
+        return sorted(merged.items())
+
+    @staticmethod
+    def pick_tier(start: float, end: float, points: int) -> Tuple[str, int]:
+        """Coarsest tier that still yields at least `points` buckets over the range"""
+        span = max(end - start, 0.0)
+        for name, seconds, _ in reversed(TIERS):
+            if span / seconds >= points:
+                return name, seconds
+        return TIERS[0][0], TIERS[0][1]
+
+    def query(self, start: float, end: float, points: int = 500, tier: Optional[str] = None) -> dict:
+        """
+        Downsampled history between two epoch timestamps.
+        Returns the chosen tier, bucket start timestamps and counts, and per
+        channel min/max/mean/last columns as array('d').
+        """
+        if tier is None:
+            tier, seconds = self.pick_tier(start, end, points)
+        else:
+            seconds = next(s for n, s, _ in TIERS if n == tier)
+
+        result = {
+            'tier': tier,
+            'bucket_seconds': seconds,
+            'timestamp': array('d'),
+            'count': array('d'),
+        }
+        for channel in CHANNELS:
+            result[channel] = {stat: array('d') for stat in ('min', 'max', 'mean', 'last')}
+
+        for bucket_start, bucket in self.buckets(tier, start, end):
+            result['timestamp'].append(bucket_start)
+            result['count'].append(bucket.count)
+            for i, channel in enumerate(CHANNELS):
+                columns = result[channel]
+                columns['min'].append(bucket.mins[i])
+                columns['max'].append(bucket.maxs[i])
+                columns['mean'].append(bucket.sums[i] / bucket.count)
+                columns['last'].append(bucket.lasts[i])
+        return result
@@ -2,9 +2,29 @@
 Sensor data model and management
 """
 
+import math
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+
+CHANNELS = ('temperature', 'ph', 'glucose')
+
+
+def to_epoch(value: Union[datetime, str, float, int, None]) -> float:
+    """Convert a datetime, ISO string or number to epoch seconds"""
+    if value is None:
+        return datetime.now().timestamp()
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return float(value)
 
 
 @dataclass
@@ -14,71 +34,425 @@ class SensorReading:
     temperature: float  # in Celsius
     ph: float  # pH value (0-14)
     glucose: float  # in mg/dL
-    
+
     def __str__(self):
         return f"{self.timestamp} - Temp: {self.temperature}°C, pH: {self.ph}, Glucose: {self.glucose} mg/dL"
 
 
-class SensorData:
-    """Manages in-memory sensor data"""
-    
+class ReadingsView(Sequence):
+    """
+    Read-only snapshot of buffered readings stored column-wise.
+    SensorReading objects are only built when an item is accessed.
+    """
+
+    def __init__(self, timestamps: array, temperature: array, ph: array, glucose: array):
+        self.timestamps = timestamps
+        self.temperature = temperature
+        self.ph = ph
+        self.glucose = glucose
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._build(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("reading index out of range")
+        return self._build(index)
+
+    def _build(self, i: int) -> SensorReading:
+        return SensorReading(
+            timestamp=datetime.fromtimestamp(self.timestamps[i]),
+            temperature=self.temperature[i],
+            ph=self.ph[i],
+            glucose=self.glucose[i]
+        )
+
+    def copy(self) -> List[SensorReading]:
+        """Materialise the snapshot as a list"""
+        return list(self)
+
+    def columns(self) -> Dict[str, array]:
+        """Get the underlying columns keyed by field name"""
+        return {
+            'timestamp': self.timestamps,
+            'temperature': self.temperature,
+            'ph': self.ph,
+            'glucose': self.glucose
+        }
+
+
+class BufferView(Sequence):
+    """
+    Live read-only view of the SensorData ring buffer, oldest first.
+    Items are read from the ring when accessed, so nothing is copied and
+    later inserts show through; use get_all_readings() for a snapshot.
+    """
+
+    def __init__(self, sensor_data: 'SensorData'):
+        self._data = sensor_data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, index):
+        with self._data._lock:
+            size = self._data._size
+            if isinstance(index, slice):
+                return [self._data._reading_at(k) for k in range(*index.indices(size))]
+            if index < 0:
+                index += size
+            if not 0 <= index < size:
+                raise IndexError("reading index out of range")
+            return self._data._reading_at(index)
+
+    def copy(self) -> List[SensorReading]:
+        """Materialise the current contents as a list"""
+        return self[:]
+
+
+class RunningStats:
+    """
+    Statistics of a sliding window maintained in O(1) per update.
+    Mean/variance use Welford's algorithm (with its inverse for removals);
+    min/max use monotonic deques of (sequence number, value) pairs, which
+    works because values always leave the window oldest first.
+    """
+
     def __init__(self):
-        self.readings: List[SensorReading] = []
-        self.max_memory_readings = 10000  # Keep last 10000 readings in memory
-    
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.last = None
+        self._min = deque()
+        self._max = deque()
+
+    def push(self, seq: int, value: float) -> None:
+        """Add the value with insertion sequence number `seq`"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.last = value
+
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((seq, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((seq, value))
+
+    def pop(self, seq: int, value: float) -> None:
+        """Remove the oldest value, which was pushed with sequence number `seq`"""
+        if self.count <= 1:
+            self.reset()
+            return
+        old_mean = self.mean
+        self.count -= 1
+        self.mean = (old_mean * (self.count + 1) - value) / self.count
+        self._m2 = max(self._m2 - (value - old_mean) * (value - self.mean), 0.0)
+
+        if self._min[0][0] == seq:
+            self._min.popleft()
+        if self._max[0][0] == seq:
+            self._max.popleft()
+
+    def summary(self) -> dict:
+        """Get min/max/avg/stddev/count/last of the window"""
+        return {
+            'min': self._min[0][1],
+            'max': self._max[0][1],
+            'avg': self.mean,
+            'stddev': math.sqrt(self._m2 / self.count),
+            'count': self.count,
+            'last': self.last
+        }
+
+
+class SensorData:
+    """
+    Manages in-memory sensor data.
+    Readings live in a fixed-capacity ring buffer with one contiguous
+    array('d') per column, so inserts are O(1) and never allocate.
+    All public methods are thread-safe.
+    """
+
+    def __init__(self, max_memory_readings: int = 10000):
+        self.max_memory_readings = max_memory_readings  # Keep last N readings in memory
+        self._timestamps = array('d', bytes(8 * max_memory_readings))
+        self._columns = {
+            name: array('d', bytes(8 * max_memory_readings)) for name in CHANNELS
+        }
+        self._head = 0  # Next slot to write
+        self._size = 0
+        self._seq = 0  # Total readings ever added
+        self._stats = {name: RunningStats() for name in CHANNELS}
+        # Sequence numbers of readings older than their predecessor; while
+        # empty the ring is in time order and can be binary searched directly
+        self._descents = deque()
+        # Otherwise (timestamps, sequence numbers) of the buffer sorted by
+        # time, built on first use and then kept up to date by _insert
+        self._order = None
+        self._lock = threading.RLock()
+        self._subscribers = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def readings(self) -> BufferView:
+        """Live view of all buffered readings, oldest first (nothing is copied)"""
+        return BufferView(self)
+
     def add_reading(self, data: dict) -> None:
         """Add a new sensor reading"""
-        reading = SensorReading(
-            timestamp=data.get('timestamp', datetime.now()),
-            temperature=float(data.get('temperature', 0)),
-            ph=float(data.get('ph', 7.0)),
-            glucose=float(data.get('glucose', 0))
+        row = self._parse(data)
+        with self._lock:
+            self._insert(*row)
+            added = self._added_view(1)
+        self._notify(added)
+
+    def add_readings(self, readings: Iterable[dict]) -> None:
+        """Add several readings under a single lock acquisition"""
+        rows = [self._parse(data) for data in readings]
+        if not rows:
+            return
+        with self._lock:
+            for row in rows:
+                self._insert(*row)
+            added = self._added_view(len(rows))
+        self._notify(added)
+
+    def add_columns(self, columns: Dict[str, Sequence]) -> int:
+        """
+        Add a batch of readings given column-wise, as returned by
+        ReadingsView.columns() (timestamps in epoch seconds), under a
+        single lock acquisition. Returns the number of readings stored,
+        which is at most `max_memory_readings`.
+        """
+        timestamps = columns['timestamp']
+        count = len(timestamps)
+        if not count:
+            return 0
+        # Rows older than the last `max_memory_readings` would be evicted
+        # by this same batch, so they are never written
+        skip = max(count - self.max_memory_readings, 0)
+        values = [columns[name] for name in CHANNELS]
+        with self._lock:
+            for i in range(skip, count):
+                self._insert(float(timestamps[i]), *(float(column[i]) for column in values))
+            added = self._added_view(count - skip)
+        self._notify(added)
+        return count - skip
+
+    def subscribe(self, callback: Callable[[ReadingsView], None]) -> None:
+        """
+        Call `callback` with a ReadingsView of each batch of new readings.
+        Callbacks run on the thread that added the readings, after the
+        lock is released, and only receive the new rows.
+        """
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[ReadingsView], None]) -> None:
+        """Stop calling a subscribed callback"""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def _added_view(self, count: int) -> Optional[ReadingsView]:
+        """Snapshot of the last `count` inserted readings if anyone listens (caller holds the lock)"""
+        if not self._subscribers:
+            return None
+        return self._view(self._size - min(count, self._size), self._size)
+
+    def _notify(self, added: Optional[ReadingsView]) -> None:
+        if added is None:
+            return
+        for callback in list(self._subscribers):
+            try:
+                callback(added)
+            except Exception as e:
+                print(f"Error in sensor data subscriber: {e}")
+
+    @staticmethod
+    def _parse(data: dict) -> Tuple[float, float, float, float]:
+        return (
+            to_epoch(data.get('timestamp')),
+            float(data.get('temperature', 0)),
+            float(data.get('ph', 7.0)),
+            float(data.get('glucose', 0))
         )
-        self.readings.append(reading)
-        
-        # Trim old readings if necessary
-        if len(self.readings) > self.max_memory_readings:
-            self.readings = self.readings[-self.max_memory_readings:]
-    
-    def get_all_readings(self) -> List[SensorReading]:
+
+    def _insert(self, timestamp: float, temperature: float, ph: float, glucose: float) -> None:
+        """Write one reading at the ring head (caller holds the lock)"""
+        i = self._head
+
+        # Overwrite the oldest slot once the ring is full
+        if self._size == self.max_memory_readings:
+            evicted_seq = self._seq - self._size
+            for name in CHANNELS:
+                self._stats[name].pop(evicted_seq, self._columns[name][i])
+            # The reading after the evicted one no longer has a predecessor
+            if self._descents and self._descents[0] == evicted_seq + 1:
+                self._descents.popleft()
+            if self._order is not None:
+                # The oldest reading sorts first among equal timestamps
+                timestamps, seqs = self._order
+                k = bisect_left(timestamps, self._timestamps[i])
+                del timestamps[k], seqs[k]
+            self._size -= 1
+
+        if self._size and timestamp < self._timestamps[i - 1]:
+            self._descents.append(self._seq)
+        self._size += 1
+
+        if not self._descents:
+            self._order = None
+        elif self._order is not None:
+            # Merge into the sorted index instead of re-sorting on the next query
+            timestamps, seqs = self._order
+            k = bisect_right(timestamps, timestamp)
+            timestamps.insert(k, timestamp)
+            seqs.insert(k, self._seq)
+
+        self._timestamps[i] = timestamp
+        for name, value in zip(CHANNELS, (temperature, ph, glucose)):
+            self._columns[name][i] = value
+            self._stats[name].push(self._seq, value)
+        self._seq += 1
+        self._head = (i + 1) % self.max_memory_readings
+
+    def _copy(self, column: array, lo: int, hi: int) -> array:
+        """Copy logical positions [lo, hi) of a ring column (0 = oldest)"""
+        if hi <= lo:
+            return array('d')
+        cap = self.max_memory_readings
+        first = (self._head - self._size + lo) % cap
+        last = first + (hi - lo)
+        if last <= cap:
+            return column[first:last]
+        return column[first:] + column[:last - cap]
+
+    def _view(self, lo: int, hi: int) -> ReadingsView:
+        return ReadingsView(
+            self._copy(self._timestamps, lo, hi),
+            *(self._copy(self._columns[name], lo, hi) for name in CHANNELS)
+        )
+
+    def _timestamp_at(self, k: int) -> float:
+        return self._timestamps[(self._head - self._size + k) % self.max_memory_readings]
+
+    def _bisect(self, epoch: float, right: bool = False) -> int:
+        """Binary search the logical position of `epoch` (buffer must be sorted)"""
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            ts = self._timestamp_at(mid)
+            if ts < epoch or (right and ts == epoch):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _reading_at(self, k: int) -> SensorReading:
+        """Build the reading at logical position k (caller holds the lock)"""
+        i = (self._head - self._size + k) % self.max_memory_readings
+        return SensorReading(
+            timestamp=datetime.fromtimestamp(self._timestamps[i]),
+            temperature=self._columns['temperature'][i],
+            ph=self._columns['ph'][i],
+            glucose=self._columns['glucose'][i]
+        )
+
+    def _sorted_index(self):
+        """Get (timestamps, sequence numbers) of the buffer sorted by time"""
+        if self._order is None:
+            timestamps = self._copy(self._timestamps, 0, self._size)
+            order = sorted(range(self._size), key=timestamps.__getitem__)
+            first = self._seq - self._size
+            self._order = (array('d', (timestamps[k] for k in order)), [first + k for k in order])
+        return self._order
+
+    def _time_range(self, start: Optional[float], end: Optional[float]) -> ReadingsView:
+        """Get readings with start <= timestamp <= end, in time order"""
+        if not self._descents:
+            lo = 0 if start is None else self._bisect(start)
+            hi = self._size if end is None else self._bisect(end, right=True)
+            return self._view(lo, hi)
+
+        # A late reading is still buffered: search the sorted index
+        timestamps, seqs = self._sorted_index()
+        lo = 0 if start is None else bisect_left(timestamps, start)
+        hi = len(seqs) if end is None else bisect_right(timestamps, end)
+        cap = self.max_memory_readings
+        base = self._head - self._seq
+        physical = [(base + seq) % cap for seq in seqs[lo:hi]]
+        return ReadingsView(
+            timestamps[lo:hi],
+            *(array('d', (self._columns[name][i] for i in physical)) for name in CHANNELS)
+        )
+
+    def get_all_readings(self) -> ReadingsView:
         """Get all stored readings"""
-        return self.readings.copy()
-    
-    def get_recent_readings(self, count: int) -> List[SensorReading]:
+        with self._lock:
+            return self._view(0, self._size)
+
+    def get_recent_readings(self, count: int) -> ReadingsView:
         """Get the last N readings"""
-        return self.readings[-count:]
-    
-    def get_readings_since(self, timestamp: datetime) -> List[SensorReading]:
+        with self._lock:
+            return self._view(max(self._size - count, 0), self._size)
+
+    def latest(self) -> Optional[SensorReading]:
+        """Get the most recently added reading without copying the buffer"""
+        with self._lock:
+            if not self._size:
+                return None
+            return self._reading_at(self._size - 1)
+
+    def get_readings_slice(self, start: int, stop: int) -> ReadingsView:
+        """Get buffer positions [start, stop), 0 being the oldest reading"""
+        with self._lock:
+            return self._view(max(start, 0), min(stop, self._size))
+
+    def get_columns(self, count: Optional[int] = None) -> Dict[str, array]:
+        """Get the last N readings (default all) as arrays keyed by field name"""
+        if count is None:
+            return self.get_all_readings().columns()
+        return self.get_recent_readings(count).columns()
+
+    def get_readings_since(self, timestamp: datetime) -> ReadingsView:
         """Get readings since a specific time"""
-        return [r for r in self.readings if r.timestamp >= timestamp]
-    
+        cutoff = to_epoch(timestamp)
+        with self._lock:
+            return self._time_range(cutoff, None)
+
+    def get_readings_between(self, start: datetime, end: datetime) -> ReadingsView:
+        """Get readings with start <= timestamp <= end, ordered by time"""
+        start, end = to_epoch(start), to_epoch(end)
+        with self._lock:
+            return self._time_range(start, end)
+
     def clear_readings(self) -> None:
         """Clear all readings from memory"""
-        self.readings.clear()
-    
+        with self._lock:
+            self._head = 0
+            self._size = 0
+            self._descents.clear()
+            self._order = None
+            for stats in self._stats.values():
+                stats.reset()
+
     def get_statistics(self) -> dict:
-        """Get statistics of current readings"""
-        if not self.readings:
-            return {}
-        
-        temps = [r.temperature for r in self.readings]
-        ph_values = [r.ph for r in self.readings]
-        glucose_values = [r.glucose for r in self.readings]
-        
-        return {
-            'temperature': {
-                'min': min(temps),
-                'max': max(temps),
-                'avg': sum(temps) / len(temps)
-            },
-            'ph': {
-                'min': min(ph_values),
-                'max': max(ph_values),
-                'avg': sum(ph_values) / len(ph_values)
-            },
-            'glucose': {
-                'min': min(glucose_values),
-                'max': max(glucose_values),
-                'avg': sum(glucose_values) / len(glucose_values)
-            }
-        }
+        """Get statistics of current readings (maintained incrementally, O(1))"""
+        with self._lock:
+            if not self._size:
+                return {}
+            return {name: self._stats[name].summary() for name in CHANNELS}
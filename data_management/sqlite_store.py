@@ -0,0 +1,502 @@
+"""
+SQLite storage backend
+
+SQLiteHandler has the interface of CSVHandler but keeps every reading in
+one table of sensor_data.db with an index on the timestamp, so a time
+range or aggregate query touches only the rows it needs, whatever day
+boundaries it crosses. The database runs in WAL mode: the writer thread
+appends while other threads read through one shared read connection. Saved rows
+are buffered like CSVHandler's (`flush_rows` / `flush_interval`) and
+inserted with one executemany() per flush, in a single transaction.
+Queries are fixed SQL strings with parameters, so sqlite3 prepares each
+once and reuses it from its statement cache.
+
+Rollup tiers (rollup.py) are kept next to the database as for daily files.
+
+Existing daily files (any format, archived or not) are imported with
+
+    python -m data_management.sqlite_store ./sensor_data
+"""
+
+import argparse
+import itertools
+import math
+import sqlite3
+import threading
+import time
+from array import array
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from data_management import archive, parallel_loader
+from data_management.csv_handler import (
+    DURABILITY_MODES, FIELDNAMES, FILE_FORMATS, LOAD_OUTPUTS, OUTPUT_MODES, write_export
+)
+from data_management.csv_index import INDEX_STRIDE
+from data_management.rollup import RollupStore
+from data_management.sensor_data import ReadingsView, SensorReading, to_epoch
+from data_management.summary_store import FileSummary, combine_summaries
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+DB_NAME = 'sensor_data.db'
+# Rows fetched per round trip when streaming
+FETCH_ROWS = 4096
+
+SCHEMA = (
+    # `source` names the daily file an imported row came from (NULL for
+    # readings saved to the database)
+    'CREATE TABLE IF NOT EXISTS readings ('
+    'timestamp REAL NOT NULL, temperature REAL NOT NULL, ph REAL NOT NULL, glucose REAL NOT NULL, '
+    'source TEXT)',
+    'CREATE INDEX IF NOT EXISTS readings_timestamp ON readings (timestamp)',
+    'CREATE INDEX IF NOT EXISTS readings_source ON readings (source) WHERE source IS NOT NULL',
+    # Files imported by import_daily_files(), with their size and mtime
+    # at the time
+    'CREATE TABLE IF NOT EXISTS imported_files (source TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER)',
+)
+INSERT_SQL = 'INSERT INTO readings (timestamp, temperature, ph, glucose) VALUES (?, ?, ?, ?)'
+# An imported row, unless the same reading was already saved to the database
+IMPORT_SQL = ('INSERT INTO readings (timestamp, temperature, ph, glucose, source) '
+              'SELECT ?1, ?2, ?3, ?4, ?5 WHERE NOT EXISTS (SELECT 1 FROM readings WHERE timestamp = ?1 '
+              'AND temperature = ?2 AND ph = ?3 AND glucose = ?4 AND source IS NULL)')
+DELETE_SOURCE_SQL = 'DELETE FROM readings WHERE source = ?'
+# Time order; rows with equal timestamps stay in insertion order
+RANGE_SQL = ('SELECT {fields} FROM readings WHERE timestamp >= ? AND timestamp <= ? '
+             'ORDER BY timestamp, rowid')
+# One day; {order} is 'rowid' (insertion order, like rows in a daily
+# file) or 'timestamp, rowid'
+DAY_SQL = 'SELECT {fields} FROM readings WHERE timestamp >= ? AND timestamp < ? ORDER BY {order}'
+NEXT_SQL = 'SELECT min(timestamp) FROM readings WHERE timestamp >= ?'
+AGGREGATE_SQL = (
+    'SELECT count(*), min(timestamp), max(timestamp), ' + ', '.join(
+        f'sum({name}), sum({name} * {name}), min({name}), max({name})'
+        for name in FIELDNAMES[1:]
+    ) + ' FROM readings WHERE timestamp >= ? AND timestamp < ?'
+)
+LAST_SQL = ('SELECT temperature, ph, glucose FROM readings WHERE timestamp >= ? AND timestamp < ? '
+            'ORDER BY timestamp DESC, rowid DESC LIMIT 1')
+
+
+def _day_start(day: date) -> float:
+    """Epoch seconds of local midnight starting `day`"""
+    return datetime.combine(day, datetime.min.time()).timestamp()
+
+
+def _day_bounds(day: date) -> tuple:
+    """Epoch range [start, end) of a local day"""
+    return _day_start(day), _day_start(day + timedelta(days=1))
+
+
+class SQLiteHandler:
+    """
+    Stores sensor readings in an SQLite database, with the same interface
+    as CSVHandler (selected with data_storage.format = 'sqlite').
+
+    Rows are flushed once `flush_rows` rows are pending or `flush_interval`
+    seconds have passed since the last flush, and always on flush()/close().
+    With durability 'flush' commits use synchronous=NORMAL (a power cut
+    can lose the last commits, never corrupt the database); with 'fsync'
+    every commit is forced to storage (synchronous=FULL).
+    """
+
+    def __init__(self, storage_path: str = './sensor_data', flush_rows: int = 1,
+                 flush_interval: Optional[float] = None, durability: str = 'flush',
+                 db_name: str = DB_NAME, index_stride: int = INDEX_STRIDE):
+        """Open (creating if needed) the database in `storage_path`"""
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {DURABILITY_MODES}")
+        self.storage_path = Path(storage_path)
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.storage_path / db_name
+
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval = flush_interval
+        self.durability = durability
+        self.index_stride = index_stride
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+        self._rollups = RollupStore(self.storage_path)
+
+        self._conn = self._connect()
+        with self._conn:
+            for statement in SCHEMA:
+                self._conn.execute(statement)
+        # One read connection for every thread (callers may be short-lived
+        # worker threads), used under its own lock so reads never wait on a flush
+        self._read_conn = self._connect()
+        self._read_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f"PRAGMA synchronous={'FULL' if self.durability == 'fsync' else 'NORMAL'}")
+        return conn
+
+    def save_sensor_reading(self, data: dict) -> bool:
+        """Save a single sensor reading"""
+        try:
+            with self._lock:
+                self._add_row(data)
+                self.flush_if_due()
+            return True
+        except Exception as e:
+            print(f"Error saving sensor reading: {e}")
+            return False
+
+    def save_sensor_readings(self, readings: List[dict]) -> int:
+        """Save a batch of readings, returning how many were written"""
+        saved = 0
+        try:
+            with self._lock:
+                for data in readings:
+                    self._add_row(data)
+                    saved += 1
+                self.flush_if_due()
+        except Exception as e:
+            print(f"Error saving sensor readings: {e}")
+        return saved
+
+    def save_columns(self, columns: Dict[str, Sequence[float]]) -> int:
+        """Save a batch of readings given column-wise (timestamps in epoch seconds)"""
+        saved = 0
+        try:
+            with self._lock:
+                rows = zip(columns['timestamp'], columns['temperature'],
+                           columns['ph'], columns['glucose'])
+                for row in rows:
+                    epoch, *values = map(float, row)
+                    self._pending.append((epoch, *values))
+                    self._rollups.add(epoch, values)
+                    saved += 1
+                self.flush_if_due()
+        except Exception as e:
+            print(f"Error saving sensor readings: {e}")
+        return saved
+
+    def _add_row(self, data: dict) -> None:
+        epoch = to_epoch(data.get('timestamp'))
+        values = (
+            float(data.get('temperature', 0)),
+            float(data.get('ph', 7.0)),
+            float(data.get('glucose', 0))
+        )
+        self._pending.append((epoch, *values))
+        self._rollups.add(epoch, values)
+
+    def flush_if_due(self) -> bool:
+        """Flush pending rows if the row-count or time threshold is reached"""
+        with self._lock:
+            if not self._pending:
+                return False
+            if len(self._pending) >= self.flush_rows or (
+                    self.flush_interval is not None and
+                    time.monotonic() - self._last_flush >= self.flush_interval):
+                return self.flush()
+            return False
+
+    def flush(self) -> bool:
+        """Insert pending rows in one transaction"""
+        try:
+            with self._lock:
+                if self._pending:
+                    with self._conn:
+                        self._conn.executemany(INSERT_SQL, self._pending)
+                    self._pending = []
+                    self._rollups.flush(force=False)
+                self._last_flush = time.monotonic()
+            return True
+        except Exception as e:
+            print(f"Error flushing sensor readings: {e}")
+            return False
+
+    def close(self) -> None:
+        """Flush pending rows and close the database"""
+        try:
+            with self._lock:
+                self.flush()
+                self._rollups.flush()
+                with self._read_lock:
+                    self._read_conn.close()
+                self._conn.close()
+        except Exception as e:
+            print(f"Error closing database: {e}")
+
+    def _query(self, sql: str, params: tuple) -> Iterator[tuple]:
+        """Stream the rows of a query, FETCH_ROWS at a time"""
+        with self._read_lock:
+            cursor = self._read_conn.execute(sql, params)
+        try:
+            while True:
+                with self._read_lock:
+                    rows = cursor.fetchmany(FETCH_ROWS)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            with self._read_lock:
+                cursor.close()
+
+    def _columns(self, rows: Iterator[tuple], count: int) -> list:
+        """Transpose query rows into one array per field"""
+        if np is None:
+            columns = [array('d') for _ in range(count)]
+            for row in rows:
+                for column, value in zip(columns, row):
+                    column.append(value)
+            return columns
+        flat = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.float64)
+        return [np.ascontiguousarray(column) for column in flat.reshape(-1, count).T]
+
+    def load_sensor_readings(self, date=None, output: str = 'dict'):
+        """
+        Load the readings of a date; `output` is 'dict' (a list of dicts in
+        insertion order), 'columns' or 'readings' (time order), as for
+        CSVHandler.load_sensor_readings
+        """
+        if output not in LOAD_OUTPUTS:
+            raise ValueError(f"output must be one of {LOAD_OUTPUTS}")
+        self.flush()
+        try:
+            day = datetime.now().date() if date is None else date
+            day = datetime.fromisoformat(day).date() if isinstance(day, str) else day
+            order = 'rowid' if output == 'dict' else 'timestamp, rowid'
+            rows = self._query(DAY_SQL.format(fields=', '.join(FIELDNAMES), order=order), _day_bounds(day))
+            if output == 'dict':
+                return [self._reading_dict(FIELDNAMES, row) for row in rows]
+            return self._load_output(dict(zip(FIELDNAMES, self._columns(rows, len(FIELDNAMES)))), output)
+        except Exception as e:
+            print(f"Error loading sensor readings: {e}")
+            return [] if output == 'dict' else self._load_output(None, output)
+
+    def load_all_readings(self, output: str = 'dict'):
+        """Load every reading (`output` as for load_sensor_readings)"""
+        if output not in LOAD_OUTPUTS:
+            raise ValueError(f"output must be one of {LOAD_OUTPUTS}")
+        if output != 'dict':
+            return self._load_output(self.load_range(), output)
+        try:
+            return list(self.iter_readings())
+        except Exception as e:
+            print(f"Error loading all readings: {e}")
+            return []
+
+    def _load_output(self, columns: Optional[Dict[str, object]], output: str):
+        if columns is None:
+            columns = dict(zip(FIELDNAMES, self._columns(iter(()), len(FIELDNAMES))))
+        if output == 'readings':
+            return ReadingsView(*(columns[name] for name in FIELDNAMES))
+        return columns
+
+    @staticmethod
+    def _reading_dict(fields: List[str], row: tuple) -> dict:
+        reading = dict(zip(fields, row))
+        if 'timestamp' in reading:
+            reading['timestamp'] = datetime.fromtimestamp(reading['timestamp'])
+        return reading
+
+    @staticmethod
+    def _bounds(start, end) -> tuple:
+        return (-math.inf if start is None else to_epoch(start),
+                math.inf if end is None else to_epoch(end))
+
+    def iter_readings(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      fields: Optional[Sequence[str]] = None,
+                      output: str = 'dict') -> Iterator:
+        """
+        Stream readings with start <= timestamp <= end in time order.
+        `output` is 'dict', 'tuple' or 'columns' as for
+        CSVHandler.iter_readings, except that 'columns' yields one dict of
+        columns per FETCH_ROWS rows rather than per daily file.
+        """
+        fields = parallel_loader.check_fields(fields)
+        if output not in OUTPUT_MODES:
+            raise ValueError(f"output must be one of {OUTPUT_MODES}")
+        self.flush()
+
+        rows = self._query(RANGE_SQL.format(fields=', '.join(fields)), self._bounds(start, end))
+        if output == 'dict':
+            for row in rows:
+                yield self._reading_dict(fields, row)
+        elif output == 'tuple':
+            yield from rows
+        else:
+            while True:
+                chunk = list(itertools.islice(rows, FETCH_ROWS))
+                if not chunk or not fields:
+                    return
+                yield dict(zip(fields, self._columns(iter(chunk), len(fields))))
+
+    def load_range(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   fields: Optional[Sequence[str]] = None) -> Dict[str, object]:
+        """
+        Load readings with start <= timestamp <= end as per-channel arrays
+        in time order, found through the timestamp index
+        """
+        fields = parallel_loader.check_fields(fields)
+        self.flush()
+        try:
+            rows = self._query(RANGE_SQL.format(fields=', '.join(fields)), self._bounds(start, end))
+            columns = self._columns(rows, len(fields))
+        except Exception as e:
+            print(f"Error loading sensor range: {e}")
+            columns = self._columns(iter(()), len(fields))
+        return dict(zip(fields, columns))
+
+    def load_range_parallel(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                            fields: Optional[Sequence[str]] = None, workers: Optional[int] = None,
+                            min_parallel_files: int = parallel_loader.MIN_PARALLEL_FILES
+                            ) -> Dict[str, object]:
+        """Same as load_range(): one indexed query has nothing to parallelise"""
+        return self.load_range(start, end, fields)
+
+    def load_rollup(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    points: int = 500, tier: Optional[str] = None) -> dict:
+        """Downsampled history for long-range views (see CSVHandler.load_rollup)"""
+        end_epoch = to_epoch(end)
+        start_epoch = end_epoch - 86400 if start is None else to_epoch(start)
+        with self._lock:
+            return self._rollups.query(start_epoch, end_epoch, points, tier)
+
+    def rebuild_rollups(self) -> int:
+        """Recreate the rollup tiers from the database, returning the row count"""
+        self.flush()
+        with self._lock:
+            return self._rollups.rebuild(self._query(RANGE_SQL.format(fields=', '.join(FIELDNAMES)),
+                                                     (-math.inf, math.inf)))
+
+    def archive_closed_days(self, codec: str = archive.DEFAULT_CODEC,
+                            before: Optional[date] = None) -> List[archive.ArchiveResult]:
+        """Nothing to archive: the database has no daily files"""
+        return []
+
+    def export_all_data(self, readings: List[SensorReading], filename: str = None) -> str:
+        """Export readings to a named CSV file"""
+        try:
+            if filename is None:
+                filename = f"sensor_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            export_path = self.storage_path / filename
+            write_export(export_path, readings, self.index_stride)
+            return str(export_path)
+        except Exception as e:
+            print(f"Error exporting data: {e}")
+            return ""
+
+    def get_storage_path(self) -> str:
+        """Get the storage directory path"""
+        return str(self.storage_path)
+
+    def get_available_dates(self) -> List[str]:
+        """
+        Dates with readings, found by seeking the timestamp index to the
+        first reading at or after each next midnight (one lookup per day)
+        """
+        self.flush()
+        dates = []
+        try:
+            with self._read_lock:
+                conn = self._read_conn
+                epoch = conn.execute(NEXT_SQL, (-math.inf,)).fetchone()[0]
+                while epoch is not None:
+                    day = datetime.fromtimestamp(epoch).date()
+                    dates.append(str(day))
+                    epoch = conn.execute(NEXT_SQL, (_day_start(day + timedelta(days=1)),)).fetchone()[0]
+        except Exception as e:
+            print(f"Error getting available dates: {e}")
+        return dates
+
+    def get_statistics(self, start_date=None, end_date=None) -> dict:
+        """
+        Statistics over the days from start_date to end_date (inclusive,
+        default all) from one aggregate query over the indexed range.
+        Shaped like CSVHandler.get_statistics.
+        """
+        self.flush()
+        try:
+            start_date = date.fromisoformat(start_date) if isinstance(start_date, str) else start_date
+            end_date = date.fromisoformat(end_date) if isinstance(end_date, str) else end_date
+            bounds = (-math.inf if start_date is None else _day_start(start_date),
+                      math.inf if end_date is None else _day_start(end_date + timedelta(days=1)))
+            with self._read_lock:
+                count, first, last, *aggregates = self._read_conn.execute(AGGREGATE_SQL, bounds).fetchone()
+                if not count:
+                    return {}
+                lasts = self._read_conn.execute(LAST_SQL, bounds).fetchone()
+
+            summary = FileSummary()
+            summary.count = count
+            summary.first_timestamp = first
+            summary.last_timestamp = last
+            for i, name in enumerate(FIELDNAMES[1:]):
+                total, total_sq, low, high = aggregates[4 * i:4 * i + 4]
+                summary.channels[name] = {'sum': total, 'sumsq': total_sq, 'min': low,
+                                          'max': high, 'last': lasts[i]}
+            return combine_summaries([summary])
+        except Exception as e:
+            print(f"Error computing statistics: {e}")
+            return {}
+
+    def import_daily_files(self, source_path) -> int:
+        """
+        Import the daily files of a CSVHandler storage directory (CSV,
+        binary or delta, archived or not), returning the number of rows
+        added. Files are skipped while their size and mtime are unchanged
+        since the last import; a changed file (appended to, or archived)
+        replaces only the rows imported from it. Readings already saved
+        to the database are never touched nor imported a second time.
+        """
+        imported = 0
+        changed = False
+        for path in sorted(Path(source_path).glob('sensor_data_*')):
+            suffix = archive.data_suffix(path)
+            if suffix not in FILE_FORMATS.values():
+                continue
+            try:
+                archive.file_day(path)
+            except ValueError:
+                continue  # Not a daily file
+            # Keyed without the archive extension, so an archived file
+            # replaces the rows of its plain original
+            source = path.name.split('.')[0] + suffix
+            stat = path.stat()
+            with self._lock:
+                seen = self._conn.execute(
+                    'SELECT size, mtime_ns FROM imported_files WHERE source = ?', (source,)
+                ).fetchone()
+            if seen == (stat.st_size, stat.st_mtime_ns):
+                continue
+
+            columns = parallel_loader.read_file_columns(str(path), None, None, FIELDNAMES)
+            rows = zip(*(column.tolist() for column in columns), itertools.repeat(source))
+            with self._lock:
+                self.flush()
+                with self._conn:
+                    self._conn.execute(DELETE_SOURCE_SQL, (source,))
+                    imported += self._conn.executemany(IMPORT_SQL, rows).rowcount
+                    self._conn.execute('INSERT OR REPLACE INTO imported_files VALUES (?, ?, ?)',
+                                       (source, stat.st_size, stat.st_mtime_ns))
+            changed = True
+        if changed:
+            self.rebuild_rollups()
+        return imported
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import daily sensor files into the SQLite backend')
+    parser.add_argument('storage_path', help='Directory holding sensor_data_* files')
+    parser.add_argument('--db', default=None, help=f'Database directory (default: storage_path/{DB_NAME})')
+    args = parser.parse_args()
+    with SQLiteHandler(args.db or args.storage_path) as handler:
+        print(f"Imported {handler.import_daily_files(args.storage_path)} reading(s) into {handler.db_path}")
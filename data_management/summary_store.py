@@ -0,0 +1,198 @@
+"""
+Per-file summary cache for daily sensor files
+
+Keeps count, sum, sum of squares, min, max and last value per channel plus
+the first/last timestamp of every daily file in sensor_summaries.json, so
+multi-day statistics never rescan raw rows. Entries record the file's size
+and mtime and are recomputed when the file changes on disk.
+"""
+
+import json
+import math
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Tuple
+
+
+CHANNELS = ('temperature', 'ph', 'glucose')
+SUMMARY_FILE = 'sensor_summaries.json'
+SUMMARY_VERSION = 1
+# Minimum seconds between rewrites of the store while appending
+SAVE_INTERVAL = 60.0
+
+
+class FileSummary:
+    """Running aggregates of one daily file"""
+
+    def __init__(self):
+        self.count = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.channels = {
+            name: {'sum': 0.0, 'sumsq': 0.0, 'min': None, 'max': None, 'last': None}
+            for name in CHANNELS
+        }
+        self.size = -1  # File size and mtime the summary matches
+        self.mtime_ns = -1
+
+    def add(self, timestamp: float, temperature: float, ph: float, glucose: float) -> None:
+        """Fold one row into the summary"""
+        self.count += 1
+        if self.first_timestamp is None or timestamp < self.first_timestamp:
+            self.first_timestamp = timestamp
+        if self.last_timestamp is None or timestamp > self.last_timestamp:
+            self.last_timestamp = timestamp
+        for name, value in zip(CHANNELS, (temperature, ph, glucose)):
+            channel = self.channels[name]
+            channel['sum'] += value
+            channel['sumsq'] += value * value
+            if channel['min'] is None or value < channel['min']:
+                channel['min'] = value
+            if channel['max'] is None or value > channel['max']:
+                channel['max'] = value
+            channel['last'] = value
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'first_timestamp': self.first_timestamp,
+            'last_timestamp': self.last_timestamp,
+            'channels': self.channels,
+            'size': self.size,
+            'mtime_ns': self.mtime_ns,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'FileSummary':
+        summary = cls()
+        summary.count = data['count']
+        summary.first_timestamp = data['first_timestamp']
+        summary.last_timestamp = data['last_timestamp']
+        summary.channels = data['channels']
+        summary.size = data['size']
+        summary.mtime_ns = data['mtime_ns']
+        return summary
+
+
+def combine_summaries(summaries: Iterable[FileSummary]) -> dict:
+    """
+    Merge file summaries into statistics shaped like
+    SensorData.get_statistics (population stddev)
+    """
+    summaries = [s for s in summaries if s.count]
+    if not summaries:
+        return {}
+
+    count = sum(s.count for s in summaries)
+    latest = max(summaries, key=lambda s: s.last_timestamp)
+    stats = {}
+    for name in CHANNELS:
+        total = sum(s.channels[name]['sum'] for s in summaries)
+        total_sq = sum(s.channels[name]['sumsq'] for s in summaries)
+        mean = total / count
+        stats[name] = {
+            'min': min(s.channels[name]['min'] for s in summaries),
+            'max': max(s.channels[name]['max'] for s in summaries),
+            'avg': mean,
+            'stddev': math.sqrt(max(total_sq / count - mean * mean, 0.0)),
+            'count': count,
+            'last': latest.channels[name]['last'],
+        }
+    stats['first_timestamp'] = min(s.first_timestamp for s in summaries)
+    stats['last_timestamp'] = latest.last_timestamp
+    return stats
+
+
+class SummaryStore:
+    """Summaries of all daily files, keyed by file name"""
+
+    def __init__(self, storage_path, scan: Callable[[Path], Iterable[Tuple[float, float, float, float]]]):
+        """`scan` yields (epoch, temperature, ph, glucose) rows of a daily file"""
+        self.path = Path(storage_path) / SUMMARY_FILE
+        self._scan = scan
+        self._summaries: Dict[str, FileSummary] = {}
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get('version') == SUMMARY_VERSION:
+                self._summaries = {
+                    name: FileSummary.from_dict(entry) for name, entry in data['files'].items()
+                }
+        except (OSError, ValueError, KeyError, TypeError):
+            self._summaries = {}
+
+    def save(self) -> None:
+        """Write the store atomically"""
+        tmp = self.path.with_suffix('.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({
+                'version': SUMMARY_VERSION,
+                'files': {name: s.to_dict() for name, s in self._summaries.items()},
+            }, f)
+        os.replace(tmp, self.path)
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def save_if_due(self, interval: float = SAVE_INTERVAL) -> None:
+        """Save pending changes at most once per `interval` seconds"""
+        if self._dirty and time.monotonic() - self._last_save >= interval:
+            self.save()
+
+    def get(self, file_path) -> FileSummary:
+        """Get the summary of a daily file, recomputing it if the file changed"""
+        file_path = Path(file_path)
+        stat = os.stat(file_path)
+        summary = self._summaries.get(file_path.name)
+        if summary is not None and summary.size == stat.st_size and summary.mtime_ns == stat.st_mtime_ns:
+            return summary
+
+        summary = FileSummary()
+        for row in self._scan(file_path):
+            summary.add(*row)
+        summary.size = stat.st_size
+        summary.mtime_ns = stat.st_mtime_ns
+        self._summaries[file_path.name] = summary
+        self._dirty = True
+        return summary
+
+    def mark_current(self, file_path) -> None:
+        """Record that the summary covers the file as it is now on disk"""
+        file_path = Path(file_path)
+        summary = self._summaries.get(file_path.name)
+        if summary is not None:
+            stat = os.stat(file_path)
+            summary.size = stat.st_size
+            summary.mtime_ns = stat.st_mtime_ns
+            self._dirty = True
+
+    def rename(self, old_path, new_path) -> None:
+        """
+        Carry a file's summary over to the file that replaced it with the
+        same rows (e.g. its compressed archive) so it isn't rescanned
+        """
+        summary = self._summaries.pop(Path(old_path).name, None)
+        if summary is None:
+            return
+        self._dirty = True
+        new_path = Path(new_path)
+        if new_path.name not in self._summaries:
+            self._summaries[new_path.name] = summary
+            self.mark_current(new_path)
+
+    def prune(self, existing_names: Iterable[str]) -> None:
+        """Forget summaries of files that no longer exist"""
+        stale = set(self._summaries) - set(existing_names)
+        for name in stale:
+            del self._summaries[name]
+        if stale:
+            self._dirty = True
+
+    def statistics(self, file_paths: Iterable) -> dict:
+        """Combined statistics of several daily files"""
+        return combine_summaries(self.get(path) for path in file_paths)
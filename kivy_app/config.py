@@ -19,12 +19,23 @@ class AppConfig:
             'port': '/dev/ttyUSB0',
             'baud_rate': 115200,
             'timeout': 2.0,
-            'update_interval': 5,
+            'update_interval': 5,  # Seconds between polls in 'poll' mode
+            'acquisition': 'push',  # 'push' (tag reads as they happen) or 'poll'
+            'mock_rate': None,  # Mock tag reads per second when running without JNI
+            'simulator': None,  # e.g. {'source': 'synthetic', 'rate': 2000} (see android_jni/simulator.py)
         },
         'data_storage': {
             'path': './sensor_data',
-            'format': 'csv',
+            'format': 'csv',  # 'csv', 'binary', 'delta' or 'sqlite'
             'rotation': 'daily',
+            'flush_rows': 12,  # Buffered rows before writing to flash
+            'flush_interval': 60.0,  # seconds
+            'durability': 'flush',  # 'flush' or 'fsync'
+            'queue_size': 1000,  # Readings waiting for the writer thread
+            'queue_policy': 'drop_oldest',  # 'drop_oldest', 'drop_newest' or 'block'
+            'batch_size': 50,
+            'archive': True,  # Compress closed daily files in the background
+            'archive_codec': 'gzip',  # 'gzip' or 'lzma'
         },
         'calibration': {
             'temperature_offset': 0.0,
@@ -0,0 +1,382 @@
+"""
+Time-series chart widget drawn with canvas instructions
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from kivy.clock import Clock
+from kivy.graphics import Color, Line, PopMatrix, PushMatrix, Scale, Translate
+from kivy.graphics.scissor_instructions import ScissorPop, ScissorPush
+from kivy.uix.label import Label
+from kivy.uix.widget import Widget
+
+from data_management.downsampling import downsample
+
+
+CHANNEL_COLORS = {
+    'temperature': (1.0, 0.45, 0.3),
+    'ph': (0.3, 0.75, 1.0),
+    'glucose': (0.5, 1.0, 0.4),
+}
+AXIS_COLOR = (0.6, 0.6, 0.6)
+# Space around the plot area for tick labels
+MARGIN_LEFT = 60
+MARGIN_BOTTOM = 30
+MARGIN_TOP = 24
+MARGIN_RIGHT = 10
+TICKS = 5
+MIN_SPAN = 1.0  # Narrowest zoom in seconds
+Y_PAD = 0.05  # Fraction of the value range added above and below
+
+
+def _padded(low, high):
+    if high - low < 1e-9:
+        return low - 1, high + 1
+    pad = (high - low) * Y_PAD
+    return low - pad, high + pad
+
+
+class SensorChart(Widget):
+    """
+    Line chart of sensor channels against time.
+
+    Each channel is one Line instruction whose vertices are kept in data
+    units (seconds since an origin, raw value) behind a Translate/Scale
+    pair, so scrolling and rescaling only touch two matrices. A rebuild
+    (on zoom, pan, resize or new data set) re-downsamples the visible
+    window to the plot width; live readings passed to append() only add
+    their own vertices and drop the ones scrolled out of view, so a tick
+    costs O(new readings) in Python. Once more raw points than the plot
+    is wide have been appended, the window is downsampled again.
+
+    The y axis is labelled for the first visible channel; further
+    channels are scaled to their own range and listed in the legend.
+    Drag to pan, pinch or scroll to zoom, double tap to show everything
+    and follow new readings again.
+    """
+
+    def __init__(self, channels=('temperature', 'ph', 'glucose'), mode='lttb',
+                 capacity=10000, **kwargs):
+        super().__init__(**kwargs)
+        self.channels = list(channels)
+        self.visible = list(channels)
+        self.mode = mode
+        self.capacity = capacity  # Readings kept for panning back in time
+        self.columns = {name: array('d') for name in ['timestamp'] + self.channels}
+        self.x_range = None  # (start, end) epoch seconds, None = fit data
+        self._origin = 0.0  # Epoch of vertex x = 0
+        self._y_ranges = {}  # Channel -> (low, high) being drawn
+        self._vertices = {name: [] for name in self.channels}
+        self._appended = 0  # Readings appended since the last rebuild
+        self._touches = []
+
+        self._lines = {}
+        with self.canvas:
+            Color(*AXIS_COLOR)
+            self._frame = Line()
+            self._grid = Line()
+            self._scissor = ScissorPush()
+            for name in self.channels:
+                Color(*CHANNEL_COLORS.get(name, (1, 1, 1)))
+                PushMatrix()
+                translate = Translate()
+                scale = Scale()
+                self._lines[name] = (translate, scale, Line())
+                PopMatrix()
+            ScissorPop()
+
+        # Tick and legend labels are created once and only re-texted
+        self._x_labels = [self._make_label('center') for _ in range(TICKS)]
+        self._y_labels = [self._make_label('right') for _ in range(TICKS)]
+        self._legend = self._make_label('left')
+        self._legend.markup = True
+
+        self._trigger_rebuild = Clock.create_trigger(self._rebuild)
+        self.bind(pos=self._trigger_rebuild, size=self._trigger_rebuild)
+
+    def _make_label(self, halign):
+        label = Label(size_hint=(None, None), size=(MARGIN_LEFT - 4, 20),
+                      font_size='11sp', halign=halign, valign='middle')
+        label.bind(size=label.setter('text_size'))
+        self.add_widget(label)
+        return label
+
+    # Data and view
+
+    def set_data(self, columns):
+        """Plot columns holding 'timestamp' (epoch seconds) and channel sequences"""
+        self.columns = {
+            name: array('d', columns[name][-self.capacity:]) for name in self.columns
+        }
+        self._trigger_rebuild()
+
+    def append(self, columns):
+        """Add new readings (same column layout as set_data) to the plot"""
+        timestamps = columns['timestamp']
+        if not len(timestamps):
+            return
+        data = self.columns
+        previous = data['timestamp'][-1] if len(data['timestamp']) else None
+        for name, column in data.items():
+            column.extend(columns[name])
+        if len(data['timestamp']) > 2 * self.capacity:
+            # Trim in large steps so dropping old readings stays amortised O(1)
+            for column in data.values():
+                del column[:len(column) - self.capacity]
+
+        if previous is None:
+            self._trigger_rebuild()
+            return
+        if timestamps[0] < previous or any(
+                timestamps[i] > timestamps[i + 1] for i in range(len(timestamps) - 1)):
+            self._sort_columns()  # Late readings: redraw from re-sorted data
+            self._trigger_rebuild()
+            return
+
+        if self.x_range is not None:
+            start, end = self.x_range
+            if end < previous:
+                return  # Looking at older data: nothing visible changes
+            # Following the newest reading: scroll the view along with it
+            shift = timestamps[-1] - previous
+            self.x_range = (start + shift, end + shift)
+
+        start, _ = self._view_range()
+        for name in self.visible:
+            vertices = self._vertices[name]
+            values = columns[name]
+            for t, value in zip(timestamps, values):
+                vertices.append(t - self._origin)
+                vertices.append(value)
+            lowest, highest = min(values), max(values)
+            if name not in self._y_ranges:
+                self._y_ranges[name] = _padded(lowest, highest)
+            else:
+                low, high = self._y_ranges[name]
+                if lowest < low or highest > high:
+                    self._y_ranges[name] = _padded(min(lowest, low), max(highest, high))
+            # Drop vertices scrolled out of view, keeping one to reach the edge
+            cutoff = start - self._origin
+            drop = 0
+            while drop + 3 < len(vertices) and vertices[drop + 2] < cutoff:
+                drop += 2
+            if drop:
+                del vertices[:drop]
+            self._lines[name][2].points = vertices
+
+        self._appended += len(timestamps)
+        if self._appended > self.plot_area()[2]:
+            self._trigger_rebuild()
+        else:
+            self._update_transforms()
+
+    def _sort_columns(self):
+        """Restore time order after late readings"""
+        timestamps = self.columns['timestamp']
+        order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+        for name, column in self.columns.items():
+            self.columns[name] = array('d', (column[i] for i in order))
+
+    def show_channels(self, names):
+        """Choose which channels are drawn"""
+        self.visible = [name for name in self.channels if name in names]
+        self._trigger_rebuild()
+
+    def reset_view(self):
+        """Fit the whole data range"""
+        self.x_range = None
+        self._trigger_rebuild()
+
+    def _view_range(self):
+        if self.x_range is not None:
+            return self.x_range
+        timestamps = self.columns['timestamp']
+        if not len(timestamps):
+            return None
+        start, end = timestamps[0], timestamps[-1]
+        if end - start < MIN_SPAN:
+            return start - MIN_SPAN / 2, end + MIN_SPAN / 2
+        return start, end
+
+    def _set_view(self, start, end):
+        if end - start < MIN_SPAN:
+            middle = (start + end) / 2
+            start, end = middle - MIN_SPAN / 2, middle + MIN_SPAN / 2
+        self.x_range = (start, end)
+        self._trigger_rebuild()
+
+    def zoom(self, factor, anchor_x=None):
+        """Scale the visible span by `factor` (< 1 zooms in) around a pixel x"""
+        view = self._view_range()
+        if view is None:
+            return
+        start, end = view
+        left, _, width, _ = self.plot_area()
+        fraction = 0.5 if anchor_x is None else min(max((anchor_x - left) / width, 0.0), 1.0)
+        anchor = start + fraction * (end - start)
+        self._set_view(anchor - (anchor - start) * factor, anchor + (end - anchor) * factor)
+
+    def pan(self, dx_pixels):
+        """Shift the visible span by a pixel distance"""
+        view = self._view_range()
+        if view is None:
+            return
+        start, end = view
+        shift = -dx_pixels / self.plot_area()[2] * (end - start)
+        self._set_view(start + shift, end + shift)
+
+    # Drawing
+
+    def plot_area(self):
+        """(x, y, width, height) of the plot inside the axes"""
+        return (
+            self.x + MARGIN_LEFT,
+            self.y + MARGIN_BOTTOM,
+            max(self.width - MARGIN_LEFT - MARGIN_RIGHT, 1),
+            max(self.height - MARGIN_BOTTOM - MARGIN_TOP, 1),
+        )
+
+    def _window(self, start, end):
+        """Slice bounds of the columns with start <= timestamp <= end"""
+        timestamps = self.columns['timestamp']
+        # Include one point either side so lines run to the plot edges
+        lo = max(bisect_left(timestamps, start) - 1, 0)
+        hi = min(bisect_right(timestamps, end) + 1, len(timestamps))
+        return lo, hi
+
+    def _rebuild(self, *args):
+        """Recompute every vertex from the visible window"""
+        left, bottom, width, height = self.plot_area()
+        self._frame.rectangle = (left, bottom, width, height)
+        self._scissor.pos = (int(left), int(bottom))
+        self._scissor.size = (int(width), int(height))
+        self._appended = 0
+        self._y_ranges = {}
+
+        view = self._view_range()
+        if view is None:
+            for name in self.channels:
+                self._vertices[name] = []
+                self._lines[name][2].points = []
+            self._update_transforms()
+            return
+
+        start, end = view
+        self._origin = start
+        lo, hi = self._window(start, end)
+        for name in self.channels:
+            vertices = []
+            if name in self.visible and hi > lo:
+                xs, ys = downsample(self.columns['timestamp'][lo:hi], self.columns[name][lo:hi],
+                                    width, self.mode)
+                for t, value in zip(xs, ys):
+                    vertices.append(t - start)
+                    vertices.append(value)
+                self._y_ranges[name] = _padded(min(ys), max(ys))
+            self._vertices[name] = vertices
+            self._lines[name][2].points = vertices
+        self._update_transforms()
+
+    def _update_transforms(self):
+        """Map data units to the plot area for the current view"""
+        left, bottom, width, height = self.plot_area()
+        view = self._view_range()
+        if view is None:
+            self._draw_axes(None)
+            return
+        start, end = view
+        x_scale = width / (end - start)
+        for name, (low, high) in self._y_ranges.items():
+            translate, scale, _ = self._lines[name]
+            y_scale = height / (high - low)
+            scale.xyz = (x_scale, y_scale, 1.0)
+            translate.xy = (left + (self._origin - start) * x_scale, bottom - low * y_scale)
+        self._draw_axes(view)
+
+    def _draw_axes(self, view):
+        left, bottom, width, height = self.plot_area()
+        self._legend.pos = (left, bottom + height + 2)
+        self._legend.width = width
+        if view is None:
+            self._grid.points = []
+            for label in self._x_labels + self._y_labels:
+                label.text = ''
+            self._legend.text = 'No data'
+            return
+
+        start, end = view
+        time_format = '%H:%M:%S' if end - start < 86400 else '%m-%d %H:%M'
+        grid = []
+        for i, label in enumerate(self._x_labels):
+            fraction = i / (TICKS - 1)
+            x = left + fraction * width
+            grid += [x, bottom, x, bottom - 4, x, bottom]
+            label.text = datetime.fromtimestamp(start + fraction * (end - start)).strftime(time_format)
+            label.center_x = x
+            label.top = bottom - 4
+
+        ranges = self._y_ranges
+        primary = next((name for name in self.visible if name in ranges), None)
+        for i, label in enumerate(self._y_labels):
+            fraction = i / (TICKS - 1)
+            y = bottom + fraction * height
+            grid += [left, y, left - 4, y, left, y]
+            if primary is None:
+                label.text = ''
+            else:
+                low, high = ranges[primary]
+                label.text = f"{low + fraction * (high - low):.4g}"
+            label.right = left - 6
+            label.center_y = y
+        self._grid.points = grid
+
+        legend = []
+        for name in self.visible:
+            if name in ranges:
+                r, g, b = CHANNEL_COLORS.get(name, (1, 1, 1))
+                low, high = ranges[name]
+                legend.append(f"[color={int(r * 255):02x}{int(g * 255):02x}{int(b * 255):02x}]"
+                              f"{name} {low:.4g}-{high:.4g}[/color]")
+        self._legend.text = '   '.join(legend)
+
+    # Touch handling
+
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos):
+            return super().on_touch_down(touch)
+        if touch.is_mouse_scrolling:
+            if touch.button == 'scrolldown':
+                self.zoom(0.8, touch.x)
+            elif touch.button == 'scrollup':
+                self.zoom(1.25, touch.x)
+            return True
+        if touch.is_double_tap:
+            self.reset_view()
+            return True
+        touch.grab(self)
+        self._touches.append(touch)
+        return True
+
+    def on_touch_move(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_move(touch)
+        if len(self._touches) == 1:
+            self.pan(touch.dx)
+        elif len(self._touches) >= 2 and touch in self._touches[:2]:
+            # Pinch: zoom by the change in finger distance around their midpoint
+            other = self._touches[1] if touch is self._touches[0] else self._touches[0]
+            before = abs(touch.px - other.x)
+            after = abs(touch.x - other.x)
+            if before > 1 and after > 1:
+                self.zoom(before / after, (touch.x + other.x) / 2)
+        return True
+
+    def on_touch_up(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_up(touch)
+        touch.ungrab(self)
+        if touch in self._touches:
+            self._touches.remove(touch)
+        return True
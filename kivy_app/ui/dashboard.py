@@ -6,14 +6,15 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
 from kivy.uix.button import Button
-from kivy.clock import Clock
 from kivy.uix.progressbar import ProgressBar
 
+from kivy_app.ui.live_feed import LiveFeed
+
 
 class DashboardScreen(BoxLayout):
     """Live dashboard displaying current sensor readings"""
     
-    def __init__(self, sensor_interface, sensor_data, **kwargs):
+    def __init__(self, sensor_interface, sensor_data, live_feed=None, **kwargs):
         super().__init__(**kwargs)
         self.orientation = 'vertical'
         self.padding = 10
@@ -21,6 +22,7 @@ class DashboardScreen(BoxLayout):
         
         self.sensor_interface = sensor_interface
         self.sensor_data = sensor_data
+        self.live_feed = live_feed or LiveFeed(sensor_data)
         
         # Title
         title = Label(text='Live Sensor Dashboard', size_hint_y=0.15, bold=True, font_size='20sp')
@@ -64,34 +66,41 @@ class DashboardScreen(BoxLayout):
         
         self.add_widget(btn_layout)
         
-        # Schedule updates
-        self.update_event = None
+        self.monitoring = False
     
     def start_monitoring(self, instance):
         """Start monitoring sensors"""
-        if self.update_event is None:
-            self.update_event = Clock.schedule_interval(self.update_dashboard, 2)
+        if not self.monitoring:
+            self.monitoring = True
+            # Updated when a new reading arrives instead of polling
+            self.live_feed.bind(latest=self._on_latest)
+            self.update_dashboard()
     
     def stop_monitoring(self, instance):
         """Stop monitoring sensors"""
-        if self.update_event:
-            self.update_event.cancel()
-            self.update_event = None
+        if self.monitoring:
+            self.monitoring = False
+            self.live_feed.unbind(latest=self._on_latest)
+    
+    def _on_latest(self, feed, reading):
+        self._show_reading(reading)
     
-    def update_dashboard(self, dt):
+    def update_dashboard(self, dt=None):
         """Update dashboard values"""
-        readings = self.sensor_data.get_all_readings()
-        if readings:
-            latest = readings[-1]
-            
-            # Update temperature
-            self.temp_label.text = f'Temperature\n{latest.temperature:.1f} °C'
-            self.temp_bar.value = min(latest.temperature, 50)
-            
-            # Update pH
-            self.ph_label.text = f'pH Level\n{latest.ph:.1f}'
-            self.ph_bar.value = min(latest.ph, 14)
-            
-            # Update Glucose
-            self.glucose_label.text = f'Glucose Level\n{latest.glucose:.1f} mg/dL'
-            self.glucose_bar.value = min(latest.glucose, 300)
+        self._show_reading(self.sensor_data.latest())
+    
+    def _show_reading(self, latest):
+        if latest is None:
+            return
+        
+        # Update temperature
+        self.temp_label.text = f'Temperature\n{latest.temperature:.1f} °C'
+        self.temp_bar.value = min(latest.temperature, 50)
+        
+        # Update pH
+        self.ph_label.text = f'pH Level\n{latest.ph:.1f}'
+        self.ph_bar.value = min(latest.ph, 14)
+        
+        # Update Glucose
+        self.glucose_label.text = f'Glucose Level\n{latest.glucose:.1f} mg/dL'
+        self.glucose_bar.value = min(latest.glucose, 300)
@@ -3,17 +3,17 @@ Graphs screen for data visualization
 """
 
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
 from kivy.uix.button import Button
-from kivy.uix.scrollview import ScrollView
-from datetime import datetime, timedelta
+
+from kivy_app.ui.chart import SensorChart
+from kivy_app.ui.live_feed import LiveFeed
 
 
 class GraphsScreen(BoxLayout):
     """Screen for displaying sensor data analysis"""
     
-    def __init__(self, csv_handler, sensor_data, **kwargs):
+    def __init__(self, csv_handler, sensor_data, live_feed=None, **kwargs):
         super().__init__(**kwargs)
         self.orientation = 'vertical'
         self.padding = 10
@@ -24,15 +24,17 @@ class GraphsScreen(BoxLayout):
         self.current_graph = None
         
         # Title
-        title = Label(text='Sensor Data Analysis', size_hint_y=0.1, bold=True, font_size='18sp')
-        self.add_widget(title)
+        self.title_label = Label(text='Sensor Data Analysis', size_hint_y=0.1, bold=True, font_size='18sp')
+        self.add_widget(self.title_label)
+        
+        # Chart area (drag to pan, pinch/scroll to zoom, double tap to reset)
+        self.chart = SensorChart(capacity=sensor_data.max_memory_readings, size_hint_y=0.7)
+        self.add_widget(self.chart)
         
-        # Data display area with scrolling
-        scroll = ScrollView(size_hint_y=0.7)
-        self.data_layout = GridLayout(cols=1, spacing=5, size_hint_y=None)
-        self.data_layout.bind(minimum_height=self.data_layout.setter('height'))
-        scroll.add_widget(self.data_layout)
-        self.add_widget(scroll)
+        # Live updates: readings added since the last frame are appended
+        self.live_feed = live_feed or LiveFeed(sensor_data)
+        self.live_feed.bind(on_readings=self._append_readings)
+        self.chart.set_data(sensor_data.get_columns())
         
         # Button layout for data selection
         btn_layout = BoxLayout(size_hint_y=0.2, spacing=5)
@@ -57,70 +59,28 @@ class GraphsScreen(BoxLayout):
     
     def show_temperature(self, instance):
         """Display temperature data"""
-        readings = self.sensor_data.get_all_readings()
-        if not readings:
-            self._display_message("No temperature data available")
-            return
-        
-        self.data_layout.clear_widgets()
-        header = Label(text='Time | Temperature (°C)', size_hint_y=None, height=40, bold=True)
-        self.data_layout.add_widget(header)
-        
-        for r in readings:
-            text = f"{r.timestamp.strftime('%H:%M:%S')} | {r.temperature:.2f}°C"
-            label = Label(text=text, size_hint_y=None, height=30)
-            self.data_layout.add_widget(label)
+        self._show_series(['temperature'], "No temperature data available")
     
     def show_ph(self, instance):
         """Display pH data"""
-        readings = self.sensor_data.get_all_readings()
-        if not readings:
-            self._display_message("No pH data available")
-            return
-        
-        self.data_layout.clear_widgets()
-        header = Label(text='Time | pH Level', size_hint_y=None, height=40, bold=True)
-        self.data_layout.add_widget(header)
-        
-        for r in readings:
-            text = f"{r.timestamp.strftime('%H:%M:%S')} | {r.ph:.2f}"
-            label = Label(text=text, size_hint_y=None, height=30)
-            self.data_layout.add_widget(label)
+        self._show_series(['ph'], "No pH data available")
     
     def show_glucose(self, instance):
         """Display glucose data"""
-        readings = self.sensor_data.get_all_readings()
-        if not readings:
-            self._display_message("No glucose data available")
-            return
-        
-        self.data_layout.clear_widgets()
-        header = Label(text='Time | Glucose (mg/dL)', size_hint_y=None, height=40, bold=True)
-        self.data_layout.add_widget(header)
-        
-        for r in readings:
-            text = f"{r.timestamp.strftime('%H:%M:%S')} | {r.glucose:.0f}"
-            label = Label(text=text, size_hint_y=None, height=30)
-            self.data_layout.add_widget(label)
+        self._show_series(['glucose'], "No glucose data available")
     
     def show_all(self, instance):
         """Display all sensor data"""
-        readings = self.sensor_data.get_all_readings()
-        if not readings:
-            self._display_message("No sensor data available")
-            return
-        
-        self.data_layout.clear_widgets()
-        header = Label(text='Time | Temp (°C) | pH | Glucose (mg/dL)', size_hint_y=None, height=40, bold=True)
-        self.data_layout.add_widget(header)
-        
-        for r in readings:
-            text = f"{r.timestamp.strftime('%H:%M:%S')} | {r.temperature:.2f} | {r.ph:.2f} | {r.glucose:.0f}"
-            label = Label(text=text, size_hint_y=None, height=30)
-            self.data_layout.add_widget(label)
+        self._show_series(['temperature', 'ph', 'glucose'], "No sensor data available")
+    
+    def _show_series(self, channels, empty_message):
+        """Plot the chosen channels (the chart already tracks the buffer live)"""
+        self.current_graph = channels
+        self.chart.show_channels(channels)
+        has_data = len(self.chart.columns['timestamp'])
+        self.title_label.text = 'Sensor Data Analysis' if has_data else empty_message
     
-    def _display_message(self, message):
-        """Display a message in the data layout"""
-        self.data_layout.clear_widgets()
-        msg_label = Label(text=message, size_hint_y=None, height=50)
-        self.data_layout.add_widget(msg_label)
+    def _append_readings(self, feed, batches):
+        """Append the readings received since the last frame"""
+        for readings in batches:
+            self.chart.append(readings.columns())
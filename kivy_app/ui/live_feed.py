@@ -0,0 +1,81 @@
+"""
+Kivy-side feed of new sensor readings
+"""
+
+import threading
+from array import array
+from collections import deque
+
+from kivy.clock import Clock
+from kivy.event import EventDispatcher
+from kivy.properties import ObjectProperty
+
+from data_management.sensor_data import ReadingsView
+
+# Batches held before they are merged into one, e.g. while the app is
+# paused and no frames run
+MAX_PENDING_BATCHES = 64
+
+
+class LiveFeed(EventDispatcher):
+    """
+    Observable view of SensorData for UI screens.
+
+    Subscribes once to SensorData; readings added on any thread (e.g. the
+    ingest writer) are queued and delivered on the Kivy thread at most
+    once per frame. Screens bind to `latest` to show the newest reading,
+    or to `on_readings` to receive the new ReadingsView batches, instead
+    of polling or copying the buffer. Undelivered batches are merged once
+    MAX_PENDING_BATCHES pile up, keeping at most a buffer's worth of the
+    newest readings.
+    """
+
+    latest = ObjectProperty(None, allownone=True)
+    """Newest SensorReading, or None before the first reading"""
+
+    __events__ = ('on_readings',)
+
+    def __init__(self, sensor_data, **kwargs):
+        super().__init__(**kwargs)
+        self.sensor_data = sensor_data
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._trigger = Clock.create_trigger(self._deliver)
+        self.latest = sensor_data.latest()
+        sensor_data.subscribe(self._on_added)
+
+    def _on_added(self, readings):
+        """SensorData callback (any thread)"""
+        with self._lock:
+            self._pending.append(readings)
+            if len(self._pending) >= MAX_PENDING_BATCHES:
+                merged = self._merge(self._pending, self.sensor_data.max_memory_readings)
+                self._pending.clear()
+                self._pending.append(merged)
+        self._trigger()
+
+    @staticmethod
+    def _merge(batches, limit: int) -> ReadingsView:
+        """One view of the newest `limit` readings of several batches"""
+        columns = [array('d') for _ in range(4)]
+        for batch in batches:
+            for column, values in zip(columns, (batch.timestamps, batch.temperature,
+                                                batch.ph, batch.glucose)):
+                column.extend(values)
+        return ReadingsView(*(column[-limit:] for column in columns))
+
+    def _deliver(self, dt):
+        with self._lock:
+            batches = list(self._pending)
+            self._pending.clear()
+        if not batches:
+            return
+        self.latest = batches[-1][-1]
+        self.dispatch('on_readings', batches)
+
+    def on_readings(self, batches):
+        """Fired once per frame with the ReadingsView batches added since the last one"""
+
+    def close(self):
+        """Stop listening to SensorData"""
+        self.sensor_data.unsubscribe(self._on_added)
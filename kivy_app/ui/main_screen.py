@@ -2,18 +2,26 @@
 Main screen for displaying sensor data
 """
 
+import threading
+from datetime import datetime, timedelta
+
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.scrollview import ScrollView
-from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
 from kivy.uix.button import Button
+from kivy.uix.spinner import Spinner
 from kivy.clock import Clock
 
+from kivy_app.ui.live_feed import LiveFeed
+from kivy_app.ui.table import BufferRows, ColumnRows, VirtualTable, format_timestamp
+
+
+LIVE_BUFFER = 'Live buffer'
+
 
 class MainScreen(BoxLayout):
     """Main screen showing sensor data readings"""
     
-    def __init__(self, csv_handler, sensor_data, **kwargs):
+    def __init__(self, csv_handler, sensor_data, live_feed=None, **kwargs):
         super().__init__(**kwargs)
         self.orientation = 'vertical'
         self.padding = 10
@@ -21,25 +29,32 @@ class MainScreen(BoxLayout):
         
         self.csv_handler = csv_handler
         self.sensor_data = sensor_data
+        self._source_request = 0  # Latest source selection; older loads are dropped
         
         # Title
         title = Label(text='Sensor Data Readings', size_hint_y=0.1, bold=True)
         self.add_widget(title)
         
-        # Scrollable data display
-        scroll = ScrollView()
-        self.data_grid = GridLayout(cols=4, spacing=5, size_hint_y=None)
-        self.data_grid.bind(minimum_height=self.data_grid.setter('height'))
+        # Data source: the in-memory buffer or one stored day
+        self.source_spinner = Spinner(text=LIVE_BUFFER, values=[LIVE_BUFFER], size_hint_y=None, height=40)
+        self.source_spinner.bind(text=self.select_source)
+        self.add_widget(self.source_spinner)
         
         # Header row
+        header_row = BoxLayout(size_hint_y=None, height=40)
         headers = ['Timestamp', 'Temperature (°C)', 'pH', 'Glucose (mg/dL)']
         for header in headers:
-            self.data_grid.add_widget(
-                Label(text=header, bold=True, size_hint_y=None, height=40)
-            )
+            header_row.add_widget(Label(text=header, bold=True))
+        self.add_widget(header_row)
         
-        scroll.add_widget(self.data_grid)
-        self.add_widget(scroll)
+        # Virtualised rows, newest first: widgets exist only for visible rows
+        self.table = VirtualTable([
+            format_timestamp,
+            lambda value: f"{value:.2f}",
+            lambda value: f"{value:.2f}",
+            lambda value: f"{value:.2f}",
+        ])
+        self.add_widget(self.table)
         
         # Refresh button
         refresh_btn = Button(text='Refresh Data', size_hint_y=0.1)
@@ -51,35 +66,55 @@ class MainScreen(BoxLayout):
         export_btn.bind(on_press=self.export_data)
         self.add_widget(export_btn)
         
-        # Initial load
+        # Initial load; the live buffer view follows new readings
+        self.table.set_source(BufferRows(sensor_data))
+        self.live_feed = live_feed or LiveFeed(sensor_data)
+        self.live_feed.bind(on_readings=self._on_readings)
         Clock.schedule_once(self.refresh_data, 0)
     
+    def _in_background(self, work, done) -> None:
+        """
+        Run storage I/O (`work`) on a worker thread, off the Kivy main
+        thread, and hand its result to `done` on the main thread
+        """
+        def run():
+            try:
+                result = work()
+            except Exception as e:
+                print(f"Error loading stored data: {e}")
+                return
+            Clock.schedule_once(lambda dt: done(result), 0)
+        threading.Thread(target=run, daemon=True).start()
+    
     def refresh_data(self, instance=None):
-        """Refresh displayed data"""
-        self.data_grid.clear_widgets()
-        
-        # Re-add headers
-        headers = ['Timestamp', 'Temperature (°C)', 'pH', 'Glucose (mg/dL)']
-        for header in headers:
-            self.data_grid.add_widget(
-                Label(text=header, bold=True, size_hint_y=None, height=40)
-            )
-        
-        # Load and display readings
-        readings = self.sensor_data.get_all_readings()
-        for reading in reversed(readings[-20:]):  # Show last 20 readings
-            self.data_grid.add_widget(
-                Label(text=str(reading.timestamp), size_hint_y=None, height=40)
-            )
-            self.data_grid.add_widget(
-                Label(text=f"{reading.temperature:.2f}", size_hint_y=None, height=40)
-            )
-            self.data_grid.add_widget(
-                Label(text=f"{reading.ph:.2f}", size_hint_y=None, height=40)
-            )
-            self.data_grid.add_widget(
-                Label(text=f"{reading.glucose:.2f}", size_hint_y=None, height=40)
-            )
+        """Refresh displayed data; the stored dates are listed in the background"""
+        self.table.refresh()
+        self._in_background(self.csv_handler.get_available_dates, self._set_dates)
+    
+    def _set_dates(self, dates):
+        self.source_spinner.values = [LIVE_BUFFER] + dates[::-1]
+    
+    def _on_readings(self, feed, batches):
+        if isinstance(self.table.source, BufferRows):
+            self.table.refresh()
+    
+    def select_source(self, spinner, text):
+        """Browse the live buffer or a whole stored day (loaded in the background)"""
+        self._source_request += 1
+        if text == LIVE_BUFFER:
+            self.table.set_source(BufferRows(self.sensor_data))
+            return
+        request = self._source_request
+        day = datetime.fromisoformat(text)
+        self._in_background(
+            lambda: self.csv_handler.load_range(day, day + timedelta(days=1) - timedelta(microseconds=1)),
+            lambda columns: self._show_day(request, columns)
+        )
+    
+    def _show_day(self, request, columns):
+        # Another source was picked while this day was loading
+        if request == self._source_request:
+            self.table.set_source(ColumnRows(columns))
     
     def export_data(self, instance):
         """Export all data to CSV"""
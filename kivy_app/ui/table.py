@@ -0,0 +1,124 @@
+"""
+Virtualised table widget for large reading sets
+"""
+
+import math
+from datetime import datetime
+
+from kivy.clock import Clock
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.label import Label
+from kivy.uix.scrollview import ScrollView
+from kivy.uix.widget import Widget
+
+
+ROW_HEIGHT = 40
+# Rows kept above and below the viewport
+OVERSCAN = 2
+
+
+class BufferRows:
+    """Rows of the in-memory SensorData buffer, newest first"""
+
+    def __init__(self, sensor_data):
+        self.sensor_data = sensor_data
+
+    def __len__(self):
+        return len(self.sensor_data)
+
+    def rows(self, lo, hi):
+        """(epoch, temperature, ph, glucose) tuples of rows [lo, hi)"""
+        size = len(self.sensor_data)
+        view = self.sensor_data.get_readings_slice(size - hi, size - lo)
+        columns = view.columns()
+        return list(zip(*(reversed(columns[name]) for name in
+                          ('timestamp', 'temperature', 'ph', 'glucose'))))
+
+
+class ColumnRows:
+    """Rows of loaded history columns (e.g. CSVHandler.load_range), newest first"""
+
+    def __init__(self, columns):
+        self.columns = [columns[name] for name in ('timestamp', 'temperature', 'ph', 'glucose')]
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def rows(self, lo, hi):
+        size = len(self)
+        return [tuple(float(column[size - 1 - i]) for column in self.columns)
+                for i in range(lo, min(hi, size))]
+
+
+class VirtualTable(ScrollView):
+    """
+    Scrolling table that only creates widgets for the visible rows.
+
+    The scrolled content is an empty widget as tall as all rows; a fixed
+    pool of row widgets (viewport height / ROW_HEIGHT plus overscan) is
+    moved and re-texted as the view scrolls, asking the row source only
+    for the rows on screen. Widget count and memory stay constant however
+    many rows the source holds.
+    """
+
+    def __init__(self, formats, **kwargs):
+        kwargs.setdefault('do_scroll_x', False)
+        super().__init__(**kwargs)
+        self.formats = formats  # One callable per column: value -> text
+        self.source = None
+        self._content = Widget(size_hint_y=None, height=0)
+        self.add_widget(self._content)
+        self._pool = []
+        self._trigger_update = Clock.create_trigger(self._update_rows)
+        self.bind(scroll_y=self._trigger_update, size=self._trigger_refresh)
+
+    def set_source(self, source):
+        """Show a row source (len() and rows(lo, hi)) from the top"""
+        self.source = source
+        self.scroll_y = 1
+        self.refresh()
+
+    def _trigger_refresh(self, *args):
+        self.refresh()
+
+    def refresh(self, *args):
+        """Re-read the row count and redraw the visible rows"""
+        count = len(self.source) if self.source is not None else 0
+        self._content.height = count * ROW_HEIGHT
+        needed = int(math.ceil(self.height / ROW_HEIGHT)) + 2 * OVERSCAN
+        while len(self._pool) < needed:
+            row = BoxLayout(size_hint=(None, None), height=ROW_HEIGHT)
+            for _ in self.formats:
+                row.add_widget(Label())
+            self._content.add_widget(row)
+            self._pool.append(row)
+        self._trigger_update()
+
+    def _update_rows(self, *args):
+        count = len(self.source) if self.source is not None else 0
+        content_height = count * ROW_HEIGHT
+        if self._content.height != content_height:
+            self._content.height = content_height
+
+        # Distance from the top of the content to the top of the viewport
+        hidden = max(content_height - self.height, 0)
+        offset = (1 - self.scroll_y) * hidden
+        first = max(int(offset // ROW_HEIGHT) - OVERSCAN, 0)
+        last = min(first + len(self._pool), count)
+        rows = self.source.rows(first, last) if last > first else []
+
+        for k, widget in enumerate(self._pool):
+            if k < len(rows):
+                widget.opacity = 1
+                widget.width = self._content.width
+                widget.y = content_height - (first + k + 1) * ROW_HEIGHT
+                for label, fmt, value in zip(widget.children[::-1], self.formats, rows[k]):
+                    label.text = fmt(value)
+            elif widget.opacity:
+                widget.opacity = 0
+                for label in widget.children:
+                    label.text = ''
+
+
+def format_timestamp(epoch):
+    return datetime.fromtimestamp(epoch).isoformat(sep=' ', timespec='seconds')
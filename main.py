@@ -16,9 +16,14 @@ from kivy_app.ui.main_screen import MainScreen
 from kivy_app.ui.dashboard import DashboardScreen
 from kivy_app.ui.graphs import GraphsScreen
 from kivy_app.ui.settings import SettingsScreen
+from kivy_app.ui.live_feed import LiveFeed
+from kivy_app.config import get_config
 from android_jni.sensor_interface import SensorInterface
+from data_management.archive import format_report
 from data_management.csv_handler import CSVHandler
 from data_management.sensor_data import SensorData
+from data_management.sqlite_store import SQLiteHandler
+from data_management.ingest import IngestPipeline
 
 
 class SensorMonitorApp(App):
@@ -30,15 +35,52 @@ class SensorMonitorApp(App):
         self.sensor_interface = None
         self.csv_handler = None
         self.sensor_data = None
+        self.ingest = None
         self.data_update_event = None
         
     def build(self):
         """Build the main UI"""
         # Initialize sensor interface and data management
-        self.sensor_interface = SensorInterface()
-        self.csv_handler = CSVHandler()
+        config = get_config()
+        self.sensor_interface = SensorInterface(
+            mock_rate=config.get('sensor.mock_rate'),
+            simulator=config.get('sensor.simulator')
+        )
+        # Daily files (csv/binary/delta) or the SQLite backend
+        storage_path = config.get('data_storage.path', './sensor_data')
+        storage_format = config.get('data_storage.format', 'csv')
+        storage_options = dict(
+            flush_rows=config.get('data_storage.flush_rows', 1),
+            flush_interval=config.get('data_storage.flush_interval'),
+            durability=config.get('data_storage.durability', 'flush')
+        )
+        if storage_format == 'sqlite':
+            self.csv_handler = SQLiteHandler(storage_path, **storage_options)
+        else:
+            self.csv_handler = CSVHandler(storage_path, file_format=storage_format, **storage_options)
         self.sensor_data = SensorData()
         
+        # Storage I/O runs on a writer thread, off the Kivy main thread
+        self.ingest = IngestPipeline(
+            self.sensor_data,
+            self.csv_handler,
+            max_queue=config.get('data_storage.queue_size', 1000),
+            batch_size=config.get('data_storage.batch_size', 50),
+            policy=config.get('data_storage.queue_policy', 'drop_oldest')
+        )
+        self.ingest.start()
+        
+        # Compress closed days off the main thread; reads stay transparent
+        if config.get('data_storage.archive', True):
+            threading.Thread(
+                target=self.archive_history,
+                args=(config.get('data_storage.archive_codec', 'gzip'),),
+                daemon=True
+            ).start()
+        
+        # One coalesced stream of new readings shared by all screens
+        live_feed = LiveFeed(self.sensor_data)
+        
         # Create main tab panel
         main_layout = TabbedPanel()
         
@@ -46,7 +88,8 @@ class SensorMonitorApp(App):
         dashboard_tab = TabbedPanelItem(text='Dashboard')
         dashboard_tab.content = DashboardScreen(
             sensor_interface=self.sensor_interface,
-            sensor_data=self.sensor_data
+            sensor_data=self.sensor_data,
+            live_feed=live_feed
         )
         main_layout.add_widget(dashboard_tab)
         
@@ -54,7 +97,8 @@ class SensorMonitorApp(App):
         data_tab = TabbedPanelItem(text='Data')
         data_tab.content = MainScreen(
             csv_handler=self.csv_handler,
-            sensor_data=self.sensor_data
+            sensor_data=self.sensor_data,
+            live_feed=live_feed
         )
         main_layout.add_widget(data_tab)
         
@@ -62,7 +106,8 @@ class SensorMonitorApp(App):
         graphs_tab = TabbedPanelItem(text='Graphs')
         graphs_tab.content = GraphsScreen(
             csv_handler=self.csv_handler,
-            sensor_data=self.sensor_data
+            sensor_data=self.sensor_data,
+            live_feed=live_feed
         )
         main_layout.add_widget(graphs_tab)
         
@@ -73,10 +118,19 @@ class SensorMonitorApp(App):
         )
         main_layout.add_widget(settings_tab)
         
-        # Schedule data updates
-        self.data_update_event = Clock.schedule_interval(
-            self.update_sensor_data, 5  # Update every 5 seconds
+        # Push mode: every tag read goes straight to the writer queue with
+        # its own timestamp (a tag's sample log as one column batch);
+        # fall back to polling if the bridge can't push
+        pushing = (
+            config.get('sensor.acquisition', 'push') == 'push' and
+            self.sensor_interface.start_listening(
+                self.ingest.submit, self.ingest.submit_columns
+            )
         )
+        if not pushing:
+            self.data_update_event = Clock.schedule_interval(
+                self.update_sensor_data, config.get('sensor.update_interval', 5)
+            )
         
         return main_layout
     
@@ -87,19 +141,35 @@ class SensorMonitorApp(App):
             data = self.sensor_interface.read_sensor_data()
             
             if data:
-                # Store in sensor data object
-                self.sensor_data.add_reading(data)
-                
-                # Save to CSV
-                self.csv_handler.save_sensor_reading(data)
+                # Hand off to the writer thread (updates SensorData and CSV)
+                self.ingest.submit(data)
                 
         except Exception as e:
             print(f"Error updating sensor data: {e}")
     
+    def archive_history(self, codec):
+        """Compress closed daily files and log the space saved"""
+        results = self.csv_handler.archive_closed_days(codec)
+        if results:
+            print(format_report(results))
+    
+    def on_pause(self):
+        """Write buffered rows before Android may kill the paused app"""
+        if self.ingest:
+            self.ingest.flush()
+        return True
+    
     def on_stop(self):
         """Stop the app"""
         if self.data_update_event:
             self.data_update_event.cancel()
+        if self.sensor_interface:
+            self.sensor_interface.stop_listening()
+            self.sensor_interface.disconnect()
+        if self.ingest:
+            self.ingest.stop()
+        if self.csv_handler:
+            self.csv_handler.close()
         return True
 
 
@@ -5,6 +5,7 @@
  */
 
 #include <jni.h>
+#include <stdint.h>
 #include <string.h>
 #include <unistd.h>
 #include <stdlib.h>
@@ -21,6 +22,17 @@ static int nfc_tag_uid_len = 0;
 #define NFC_TIMEOUT_MS 1000
 #define NHS3152_POLL_TIMEOUT 3000  // milliseconds
 
+// Health record payloads
+#define HEALTH_SAMPLE_SIZE 6    // int16 temp, uint16 pH, uint16 glucose (big-endian)
+#define HEALTH_LOG_HEADER 6     // uint32 first sample epoch s, uint16 interval s
+#define HEALTH_RECORD_STRIDE 4  // epoch s, temp, pH, glucose per parsed record
+
+// NDEF record header flags (NFC Forum NDEF 1.0)
+#define NDEF_FLAG_SR 0x10       // Short record: 1 byte payload length
+#define NDEF_FLAG_IL 0x08       // ID length field present
+#define NDEF_TNF_MASK 0x07
+#define NDEF_TNF_WELL_KNOWN 0x01
+
 /**
  * Parse NFC NDEF message from NHS 3152 tag
  * Returns sensor data extracted from NDEF message
@@ -71,6 +83,94 @@ int parse_nfc_ndef_message(const unsigned char *data, int data_len,
     return 0;  // Could not parse data
 }
 
+/**
+ * Decode one 6 byte health sample into out[0..2] (temp, pH, glucose)
+ */
+static void decode_health_sample(const unsigned char *p, double *out) {
+    int16_t temp_raw = (int16_t)((p[0] << 8) | p[1]);
+    out[0] = (temp_raw / 10.0) + temp_offset;
+    out[1] = ((p[2] << 8) | p[3]) / 100.0;
+    out[2] = (p[4] << 8) | p[5];
+}
+
+/**
+ * Parse every health reading in a serialized NDEF message
+ *
+ * Understands two record types (TNF well-known):
+ *   'H' - one sample (6 bytes), stamped with the tag discovery time
+ *   'L' - the tag's sample log: uint32 epoch seconds of the first sample,
+ *         uint16 seconds between samples, then packed 6 byte samples
+ * Writes up to max_records records of HEALTH_RECORD_STRIDE doubles
+ * (epoch seconds, temp, pH, glucose) to out and returns how many were
+ * written, or -1 if the message is malformed.
+ */
+int parse_nfc_ndef_records(const unsigned char *data, int data_len, double discovered_at,
+                           double *out, int max_records) {
+    int offset = 0;
+    int count = 0;
+    
+    while (offset < data_len && count < max_records) {
+        unsigned char header = data[offset];
+        if (offset + 3 > data_len) {
+            return -1;
+        }
+        int type_length = data[offset + 1];
+        int pos = offset + 2;
+        uint32_t payload_len;
+        if (header & NDEF_FLAG_SR) {
+            payload_len = data[pos];
+            pos += 1;
+        } else {
+            if (pos + 4 > data_len) {
+                return -1;
+            }
+            payload_len = ((uint32_t)data[pos] << 24) | ((uint32_t)data[pos + 1] << 16) |
+                          ((uint32_t)data[pos + 2] << 8) | data[pos + 3];
+            pos += 4;
+        }
+        int id_length = 0;
+        if (header & NDEF_FLAG_IL) {
+            if (pos >= data_len) {
+                return -1;
+            }
+            id_length = data[pos];
+            pos += 1;
+        }
+        const unsigned char *type = data + pos;
+        pos += type_length + id_length;
+        if (pos > data_len || payload_len > (uint32_t)(data_len - pos)) {
+            return -1;
+        }
+        const unsigned char *payload = data + pos;
+        
+        if ((header & NDEF_TNF_MASK) == NDEF_TNF_WELL_KNOWN && type_length == 1) {
+            if (type[0] == 'H' && payload_len >= HEALTH_SAMPLE_SIZE) {
+                double *rec = out + count * HEALTH_RECORD_STRIDE;
+                rec[0] = discovered_at;
+                decode_health_sample(payload, rec + 1);
+                count++;
+            } else if (type[0] == 'L' && payload_len >= HEALTH_LOG_HEADER) {
+                uint32_t first = ((uint32_t)payload[0] << 24) | ((uint32_t)payload[1] << 16) |
+                                 ((uint32_t)payload[2] << 8) | payload[3];
+                int interval = (payload[4] << 8) | payload[5];
+                uint32_t samples = (payload_len - HEALTH_LOG_HEADER) / HEALTH_SAMPLE_SIZE;
+                const unsigned char *sample = payload + HEALTH_LOG_HEADER;
+                for (uint32_t i = 0; i < samples && count < max_records; i++) {
+                    double *rec = out + count * HEALTH_RECORD_STRIDE;
+                    rec[0] = (double)first + (double)i * interval;
+                    decode_health_sample(sample, rec + 1);
+                    sample += HEALTH_SAMPLE_SIZE;
+                    count++;
+                }
+            }
+        }
+        
+        offset = pos + payload_len;
+    }
+    
+    return count;
+}
+
 /**
  * JNI: Initialize NFC reader (Android side calls this via JNI)
  */
@@ -124,6 +224,45 @@ JNIEXPORT jbyteArray JNICALL Java_com_sensormonitor_android_SensorBridge_nativeR
     return result;
 }
 
+/**
+ * JNI: Parse all health records of a serialized NDEF message in one call
+ * Returns a flat double array of (epoch s, temp, pH, glucose) records,
+ * or NULL if the message is malformed
+ */
+JNIEXPORT jdoubleArray JNICALL Java_com_sensormonitor_android_SensorBridge_nativeParseHealthRecords(
+    JNIEnv *env, jobject obj, jbyteArray ndef_message, jlong discovered_at_ms) {
+    
+    if (!ndef_message) {
+        return NULL;
+    }
+    
+    jint len = (*env)->GetArrayLength(env, ndef_message);
+    jbyte *data = (*env)->GetByteArrayElements(env, ndef_message, NULL);
+    if (!data) {
+        return NULL;
+    }
+    
+    // Every sample takes at least HEALTH_SAMPLE_SIZE bytes of the message
+    int max_records = len / HEALTH_SAMPLE_SIZE + 1;
+    double *records = (double *)malloc(sizeof(double) * HEALTH_RECORD_STRIDE * max_records);
+    int count = -1;
+    if (records) {
+        count = parse_nfc_ndef_records((const unsigned char *)data, len,
+                                       discovered_at_ms / 1000.0, records, max_records);
+    }
+    (*env)->ReleaseByteArrayElements(env, ndef_message, data, JNI_ABORT);
+    
+    jdoubleArray result = NULL;
+    if (count >= 0) {
+        result = (*env)->NewDoubleArray(env, count * HEALTH_RECORD_STRIDE);
+        if (result && count > 0) {
+            (*env)->SetDoubleArrayRegion(env, result, 0, count * HEALTH_RECORD_STRIDE, records);
+        }
+    }
+    free(records);
+    return result;
+}
+
 /**
  * JNI: Set NFC tag data (called from Java after tag detection)
  */
@@ -0,0 +1,132 @@
+"""
+Unit tests for compressed archival of closed daily files
+"""
+
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from data_management import archive
+from data_management.csv_handler import CSVHandler
+
+
+class TestArchive(unittest.TestCase):
+    """Test archive_closed_days and transparent reads of archived days"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        # CSV days 1-2 and binary day 3, each with a late reading
+        for day in range(1, 4):
+            file_format = 'csv' if day < 3 else 'binary'
+            with CSVHandler(self.temp_dir, file_format=file_format) as handler:
+                for minute in range(0, 600, 7):
+                    handler.save_sensor_reading(self._reading(day, minute))
+                handler.save_sensor_reading(self._reading(day, 3))
+        self.handler = CSVHandler(self.temp_dir)
+
+    def tearDown(self):
+        self.handler.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _reading(self, day, minute):
+        return {
+            'timestamp': (datetime(2024, 1, day) + timedelta(minutes=minute)).isoformat(),
+            'temperature': 36.0 + minute / 1000,
+            'ph': 7.0,
+            'glucose': 100 + day
+        }
+
+    def _snapshot(self):
+        return {
+            'dates': self.handler.get_available_dates(),
+            'day': self.handler.load_sensor_readings('2024-01-02'),
+            'iter': list(self.handler.iter_readings(output='tuple')),
+            'range': {name: list(column) for name, column in self.handler.load_range(
+                datetime(2024, 1, 1, 5), datetime(2024, 1, 3, 2)).items()},
+            'stats': self.handler.get_statistics(),
+        }
+
+    def test_archived_days_read_transparently(self):
+        """Test every reader returns the same rows after archiving"""
+        for codec in archive.CODECS:
+            with self.subTest(codec=codec):
+                before = self._snapshot()
+                results = self.handler.archive_closed_days(codec, before=date(2024, 1, 3))
+                self.assertEqual([r.source.name for r in results],
+                                 ['sensor_data_2024-01-01.csv', 'sensor_data_2024-01-02.csv'])
+                for result in results:
+                    self.assertFalse(result.source.exists())
+                    self.assertFalse(result.source.with_suffix('.idx').exists())
+                    self.assertTrue(result.target.name.endswith('.csv' + archive.CODECS[codec]))
+                    self.assertGreater(result.ratio, 1.0)
+                self.assertEqual(self._snapshot(), before)
+
+                results = self.handler.archive_closed_days(codec, before=date(2024, 1, 4))
+                self.assertEqual([r.source.name for r in results], ['sensor_data_2024-01-03.bin'])
+                self.assertEqual(self._snapshot(), before)
+                self.assertEqual(self.handler.archive_closed_days(codec), [])
+                self.assertEqual(
+                    self.handler.load_range_parallel(workers=2, min_parallel_files=1)['glucose'].tolist(),
+                    self.handler.load_range()['glucose'].tolist()
+                )
+
+                # Back to plain files for the next codec
+                for path in Path(self.temp_dir).glob('sensor_data_*' + archive.CODECS[codec]):
+                    with archive.open_daily(path) as src, open(path.with_suffix(''), 'wb') as dst:
+                        shutil.copyfileobj(src, dst)
+                    path.unlink()
+
+    def test_late_reading_appends_to_archive(self):
+        """Test a late reading for an archived day is merged into its archive"""
+        self.handler.archive_closed_days(before=date(2024, 1, 3))
+        expected = len(self.handler.load_sensor_readings('2024-01-01')) + 1
+        self.handler.save_sensor_reading(self._reading(1, 1000))
+        self.handler.flush()
+        # Still open for appends, so it isn't archived yet
+        self.assertEqual(self.handler.archive_closed_days(before=date(2024, 1, 3)), [])
+        self.handler.close()
+        self.assertEqual(len(self.handler.load_sensor_readings('2024-01-01')), expected)
+
+        results = self.handler.archive_closed_days(before=date(2024, 1, 3))
+        self.assertEqual([r.target.name for r in results], ['sensor_data_2024-01-01.csv.gz'])
+        day = self.handler.load_sensor_readings('2024-01-01', output='columns')
+        self.assertEqual(len(day['timestamp']), expected)
+        self.assertEqual(day['timestamp'][-1], datetime(2024, 1, 1, 16, 40).timestamp())
+        self.assertEqual(self.handler.get_statistics('2024-01-01', '2024-01-01')['glucose']['count'],
+                         expected)
+
+    def test_interrupted_commit_not_archived_twice(self):
+        """Test a crash between moving the archive in and deleting the plain file"""
+        expected = self._snapshot()
+        remove_plain = archive._remove_plain
+        archive._remove_plain = _crash
+        try:
+            self.handler.archive_closed_days(before=date(2024, 1, 2))
+        finally:
+            archive._remove_plain = remove_plain
+        source = Path(self.temp_dir) / 'sensor_data_2024-01-01.csv'
+        self.assertTrue(source.exists())
+        self.assertTrue((Path(self.temp_dir) / 'sensor_data_2024-01-01.csv.gz').exists())
+
+        self.handler.close()
+        self.handler = CSVHandler(self.temp_dir)
+        self.assertFalse(source.exists())
+        self.assertFalse(archive.marker_path(source).exists())
+        self.assertEqual(self.handler.archive_closed_days(before=date(2024, 1, 2)), [])
+        self.assertEqual(self._snapshot(), expected)
+
+        # A torn marker: the archive was never moved in, so the plain file stays
+        day2 = Path(self.temp_dir) / 'sensor_data_2024-01-02.csv'
+        archive.marker_path(day2).write_text('{"target": "sensor_data_2024-01-02.csv.gz", "targ')
+        self.assertEqual(archive.finish_commits(self.temp_dir), 0)
+        self.assertTrue(day2.exists())
+        self.assertFalse(archive.marker_path(day2).exists())
+
+
+def _crash(source):
+    raise OSError(f"Simulated crash before removing {source.name}")
+
+
+if __name__ == '__main__':
+    unittest.main()
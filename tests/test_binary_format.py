@@ -0,0 +1,99 @@
+"""
+Unit tests for binary_format module
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import struct
+from datetime import datetime, timedelta
+from data_management import binary_format
+from data_management.csv_handler import CSVHandler
+
+
+class TestBinaryFormat(unittest.TestCase):
+    """Test binary storage format helpers"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.temp_dir, 'sensor_data_2024-01-01.csv')
+        self.bin_path = os.path.join(self.temp_dir, 'sensor_data_2024-01-01.bin')
+        base = datetime(2024, 1, 1, 8, 30, 0, 123456)
+        with open(self.csv_path, 'w', newline='') as f:
+            f.write('timestamp,temperature,ph,glucose\r\n')
+            for i in range(50):
+                timestamp = (base + timedelta(seconds=5 * i)).isoformat()
+                f.write(f'{timestamp},{36.5 + i / 10:.1f},{7.0 + i / 100:.2f},{100 + i}\r\n')
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_record_layout(self):
+        """Test header and fixed 20 byte records"""
+        self.assertEqual(binary_format.csv_to_binary(self.csv_path, self.bin_path), 50)
+        self.assertEqual(binary_format.RECORD.size, 20)
+        self.assertEqual(
+            os.path.getsize(self.bin_path), binary_format.HEADER.size + 50 * 20
+        )
+        records = list(binary_format.iter_records(self.bin_path))
+        self.assertEqual(records[0][0], datetime(2024, 1, 1, 8, 30, 0, 123456).timestamp())
+        self.assertEqual(records[1][1], struct.unpack('<f', struct.pack('<f', 36.6))[0])
+    
+    def test_lossless_round_trip(self):
+        """Test CSV -> binary -> CSV reproduces the original file"""
+        round_trip = os.path.join(self.temp_dir, 'round_trip.csv')
+        binary_format.csv_to_binary(self.csv_path, self.bin_path)
+        binary_format.binary_to_csv(self.bin_path, round_trip)
+        
+        with open(self.csv_path) as original, open(round_trip) as converted:
+            original_rows = [line.split(',') for line in original.read().splitlines()]
+            converted_rows = [line.split(',') for line in converted.read().splitlines()]
+        self.assertEqual(len(original_rows), len(converted_rows))
+        for a, b in zip(original_rows[1:], converted_rows[1:]):
+            self.assertEqual(a[0], b[0])
+            self.assertEqual([float(v) for v in a[1:]], [float(v) for v in b[1:]])
+    
+    def test_torn_record_ignored(self):
+        """Test that a partially written final record is skipped"""
+        binary_format.csv_to_binary(self.csv_path, self.bin_path)
+        with open(self.bin_path, 'ab') as f:
+            f.write(b'\x00' * 7)
+        self.assertEqual(len(list(binary_format.iter_records(self.bin_path))), 50)
+    
+    def test_torn_record_trimmed_before_append(self):
+        """Test appending after a torn record keeps later records aligned"""
+        binary_format.csv_to_binary(self.csv_path, self.bin_path)
+        with open(self.bin_path, 'ab') as f:
+            f.write(b'\x00' * 7)
+        timestamp = datetime(2024, 1, 1, 20)
+        with CSVHandler(self.temp_dir, file_format='binary') as handler:
+            self.assertTrue(handler.save_sensor_reading({
+                'timestamp': timestamp.isoformat(), 'temperature': 37.0, 'ph': 7.25, 'glucose': 120
+            }))
+            window = handler.load_range(timestamp, timestamp)
+        self.assertEqual(os.path.getsize(self.bin_path), binary_format.HEADER.size + 51 * 20)
+        records = list(binary_format.iter_records(self.bin_path))
+        self.assertEqual(records[-1], (timestamp.timestamp(), 37.0, 7.25, 120.0))
+        self.assertEqual(list(window['glucose']), [120.0])
+    
+    @unittest.skipIf(binary_format.np is None, "numpy not installed")
+    def test_read_records_numpy(self):
+        """Test reading the file as a structured array without parsing"""
+        binary_format.csv_to_binary(self.csv_path, self.bin_path)
+        records = binary_format.read_records(self.bin_path)
+        self.assertEqual(len(records), 50)
+        self.assertAlmostEqual(float(records['glucose'][-1]), 149.0)
+    
+    def test_convert_directory(self):
+        """Test converting a storage directory both ways"""
+        self.assertEqual(binary_format.convert_directory(self.temp_dir, 'binary'), 1)
+        self.assertTrue(os.path.exists(self.bin_path))
+        os.remove(self.csv_path)
+        self.assertEqual(binary_format.convert_directory(self.temp_dir, 'csv', remove_source=True), 1)
+        self.assertTrue(os.path.exists(self.csv_path))
+        self.assertFalse(os.path.exists(self.bin_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
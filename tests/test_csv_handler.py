@@ -20,6 +20,7 @@ class TestCSVHandler(unittest.TestCase):
     def tearDown(self):
         """Clean up temporary files"""
         import shutil
+        self.csv_handler.close()
         shutil.rmtree(self.temp_dir)
     
     def test_save_reading(self):
@@ -59,7 +60,179 @@ class TestCSVHandler(unittest.TestCase):
         
         dates = self.csv_handler.get_available_dates()
         self.assertGreater(len(dates), 0)
+    
+    def test_buffered_writes(self):
+        """Test that rows are held until the flush threshold"""
+        handler = CSVHandler(self.temp_dir, flush_rows=3)
+        timestamp = datetime(2024, 1, 1, 12, 0, 0)
+        csv_file = os.path.join(self.temp_dir, 'sensor_data_2024-01-01.csv')
+        
+        for i in range(2):
+            handler.save_sensor_reading({'timestamp': timestamp.isoformat(), 'temperature': 36.0})
+        with open(csv_file) as f:
+            self.assertEqual(len(f.readlines()), 1)  # Header only
+        
+        handler.save_sensor_reading({'timestamp': timestamp.isoformat(), 'temperature': 36.0})
+        with open(csv_file) as f:
+            self.assertEqual(len(f.readlines()), 4)
+        handler.close()
+    
+    def test_daily_rotation_keeps_buffered_rows(self):
+        """Test that switching daily files writes out pending rows"""
+        with CSVHandler(self.temp_dir, flush_rows=100, durability='fsync') as handler:
+            handler.save_sensor_reading({'timestamp': '2024-01-01T23:59:59', 'temperature': 36.0})
+            handler.save_sensor_reading({'timestamp': '2024-01-02T00:00:01', 'temperature': 37.0})
+            
+            first_day = handler.load_sensor_readings(datetime(2024, 1, 1).date())
+            second_day = handler.load_sensor_readings(datetime(2024, 1, 2).date())
+        
+        self.assertEqual([r['temperature'] for r in first_day], [36.0])
+        self.assertEqual([r['temperature'] for r in second_day], [37.0])
+
+    
+    def _save_days(self, handler, days, per_day):
+        """Save `per_day` hourly readings on each of `days` days of Jan 2024"""
+        for day in days:
+            for hour in range(per_day):
+                handler.save_sensor_reading({
+                    'timestamp': datetime(2024, 1, day, hour).isoformat(),
+                    'temperature': day + hour / 100,
+                    'ph': 7.0,
+                    'glucose': 100
+                })
+    
+    def test_iter_readings_range(self):
+        """Test streaming a time range across daily files"""
+        self._save_days(self.csv_handler, [1, 2, 3], 24)
+        # Files outside the range must not even be parsed
+        with open(os.path.join(self.temp_dir, 'sensor_data_2024-01-05.csv'), 'w') as f:
+            f.write('garbage\n')
+        
+        rows = list(self.csv_handler.iter_readings(
+            start=datetime(2024, 1, 1, 22), end=datetime(2024, 1, 2, 1)
+        ))
+        self.assertEqual(
+            [r['timestamp'] for r in rows],
+            [datetime(2024, 1, 1, 22), datetime(2024, 1, 1, 23),
+             datetime(2024, 1, 2, 0), datetime(2024, 1, 2, 1)]
+        )
+    
+    def test_iter_readings_output_modes(self):
+        """Test tuple and columnar output with a field subset"""
+        self._save_days(self.csv_handler, [1, 2], 3)
+        
+        tuples = list(self.csv_handler.iter_readings(
+            fields=['timestamp', 'temperature'], output='tuple'
+        ))
+        self.assertEqual(len(tuples), 6)
+        self.assertEqual(tuples[0], (datetime(2024, 1, 1, 0).timestamp(), 1.0))
+        
+        chunks = list(self.csv_handler.iter_readings(fields=['glucose'], output='columns'))
+        self.assertEqual(len(chunks), 2)  # One per daily file
+        self.assertEqual(list(chunks[1]['glucose']), [100.0, 100.0, 100.0])
+        
+        with self.assertRaises(ValueError):
+            list(self.csv_handler.iter_readings(fields=['humidity']))
 
+    
+    def test_binary_format(self):
+        """Test that the public API works against binary daily files"""
+        with CSVHandler(self.temp_dir, file_format='binary') as handler:
+            self._save_days(handler, [1, 2], 3)
+            readings = handler.load_sensor_readings(datetime(2024, 1, 2).date())
+            self.assertEqual(len(readings), 3)
+            self.assertEqual(readings[0]['timestamp'], datetime(2024, 1, 2, 0))
+            self.assertEqual(readings[0]['temperature'], 2.0)
+            self.assertIn('2024-01-01', handler.get_available_dates())
+            
+            # Existing CSV history stays readable alongside binary files
+            self._save_days(self.csv_handler, [3], 2)
+            self.assertEqual(len(handler.load_all_readings()), 8)
+            
+            # Cached summaries hold the float32 values a rescan reads back
+            handler.save_sensor_reading({'timestamp': datetime(2024, 1, 1, 5).isoformat(),
+                                         'temperature': 36.6, 'ph': 7.1, 'glucose': 100})
+            cached = handler.get_statistics('2024-01-01', '2024-01-01')
+            handler._summaries._summaries.clear()
+            self.assertEqual(handler.get_statistics('2024-01-01', '2024-01-01'), cached)
+
+    
+    def test_multi_day_statistics(self):
+        """Test statistics combined from per-file summaries"""
+        self._save_days(self.csv_handler, [1, 2, 3], 4)
+        
+        stats = self.csv_handler.get_statistics('2024-01-02', '2024-01-03')
+        temps = [day + hour / 100 for day in (2, 3) for hour in range(4)]
+        self.assertEqual(stats['temperature']['count'], 8)
+        self.assertEqual(stats['temperature']['min'], min(temps))
+        self.assertEqual(stats['temperature']['max'], max(temps))
+        self.assertAlmostEqual(stats['temperature']['avg'], sum(temps) / 8)
+        self.assertEqual(stats['temperature']['last'], 3.03)
+        self.assertEqual(stats['last_timestamp'], datetime(2024, 1, 3, 3).timestamp())
+        
+        # Today's file only has a header, so it is not listed
+        self.assertEqual(
+            self.csv_handler.get_available_dates(), ['2024-01-01', '2024-01-02', '2024-01-03']
+        )
+    
+    def test_summary_invalidated_on_change(self):
+        """Test that editing a daily file on disk refreshes its summary"""
+        self._save_days(self.csv_handler, [1], 2)
+        self.csv_handler.close()
+        self.assertEqual(self.csv_handler.get_statistics()['glucose']['count'], 2)
+        
+        with open(os.path.join(self.temp_dir, 'sensor_data_2024-01-01.csv'), 'a') as f:
+            f.write('2024-01-01T05:00:00,40.0,7.0,250\n')
+        
+        # A fresh handler reads the persisted summaries and notices the edit
+        handler = CSVHandler(self.temp_dir)
+        stats = handler.get_statistics()
+        self.assertEqual(stats['glucose']['count'], 3)
+        self.assertEqual(stats['glucose']['max'], 250.0)
+        handler.close()
+
+    def test_torn_row_recovery(self):
+        """Test a row half-written by a crash neither blocks saves nor hides history"""
+        self._save_days(self.csv_handler, [1, 2], 2)
+        self.csv_handler.close()
+        for day in (1, 2):
+            with open(os.path.join(self.temp_dir, f'sensor_data_2024-01-0{day}.csv'), 'a') as f:
+                f.write('2024-01-0%dT12:00:0' % day)
+
+        handler = CSVHandler(self.temp_dir)
+        # Closed day: the torn row is skipped when read
+        self.assertEqual(len(handler.load_sensor_readings('2024-01-01')), 2)
+        self.assertEqual(handler.get_available_dates(), ['2024-01-01', '2024-01-02'])
+        # Reopened day: the torn row is cut off before appending
+        self.assertTrue(handler.save_sensor_reading({
+            'timestamp': datetime(2024, 1, 2, 5).isoformat(), 'temperature': 40.0, 'ph': 7.0, 'glucose': 250
+        }))
+        readings = handler.load_sensor_readings('2024-01-02')
+        self.assertEqual([r['glucose'] for r in readings], [100.0, 100.0, 250.0])
+        self.assertEqual(handler.get_statistics('2024-01-02', '2024-01-02')['glucose']['count'], 3)
+        self.assertEqual(len(handler.load_range(datetime(2024, 1, 2, 1), datetime(2024, 1, 2, 6))['ph']), 2)
+        handler.close()
+
+    
+    def test_save_columns(self):
+        """Test column batches are saved to the daily file of each timestamp"""
+        start = datetime(2024, 1, 1, 23, 58).timestamp()
+        columns = {
+            'timestamp': [start + 60 * i for i in range(4)],
+            'temperature': [36.0, 36.1, 36.2, 36.3],
+            'ph': [7.0] * 4,
+            'glucose': [95.0, 96.0, 97.0, 98.0]
+        }
+        for file_format in ('csv', 'binary'):
+            with self.subTest(file_format=file_format):
+                path = os.path.join(self.temp_dir, file_format)
+                with CSVHandler(path, file_format=file_format) as handler:
+                    self.assertEqual(handler.save_columns(columns), 4)
+                    first = handler.load_sensor_readings(datetime(2024, 1, 1).date())
+                    second = handler.load_sensor_readings(datetime(2024, 1, 2).date())
+                self.assertEqual([r['glucose'] for r in first], [95.0, 96.0])
+                self.assertEqual([r['glucose'] for r in second], [97.0, 98.0])
+                self.assertEqual(second[0]['timestamp'], datetime(2024, 1, 2, 0, 0))
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,115 @@
+"""
+Unit tests for csv_index module
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+from datetime import datetime, timedelta
+from data_management.csv_handler import CSVHandler
+from data_management.csv_index import CSVIndex
+
+
+class TestCSVIndex(unittest.TestCase):
+    """Test sparse CSV index and indexed range reads"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.base = datetime(2024, 1, 1, 0, 0, 0)
+        self.csv_path = os.path.join(self.temp_dir, 'sensor_data_2024-01-01.csv')
+        with CSVHandler(self.temp_dir, flush_rows=50, index_stride=100) as handler:
+            for i in range(1000):
+                handler.save_sensor_reading({
+                    'timestamp': (self.base + timedelta(seconds=10 * i)).isoformat(),
+                    'temperature': float(i)
+                })
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_index_written_while_saving(self):
+        """Test the sidecar is valid after writing and points at rows"""
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'sensor_data_2024-01-01.idx')))
+        index = CSVIndex.load(self.csv_path)
+        self.assertEqual(index.rows, 1000)
+        self.assertEqual(len(index.offsets), 10)
+        self.assertEqual(index.size, os.path.getsize(self.csv_path))
+        
+        offset = index.seek_offset((self.base + timedelta(seconds=5000)).timestamp())
+        with open(self.csv_path, 'rb') as f:
+            f.seek(offset)
+            self.assertTrue(f.readline().startswith(b'2024-01-01T01:06:40'))  # Row 400
+    
+    def test_indexed_range_read(self):
+        """Test range reads through the index"""
+        handler = CSVHandler(self.temp_dir)
+        rows = list(handler.iter_readings(
+            start=self.base + timedelta(seconds=5000), end=self.base + timedelta(seconds=5030)
+        ))
+        self.assertEqual([r['temperature'] for r in rows], [500.0, 501.0, 502.0, 503.0])
+        handler.close()
+    
+    def test_appended_rows_extend_index(self):
+        """Test a grown file is indexed from the tail only"""
+        with open(self.csv_path, 'a', newline='') as f:
+            for i in range(1000, 1150):
+                timestamp = (self.base + timedelta(seconds=10 * i)).isoformat()
+                f.write(f'{timestamp},{float(i)},7.0,0\r\n')
+        
+        index = CSVIndex.for_file(self.csv_path)
+        self.assertEqual(index.rows, 1150)
+        self.assertEqual(len(index.offsets), 12)
+        self.assertEqual(index.size, os.path.getsize(self.csv_path))
+    
+    def test_rewritten_file_rebuilds_index(self):
+        """Test a manually edited file gets a fresh index"""
+        with open(self.csv_path) as f:
+            lines = f.readlines()
+        # Drop the first 500 rows and swap two rows out of order
+        lines = lines[:1] + lines[501:]
+        lines[2], lines[3] = lines[3], lines[2]
+        with open(self.csv_path, 'w', newline='') as f:
+            f.writelines(lines)
+        
+        index = CSVIndex.for_file(self.csv_path)
+        self.assertEqual(index.rows, 500)
+        self.assertFalse(index.monotonic)
+        self.assertIsNone(index.seek_offset(self.base.timestamp()))
+        
+        handler = CSVHandler(self.temp_dir)
+        rows = list(handler.iter_readings(
+            start=self.base + timedelta(seconds=5010), end=self.base + timedelta(seconds=5020)
+        ))
+        self.assertEqual(sorted(r['temperature'] for r in rows), [501.0, 502.0])
+        handler.close()
+
+    def test_torn_rows(self):
+        """Test unparseable rows are skipped and a torn tail is cut before appending"""
+        with open(self.csv_path, 'a', newline='') as f:
+            f.write('2024-01-01T02:46:4garbage,1.0,7.0,0\r\n')
+            f.write('2024-01-01T02:46:40,1000.0,7.0,0\r\n')
+            f.write('2024-01-01T02:47:0')
+        index = CSVIndex.for_file(self.csv_path)
+        self.assertEqual(index.rows, 1001)
+        
+        with CSVHandler(self.temp_dir, index_stride=100) as handler:
+            for i in range(1001, 1201):
+                handler.save_sensor_reading({
+                    'timestamp': (self.base + timedelta(seconds=10 * i)).isoformat(),
+                    'temperature': float(i)
+                })
+        index = CSVIndex.for_file(self.csv_path)
+        self.assertEqual(index.rows, 1201)
+        self.assertTrue(index.monotonic)
+        with open(self.csv_path, 'rb') as f:
+            f.seek(index.offsets[-1])
+            self.assertTrue(f.readline().startswith(b'2024-01-01T03:20:00,1200.0'))
+        with CSVHandler(self.temp_dir) as handler:
+            rows = list(handler.iter_readings(start=self.base + timedelta(seconds=10005),
+                                              end=self.base + timedelta(seconds=10030)))
+        self.assertEqual([r['temperature'] for r in rows], [1001.0, 1002.0, 1003.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+"""
+Unit tests for the delta-encoded block storage format
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from data_management import delta_format
+from data_management.csv_handler import CSVHandler
+
+
+class TestDeltaFormat(unittest.TestCase):
+    """Test block encoding, range scans and the CSVHandler 'delta' format"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'sensor_data_2024-01-01.dlt')
+        rng = random.Random(7)
+        start = datetime(2024, 1, 1, 8, 0, 0, 250000).timestamp()
+        self.records = []
+        for i in range(1000):
+            # Regular 5 s samples with jitter, late readings and full-range values
+            timestamp = start + 5 * i + (rng.choice([0, 0, 0, 0.001, -7.5]))
+            self.records.append((
+                delta_format.from_micros(delta_format.to_micros(timestamp)),
+                rng.randint(-3276, 3276) / 10 if i % 50 == 0 else 36.5 + rng.randint(-5, 5) / 10,
+                rng.randint(600, 800) / 100,
+                float(-32768 if i % 2 else 32767) if i % 97 == 0 else float(100 + i % 13)
+            ))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, records, flush_every=None):
+        writer = delta_format.BlockWriter(self.path)
+        for i in range(0, len(records), flush_every or len(records)):
+            writer.write_records(records[i:i + (flush_every or len(records))])
+            writer.flush()
+        writer.close()
+
+    def test_lossless_round_trip(self):
+        """Test records read back exactly through both decoders, across reopened partial blocks"""
+        self._write(self.records[:300], flush_every=7)
+        self._write(self.records[300:])
+        self.assertEqual(list(delta_format.iter_records(self.path)), self.records)
+        columns = delta_format.read_columns(self.path)
+        for i, column in enumerate(columns):
+            self.assertEqual(list(column), [record[i] for record in self.records])
+
+    def test_torn_rewrite_restored_from_journal(self):
+        """Test a crash while rewriting the open block loses none of its flushed records"""
+        self._write(self.records[:300])
+        self.assertFalse(os.path.exists(delta_format.journal_path(self.path)))
+
+        writer = delta_format.BlockWriter(self.path)
+        writer.write_records(self.records[300:400])
+        write = writer._file.write
+        # Crash halfway through rewriting the open block (records 256-399)
+        writer._file.write = lambda data: write(data[:len(data) // 2])
+        writer.flush()
+        writer._file.close()
+        writer._journal.close()
+        self.assertEqual(len(list(delta_format.iter_records(self.path))), 256)
+
+        writer = delta_format.BlockWriter(self.path)
+        writer.close()
+        self.assertEqual(list(delta_format.iter_records(self.path)), self.records[:400])
+        self.assertFalse(os.path.exists(delta_format.journal_path(self.path)))
+
+    def test_range_scan_skips_blocks(self):
+        """Test block headers bound each block and ranges decode only overlapping blocks"""
+        self._write(self.records)
+        with open(self.path, 'rb') as f:
+            headers = [header for header, _ in delta_format.iter_blocks(f)]
+        self.assertEqual([h.count for h in headers], [256, 256, 256, 232])
+        self.assertEqual(headers[0].max_values[2], 32767.0)
+        self.assertEqual(headers[0].min_values[2], -32768.0)
+
+        start, end = self.records[300][0], self.records[400][0]
+        with open(self.path, 'rb') as f:
+            touched = [header for header, _ in delta_format.iter_blocks(f, start, end)]
+        self.assertEqual(len(touched), 1)
+        expected = [r for r in self.records if start <= r[0] <= end]
+        timestamps, glucose = delta_format.read_columns(self.path, start, end, ['timestamp', 'glucose'])
+        self.assertEqual(list(timestamps), [r[0] for r in expected])
+        self.assertEqual(list(glucose), [r[3] for r in expected])
+
+        with self.assertRaises(ValueError):
+            delta_format.encode_block([(start, 36.5, 7.0, 40000.0)])
+
+    def test_compact_at_regular_intervals(self):
+        """Test regular readings take about 7 bytes each"""
+        start = datetime(2024, 1, 1).timestamp()
+        records = [(start + 10 * i, 36.5 + (i % 3) / 10, 7.2, 100.0 + i % 5) for i in range(2560)]
+        self._write(records, flush_every=12)
+        size = os.path.getsize(self.path) - delta_format.HEADER.size
+        # Per block: the first 10 s delta as a 4 byte varint, then one byte
+        # per delta-of-delta and two per channel delta
+        self.assertEqual(size, 10 * (delta_format.BLOCK_HEADER.size + 4 + 254 + 255 * 6))
+
+    def test_csv_handler_delta_format(self):
+        """Test CSVHandler stores, resumes and reads back delta files at sensor resolution"""
+        base = datetime(2024, 1, 1, 23, 0)
+        with CSVHandler(self.temp_dir, file_format='delta', flush_rows=12) as handler:
+            for i in range(100):
+                handler.save_sensor_reading({
+                    'timestamp': (base + timedelta(minutes=i)).isoformat(),
+                    'temperature': 36.46, 'ph': 7.123, 'glucose': 99.6
+                })
+        with CSVHandler(self.temp_dir, file_format='delta') as handler:
+            handler.save_columns({
+                'timestamp': [(base + timedelta(minutes=i)).timestamp() for i in range(100, 150)],
+                'temperature': [37.0] * 50, 'ph': [7.0] * 50, 'glucose': [120.0] * 50
+            })
+            self.assertEqual(handler.get_available_dates(), ['2024-01-01', '2024-01-02'])
+
+            day = handler.load_sensor_readings('2024-01-01')
+            self.assertEqual(len(day), 60)
+            self.assertEqual(day[0], {'timestamp': base, 'temperature': 36.5, 'ph': 7.12, 'glucose': 100.0})
+            columns = handler.load_range(base + timedelta(minutes=90), base + timedelta(minutes=110))
+            self.assertEqual(list(columns['glucose']), [100.0] * 10 + [120.0] * 11)
+            tuples = list(handler.iter_readings(base + timedelta(minutes=90),
+                                                base + timedelta(minutes=110), output='tuple'))
+            self.assertEqual([t[0] for t in tuples], list(columns['timestamp']))
+
+            stats = handler.get_statistics()
+            self.assertEqual(stats['glucose']['count'], 150)
+            self.assertEqual(stats['temperature']['min'], 36.5)
+            handler._summaries._summaries.clear()
+            self.assertEqual(handler.get_statistics(), stats)
+
+    def test_out_of_range_batch_rejected(self):
+        """Test a batch with a reading the format can't hold is neither written nor counted"""
+        base = datetime(2024, 1, 1, 12).timestamp()
+        with CSVHandler(self.temp_dir, file_format='delta') as handler:
+            saved = handler.save_columns({
+                'timestamp': [base, base + 60, base + 120],
+                'temperature': [36.5, 36.6, 1e6], 'ph': [7.0] * 3, 'glucose': [100.0] * 3
+            })
+            self.assertEqual(saved, 0)
+            self.assertEqual(handler.get_statistics(), {})
+            self.assertEqual(handler.save_columns({
+                'timestamp': [base + 180], 'temperature': [36.7], 'ph': [7.0], 'glucose': [100.0]
+            }), 1)
+        with CSVHandler(self.temp_dir, file_format='delta') as handler:
+            self.assertEqual(handler.get_statistics()['temperature']['count'], 1)
+            self.assertEqual(len(handler.load_sensor_readings('2024-01-01')), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
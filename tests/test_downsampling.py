@@ -0,0 +1,71 @@
+"""
+Unit tests for downsampling module
+"""
+
+import math
+import random
+import unittest
+from unittest import mock
+from data_management import downsampling
+from data_management.downsampling import downsample, downsample_columns, lttb_indices, minmax_indices
+
+
+class TestDownsampling(unittest.TestCase):
+    """Test LTTB and min/max downsampling"""
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.x = [float(i) for i in range(5000)]
+        self.y = [math.sin(i / 200) * 10 + rng.gauss(0, 0.5) for i in range(5000)]
+        self.y[1234] = 80.0  # Spike
+
+    def test_lttb_keeps_endpoints_and_spike(self):
+        """Test LTTB output size, order and fidelity"""
+        indices = list(lttb_indices(self.x, self.y, 200))
+        self.assertEqual(len(indices), 200)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], 4999)
+        self.assertEqual(indices, sorted(set(indices)))
+        self.assertIn(1234, indices)
+
+    def test_minmax_keeps_extremes(self):
+        """Test every bucket contributes its min and max in time order"""
+        indices = list(minmax_indices(self.y, 100))
+        self.assertLessEqual(len(indices), 200)
+        self.assertEqual(indices, sorted(indices))
+        self.assertIn(1234, indices)
+        self.assertIn(self.y.index(min(self.y)), indices)
+
+    def test_short_series_unchanged(self):
+        """Test series already below the target are returned whole"""
+        x, y = downsample(self.x[:50], self.y[:50], 200)
+        self.assertEqual(list(x), self.x[:50])
+        self.assertEqual(list(y), self.y[:50])
+        with self.assertRaises(ValueError):
+            downsample(self.x, self.y, 200, mode='average')
+
+    def test_pure_python_matches_numpy(self):
+        """Test the fallback path selects the same points"""
+        if downsampling.np is None:
+            self.skipTest("numpy not installed")
+        lttb = list(lttb_indices(self.x, self.y, 300))
+        minmax = list(minmax_indices(self.y, 150))
+        with mock.patch.object(downsampling, 'np', None):
+            self.assertEqual(lttb_indices(self.x, self.y, 300), lttb)
+            self.assertEqual(minmax_indices(self.y, 150), minmax)
+
+    def test_columns_stay_aligned(self):
+        """Test multi-channel reduction keeps rows aligned"""
+        columns = {
+            'timestamp': self.x,
+            'temperature': self.y,
+            'ph': [7.0 + i / 5000 for i in range(5000)]
+        }
+        reduced = downsample_columns(columns, ['temperature', 'ph'], 100, mode='minmax')
+        self.assertLessEqual(len(reduced['timestamp']), 400)
+        for i, timestamp in enumerate(reduced['timestamp']):
+            self.assertEqual(reduced['temperature'][i], self.y[int(timestamp)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Unit tests for the vectorised CSV parser
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from data_management import fast_csv
+from data_management.csv_handler import CSVHandler
+from data_management.sensor_data import SensorReading
+
+
+FIELDS = ['timestamp', 'temperature', 'ph', 'glucose']
+
+
+class TestFastCSV(unittest.TestCase):
+    """Test fast_csv against datetime.fromisoformat() row parsing"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self._tz = os.environ.get('TZ')
+
+    def tearDown(self):
+        if self._tz is None:
+            os.environ.pop('TZ', None)
+        else:
+            os.environ['TZ'] = self._tz
+        if hasattr(time, 'tzset'):
+            time.tzset()
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, name, timestamps):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'w') as f:
+            f.write('timestamp,temperature,ph,glucose\n')
+            for i, ts in enumerate(timestamps):
+                f.write(f'{ts},{36 + i / 10},7.2{i % 10},{100 + i}\n')
+        return path
+
+    def _assert_matches_rows(self, path, timestamps):
+        columns = fast_csv.read_csv_columns(path, FIELDS)
+        self.assertEqual(
+            columns[0].tolist(), [datetime.fromisoformat(ts).timestamp() for ts in timestamps]
+        )
+        self.assertEqual(columns[3].tolist(), [100.0 + i for i in range(len(timestamps))])
+
+    def test_matches_row_parsing(self):
+        """Test timestamps (with and without microseconds) and values match exactly"""
+        start = datetime(2024, 1, 1, 8)
+        timestamps = [(start + timedelta(seconds=i * 0.37)).isoformat() for i in range(500)]
+        self._assert_matches_rows(self._write('a.csv', timestamps), timestamps)
+        self.assertEqual(len(fast_csv.read_csv_columns(self._write('b.csv', []), FIELDS)[0]), 0)
+
+    @unittest.skipUnless(hasattr(time, 'tzset'), "needs time.tzset")
+    def test_daylight_saving_transition(self):
+        """Test a file spanning a DST change falls back to per-row offsets"""
+        os.environ['TZ'] = 'Europe/Berlin'
+        time.tzset()
+        start = datetime(2024, 3, 31, 0, 30)
+        timestamps = [(start + timedelta(minutes=10 * i)).isoformat() for i in range(24)]
+        self._assert_matches_rows(self._write('dst.csv', timestamps), timestamps)
+        summer = [(datetime(2024, 7, 1) + timedelta(minutes=i)).isoformat() for i in range(10)]
+        self._assert_matches_rows(self._write('summer.csv', summer), summer)
+        # Same offset at the first and last row, with the change in between
+        late = ['2024-03-31T00:30:00', '2024-03-31T05:00:00', '2024-03-31T01:30:00']
+        self._assert_matches_rows(self._write('late.csv', late), late)
+
+    def test_unsupported_rows_fall_back(self):
+        """Test timezone-aware timestamps are left to the csv.reader path"""
+        path = self._write('sensor_data_2024-01-01.csv', ['2024-01-01T10:00:00+02:00'])
+        self.assertIsNone(fast_csv.read_csv_columns(path, FIELDS))
+
+        handler = CSVHandler(self.temp_dir)
+        readings = handler.load_sensor_readings(datetime(2024, 1, 1).date())
+        self.assertEqual(readings[0]['timestamp'].utcoffset(), timedelta(hours=2))
+        handler.close()
+
+    def test_load_output_modes(self):
+        """Test dict, column and lazy SensorReading loads agree"""
+        handler = CSVHandler(self.temp_dir)
+        for minute in (5, 1, 3):
+            handler.save_sensor_reading({
+                'timestamp': datetime(2024, 1, 2, 9, minute).isoformat(),
+                'temperature': 36.0 + minute, 'ph': 7.0, 'glucose': 90
+            })
+        day = datetime(2024, 1, 2).date()
+        dicts = handler.load_sensor_readings(day)
+        columns = handler.load_sensor_readings(day, output='columns')
+        readings = handler.load_sensor_readings(day, output='readings')
+        handler.close()
+
+        self.assertEqual([r['temperature'] for r in dicts], [41.0, 37.0, 39.0])
+        self.assertEqual(list(columns['temperature']), [37.0, 39.0, 41.0])  # Time order
+        self.assertIsInstance(readings[0], SensorReading)
+        self.assertEqual(readings[0].timestamp, datetime(2024, 1, 2, 9, 1))
+        self.assertEqual(len(handler.load_all_readings(output='readings')), 3)
+        with self.assertRaises(ValueError):
+            handler.load_sensor_readings(day, output='tuple')
+
+
+if __name__ == '__main__':
+    unittest.main()
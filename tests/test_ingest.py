@@ -0,0 +1,119 @@
+"""
+Unit tests for IngestPipeline module
+"""
+
+import unittest
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+from data_management.csv_handler import CSVHandler
+from data_management.sensor_data import SensorData
+from data_management.ingest import IngestPipeline
+
+
+class TestIngestPipeline(unittest.TestCase):
+    """Test IngestPipeline class"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_handler = CSVHandler(self.temp_dir, flush_rows=10)
+        self.sensor_data = SensorData()
+    
+    def tearDown(self):
+        self.csv_handler.close()
+        shutil.rmtree(self.temp_dir)
+    
+    def _reading(self, i):
+        return {
+            'timestamp': (datetime(2024, 1, 1, 12) + timedelta(seconds=i)).isoformat(),
+            'temperature': 36.0 + i,
+            'ph': 7.0,
+            'glucose': 100
+        }
+    
+    def test_writer_thread_drains_queue(self):
+        """Test that submitted readings reach SensorData and CSV"""
+        pipeline = IngestPipeline(self.sensor_data, self.csv_handler, batch_size=7)
+        pipeline.start()
+        for i in range(25):
+            self.assertTrue(pipeline.submit(self._reading(i)))
+        pipeline.stop()
+        
+        stats = pipeline.get_stats()
+        self.assertEqual(stats['written'], 25)
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertEqual(len(self.sensor_data), 25)
+        readings = self.csv_handler.load_sensor_readings(datetime(2024, 1, 1).date())
+        self.assertEqual(len(readings), 25)
+    
+    def test_drop_oldest_policy(self):
+        """Test that a full queue discards the oldest reading"""
+        pipeline = IngestPipeline(self.sensor_data, self.csv_handler, max_queue=3)
+        for i in range(5):
+            self.assertTrue(pipeline.submit(self._reading(i)))
+        
+        self.assertEqual(pipeline.get_stats()['dropped'], 2)
+        pipeline.start()
+        pipeline.stop()
+        temps = [r.temperature for r in self.sensor_data.get_all_readings()]
+        self.assertEqual(temps, [38.0, 39.0, 40.0])
+    
+    def test_drop_newest_policy(self):
+        """Test that a full queue rejects new readings"""
+        pipeline = IngestPipeline(
+            self.sensor_data, self.csv_handler, max_queue=2, policy='drop_newest'
+        )
+        results = [pipeline.submit(self._reading(i)) for i in range(3)]
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(pipeline.queue_depth(), 2)
+    
+    def test_block_policy(self):
+        """Test that a full queue makes producers wait for the writer instead of dropping"""
+        pipeline = IngestPipeline(
+            self.sensor_data, self.csv_handler, max_queue=2, batch_size=1,
+            policy='block', block_timeout=5.0
+        )
+        # No writer thread to make room: the reading is rejected without waiting
+        results = [pipeline.submit(self._reading(i)) for i in range(3)]
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(pipeline.get_stats()['dropped'], 1)
+        
+        pipeline.start()
+        for i in range(3, 23):
+            self.assertTrue(pipeline.submit(self._reading(i)))
+        pipeline.stop()
+        
+        stats = pipeline.get_stats()
+        self.assertEqual(stats['dropped'], 1)
+        self.assertEqual(stats['written'], 22)
+        self.assertLessEqual(stats['max_depth'], 2)
+        temps = [r.temperature for r in self.sensor_data.get_all_readings()]
+        self.assertEqual(temps, [36.0, 37.0] + [36.0 + i for i in range(3, 23)])
+    
+    def test_submit_columns(self):
+        """Test a column batch is written in queue order alongside single readings"""
+        pipeline = IngestPipeline(self.sensor_data, self.csv_handler)
+        start = datetime(2024, 1, 1, 11).timestamp()
+        pipeline.submit(self._reading(0))
+        self.assertTrue(pipeline.submit_columns({
+            'timestamp': [start + 60 * i for i in range(5)],
+            'temperature': [30.0 + i for i in range(5)],
+            'ph': [7.0] * 5,
+            'glucose': [90.0] * 5
+        }))
+        pipeline.submit(self._reading(1))
+        self.assertEqual(pipeline.queue_depth(), 3)
+        pipeline.start()
+        pipeline.stop()
+        
+        stats = pipeline.get_stats()
+        self.assertEqual(stats['submitted'], 7)
+        self.assertEqual(stats['written'], 7)
+        temps = [r.temperature for r in self.sensor_data.get_all_readings()]
+        self.assertEqual(temps, [36.0, 30.0, 31.0, 32.0, 33.0, 34.0, 37.0])
+        readings = self.csv_handler.load_sensor_readings(datetime(2024, 1, 1).date())
+        self.assertEqual(len(readings), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
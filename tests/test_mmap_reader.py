@@ -0,0 +1,103 @@
+"""
+Unit tests for mmap_reader module
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+from datetime import datetime, timedelta
+from data_management import binary_format
+from data_management.csv_handler import CSVHandler
+from data_management.mmap_reader import MappedDayFile, np
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestMappedDayFile(unittest.TestCase):
+    """Test MappedDayFile class and CSVHandler.load_range"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.base = datetime(2024, 1, 1, 0, 0, 0)
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def _write_binary(self, offsets):
+        path = os.path.join(self.temp_dir, 'sensor_data_2024-01-01.bin')
+        with open(path, 'wb') as f:
+            binary_format.write_header(f)
+            for offset in offsets:
+                timestamp = (self.base + timedelta(seconds=offset)).timestamp()
+                f.write(binary_format.pack_record(timestamp, float(offset), 7.0, 100.0))
+        return path
+    
+    def test_slice_range_is_view(self):
+        """Test binary-searched slicing returns views of the mapping"""
+        mapped = MappedDayFile(self._write_binary(range(0, 1000, 10)))
+        start = (self.base + timedelta(seconds=95)).timestamp()
+        end = (self.base + timedelta(seconds=130)).timestamp()
+        
+        window = mapped.slice_range(start, end)
+        self.assertEqual(list(window['temperature']), [100.0, 110.0, 120.0, 130.0])
+        self.assertTrue(np.shares_memory(window, mapped.records))
+        self.assertEqual(len(mapped.columns()['ph']), 100)
+    
+    def test_slice_range_unsorted_file(self):
+        """Test files with late records are still filtered correctly"""
+        mapped = MappedDayFile(self._write_binary([0, 10, 30, 20, 40]))
+        self.assertFalse(mapped.is_sorted())
+        window = mapped.slice_range(
+            (self.base + timedelta(seconds=10)).timestamp(),
+            (self.base + timedelta(seconds=30)).timestamp()
+        )
+        self.assertEqual(list(window['temperature']), [10.0, 20.0, 30.0])
+    
+    def test_remap_checks_appended_records_only(self):
+        """Test a remapped file that grew reuses the order check of its earlier records"""
+        path = self._write_binary(range(0, 1000, 10))
+        mapped = MappedDayFile(path)
+        self.assertTrue(mapped.is_sorted())
+        # Known-ordered records before each append: 100, then 102, then
+        # none once the late record was appended
+        for offsets, checked, expected in (([1000, 1010], 100, True), ([5], 102, False), ([2000], 0, False)):
+            with open(path, 'ab') as f:
+                for offset in offsets:
+                    timestamp = (self.base + timedelta(seconds=offset)).timestamp()
+                    f.write(binary_format.pack_record(timestamp, float(offset), 7.0, 100.0))
+            previous, mapped = mapped, MappedDayFile(path, mapped)
+            previous.close()
+            self.assertEqual(mapped._sorted_records, checked)
+            self.assertEqual(mapped.is_sorted(), expected)
+            self.assertEqual(mapped.is_sorted(), MappedDayFile(path).is_sorted())
+        mapped.close()
+    
+    def test_load_range(self):
+        """Test load_range across binary and CSV daily files"""
+        with CSVHandler(self.temp_dir, file_format='binary') as handler:
+            for hour in range(48):
+                handler.save_sensor_reading({
+                    'timestamp': (self.base + timedelta(hours=hour)).isoformat(),
+                    'temperature': float(hour)
+                })
+            
+            columns = handler.load_range(self.base + timedelta(hours=5), self.base + timedelta(hours=7))
+            self.assertEqual(list(columns['temperature']), [5.0, 6.0, 7.0])
+            
+            columns = handler.load_range(
+                self.base + timedelta(hours=22), self.base + timedelta(hours=25),
+                fields=['timestamp', 'temperature']
+            )
+            self.assertEqual(list(columns['temperature']), [22.0, 23.0, 24.0, 25.0])
+            self.assertNotIn('ph', columns)
+        
+        with CSVHandler(self.temp_dir) as handler:
+            handler.save_sensor_reading({
+                'timestamp': datetime(2024, 1, 3, 1).isoformat(), 'temperature': 99.0
+            })
+            columns = handler.load_range(self.base + timedelta(hours=47))
+            self.assertEqual(list(columns['temperature']), [47.0, 99.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
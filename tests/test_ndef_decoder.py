@@ -0,0 +1,78 @@
+"""
+Unit tests for the NDEF health record decoder
+
+Expected values were produced by the C parser in native_sensor/sensor_nhs3152.c
+for the same fixture bytes, with a temperature offset of 0.5.
+"""
+
+import unittest
+from android_jni import ndef_decoder
+from android_jni.ndef_decoder import decode_message, decode_samples, parse_health_record
+
+
+# 'H' short record, 'L' sample log in a long record with an ID field,
+# a text record to skip and a final 'H' record with a padded payload
+MESSAGE = bytes([
+    0x91, 1, 6, ord('H'), 0x01, 0x6D, 0x02, 0xD0, 0x00, 0x64,
+    0x09, 1, 0, 0, 0, 24, 2, ord('L'), ord('i'), ord('d'),
+    0x65, 0x92, 0x00, 0x80, 0x00, 0x3C,
+    0xFF, 0xF6, 0x02, 0xBC, 0x00, 0x50,
+    0x80, 0x00, 0x05, 0x78, 0xFF, 0xFF,
+    0x01, 0x70, 0x02, 0xBD, 0x00, 0x51,
+    0x11, 1, 3, ord('T'), ord('a'), ord('b'), ord('c'),
+    0x51, 1, 7, ord('H'), 0x7F, 0xFF, 0x00, 0x00, 0x01, 0x2C, 0xAA,
+])
+DISCOVERED_AT = 1700000000.25
+EXPECTED = [
+    (1700000000.25, 37.0, 7.2, 100.0),
+    (1704067200.0, -0.5, 7.0, 80.0),
+    (1704067260.0, -3276.3, 14.0, 65535.0),
+    (1704067320.0, 37.3, 7.01, 81.0),
+    (1700000000.25, 3277.2, 0.0, 300.0),
+]
+
+# Compact layout read by parse_nfc_ndef_message()
+LEGACY = bytes([0x00, 0x81, ord('H'), 6, 0xFE, 0xD4, 0x02, 0xA8, 0x00, 0xB4]) + bytes(8)
+
+
+class TestNdefDecoder(unittest.TestCase):
+    """Test the decoder against the native parser's output"""
+
+    def _rows(self, columns):
+        return list(zip(*(columns[name] for name in ndef_decoder.FIELDNAMES)))
+
+    def test_decode_message_matches_native_parser(self):
+        """Test every 'H' and 'L' reading decodes to the C parser's values"""
+        rows = self._rows(decode_message(MESSAGE, DISCOVERED_AT, temp_offset=0.5))
+        self.assertEqual(len(rows), len(EXPECTED))
+        for row, expected in zip(rows, EXPECTED):
+            for value, want in zip(row, expected):
+                self.assertAlmostEqual(value, want, places=9)
+
+    def test_malformed_message(self):
+        """Test a record running past the end is rejected like the C parser does"""
+        with self.assertRaises(ValueError):
+            decode_message(MESSAGE[:-1], DISCOVERED_AT)
+        self.assertEqual(len(decode_message(b'', DISCOVERED_AT)['timestamp']), 0)
+
+    def test_numpy_and_fallback_agree(self):
+        """Test the frombuffer path and the struct fallback decode alike"""
+        payloads = bytes(range(256)) * 30
+        count = len(payloads) // 6
+        fallback = ndef_decoder._decode_samples_python(payloads, count, 0.5)
+        decoded = decode_samples(payloads, 0.5)
+        for name in ('temperature', 'ph', 'glucose'):
+            self.assertEqual(len(decoded[name]), count)
+            self.assertEqual(list(decoded[name]), list(fallback[name]))
+
+    def test_parse_health_record(self):
+        """Test the single-record decoder mirrors parse_nfc_ndef_message()"""
+        temperature, ph, glucose = parse_health_record(LEGACY, temp_offset=0.5)
+        self.assertEqual(temperature, -29.5)
+        self.assertAlmostEqual(ph, 6.8, places=6)
+        self.assertEqual(glucose, 180.0)
+        self.assertIsNone(parse_health_record(LEGACY[:15]))
+
+
+if __name__ == '__main__':
+    unittest.main()
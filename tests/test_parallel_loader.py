@@ -0,0 +1,100 @@
+"""
+Unit tests for the parallel multi-day loader
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+from data_management import parallel_loader
+from data_management.csv_index import CSVIndex
+from data_management.csv_handler import CSVHandler
+
+
+class TestParallelLoader(unittest.TestCase):
+    """Test CSVHandler.load_range_parallel against the serial loader"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        # Alternate CSV and binary days, with a late reading on each day
+        for day in range(1, 7):
+            file_format = 'csv' if day % 2 else 'binary'
+            with CSVHandler(self.temp_dir, file_format=file_format) as handler:
+                for minute in range(0, 300, 7):
+                    handler.save_sensor_reading(self._reading(day, minute))
+                handler.save_sensor_reading(self._reading(day, 3))
+        self.handler = CSVHandler(self.temp_dir)
+
+    def tearDown(self):
+        self.handler.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _reading(self, day, minute):
+        return {
+            'timestamp': (datetime(2024, 1, day) + timedelta(minutes=minute)).isoformat(),
+            'temperature': 36.0 + minute / 100,
+            'ph': 7.0,
+            'glucose': 100 + day
+        }
+
+    def assertColumnsEqual(self, first, second):
+        self.assertEqual(list(first), list(second))
+        for name in first:
+            self.assertEqual(list(first[name]), list(second[name]))
+
+    def test_matches_serial_loader(self):
+        """Test the process/thread pools return the same merged, time-ordered columns"""
+        expected = self.handler.load_range()
+        loaded = self.handler.load_range_parallel(workers=3, min_parallel_files=1)
+        self.assertColumnsEqual(loaded, expected)
+        timestamps = list(loaded['timestamp'])
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertEqual(len(timestamps), 6 * 44)
+
+    def test_range_and_fields(self):
+        """Test time ranges and field selection across worker files"""
+        start, end = datetime(2024, 1, 2, 3), datetime(2024, 1, 5, 1)
+        expected = self.handler.load_range(start, end, fields=['timestamp', 'glucose'])
+        loaded = self.handler.load_range_parallel(
+            start, end, fields=['timestamp', 'glucose'], workers=2, min_parallel_files=1
+        )
+        self.assertColumnsEqual(loaded, expected)
+        with self.assertRaises(ValueError):
+            self.handler.load_range_parallel(fields=['humidity'])
+
+    def test_serial_fallback(self):
+        """Test small inputs and a single worker are parsed in-process"""
+        paths = [path for _, path in self.handler._daily_files()]
+        serial = parallel_loader.load_files(paths, workers=1)
+        small = parallel_loader.load_files(paths, min_parallel_files=len(paths) + 1)
+        self.assertEqual(len(serial), len(paths))
+        for first, second in zip(serial, small):
+            self.assertEqual([list(c) for c in first], [list(c) for c in second])
+
+    def test_index_sidecars_written_by_parent_only(self):
+        """Test workers seek with offsets looked up in the calling process"""
+        for path in Path(self.temp_dir).glob('*.idx'):
+            path.unlink()
+        parent = os.getpid()
+        save = CSVIndex.save
+
+        def save_in_parent(index, csv_path):
+            if os.getpid() != parent:
+                raise AssertionError('index saved by a worker')
+            save(index, csv_path)
+
+        paths = [path for _, path in self.handler._daily_files()]
+        start, end = datetime(2024, 1, 1, 2).timestamp(), datetime(2024, 1, 6, 1).timestamp()
+        with mock.patch.object(CSVIndex, 'save', save_in_parent):
+            loaded = parallel_loader.load_files(paths, start, end, workers=2, min_parallel_files=1)
+        serial = parallel_loader.load_files(paths, start, end, workers=1)
+        self.assertEqual([[list(c) for c in part] for part in loaded],
+                         [[list(c) for c in part] for part in serial])
+        self.assertEqual(len(list(Path(self.temp_dir).glob('sensor_data_2024-*.idx'))), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Unit tests for rollup module
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import time
+from datetime import datetime, timedelta
+from data_management.csv_handler import CSVHandler
+from data_management.rollup import COMPACT_ROWS, RollupStore
+
+
+class TestRollupStore(unittest.TestCase):
+    """Test rollup tiers built while saving readings"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.base = datetime(2024, 1, 1, 0, 0, 0)
+        self.handler = CSVHandler(self.temp_dir, flush_rows=100)
+        # One reading every 10 seconds for 3 hours
+        self.handler.save_sensor_readings([
+            {
+                'timestamp': (self.base + timedelta(seconds=10 * i)).isoformat(),
+                'temperature': float(i),
+                'glucose': 100.0
+            }
+            for i in range(1080)
+        ])
+
+    def tearDown(self):
+        self.handler.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_bucket_aggregates(self):
+        """Test count/min/max/mean/last of the minute tier"""
+        result = self.handler.load_rollup(self.base, self.base + timedelta(minutes=2), tier='1m')
+        self.assertEqual(result['tier'], '1m')
+        self.assertEqual(list(result['timestamp']),
+                         [(self.base + timedelta(minutes=m)).timestamp() for m in range(3)])
+        self.assertEqual(list(result['count']), [6.0, 6.0, 6.0])
+        temperature = result['temperature']
+        self.assertEqual(list(temperature['min']), [0.0, 6.0, 12.0])
+        self.assertEqual(list(temperature['max']), [5.0, 11.0, 17.0])
+        self.assertEqual(list(temperature['mean']), [2.5, 8.5, 14.5])
+        self.assertEqual(list(temperature['last']), [5.0, 11.0, 17.0])
+
+    def test_picks_coarsest_tier(self):
+        """Test automatic tier selection from the requested point count"""
+        start, end = self.base, self.base + timedelta(hours=3)
+        self.assertEqual(self.handler.load_rollup(start, end, points=3)['tier'], '1h')
+        self.assertEqual(self.handler.load_rollup(start, end, points=12)['tier'], '15m')
+        self.assertEqual(self.handler.load_rollup(start, end, points=100)['tier'], '1m')
+
+        hourly = self.handler.load_rollup(start, end, points=3)
+        self.assertEqual(list(hourly['count']), [360.0, 360.0, 360.0])
+        self.assertEqual(list(hourly['glucose']['mean']), [100.0, 100.0, 100.0])
+
+    def test_partial_rows_merged_across_writes(self):
+        """Test buckets written in several flushes are merged on read"""
+        self.handler.close()
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'rollup_1m_2024-01-01.csv')))
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'rollup_1h_2024-01.csv')))
+
+        # A late reading lands in an hour bucket that is already on disk
+        handler = CSVHandler(self.temp_dir)
+        handler.save_sensor_reading({
+            'timestamp': (self.base + timedelta(minutes=30)).isoformat(),
+            'temperature': -5.0
+        })
+        handler.close()
+
+        store = RollupStore(self.temp_dir)
+        (_, bucket), = store.buckets('1h', self.base.timestamp(), self.base.timestamp())
+        self.assertEqual(bucket.count, 361)
+        self.assertEqual(bucket.mins[0], -5.0)
+        self.assertEqual(bucket.lasts[0], 359.0)
+
+    def test_rebuild_matches_incremental(self):
+        """Test rebuilding from daily files reproduces the tiers"""
+        start, end = self.base, self.base + timedelta(hours=3)
+        before = self.handler.load_rollup(start, end, tier='15m')
+        self.assertEqual(self.handler.rebuild_rollups(), 1080)
+        after = self.handler.load_rollup(start, end, tier='15m')
+        self.assertEqual(list(before['count']), list(after['count']))
+        self.assertEqual(list(before['temperature']['mean']), list(after['temperature']['mean']))
+
+    def test_files_compacted_and_cached(self):
+        """Test frequent flushes don't grow the coarse tiers or invalidate the parse cache"""
+        store = RollupStore(self.temp_dir, write_interval=0)
+        start = datetime(2024, 2, 1).timestamp()
+        store.buckets('1h', start, start)
+        path = store._file_for('1h', 'month', start)
+        for minute in range(300):
+            # One reading and one flush a minute for 5 hours
+            store.add(start + 60 * minute, (36.0, 7.0, float(minute)))
+            store.flush(force=False)
+            if minute % 50 == 0:
+                store.buckets('1h', start, start + 18000)
+        with open(path) as f:
+            self.assertLessEqual(len(f.readlines()) - 1, 5 + COMPACT_ROWS)
+        stat = os.stat(path)
+        self.assertEqual(store._cache[path][:2], (stat.st_size, stat.st_mtime_ns))
+
+        expected = [(start + 3600 * h, 60) for h in range(5)]
+        for reader in (store, RollupStore(self.temp_dir)):
+            buckets = reader.buckets('1h', start, start + 18000)
+            self.assertEqual([(s, b.count) for s, b in buckets], expected)
+            self.assertEqual(buckets[-1][1].lasts[2], 299.0)
+
+    @unittest.skipUnless(hasattr(time, 'tzset'), "needs time.tzset")
+    def test_buckets_aligned_to_local_time(self):
+        """Test hourly buckets start on the local hour at a half-hour UTC offset"""
+        previous = os.environ.get('TZ')
+        os.environ['TZ'] = 'IST-5:30'
+        time.tzset()
+        try:
+            temp_dir = tempfile.mkdtemp()
+            try:
+                store = RollupStore(temp_dir)
+                local = datetime(2024, 1, 1, 10, 45)
+                store.add(local.timestamp(), (36.0, 7.0, 100.0))
+                store.add((local + timedelta(minutes=20)).timestamp(), (36.0, 7.0, 100.0))
+                hours = [start for start, _ in store.buckets('1h', local.timestamp() - 3600,
+                                                              local.timestamp() + 3600)]
+                self.assertEqual(hours, [datetime(2024, 1, 1, 10).timestamp(),
+                                         datetime(2024, 1, 1, 11).timestamp()])
+            finally:
+                shutil.rmtree(temp_dir)
+        finally:
+            if previous is None:
+                del os.environ['TZ']
+            else:
+                os.environ['TZ'] = previous
+            time.tzset()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,9 +2,10 @@
 Unit tests for SensorData module
 """
 
+import random
 import unittest
-from datetime import datetime
-from data_management.sensor_data import SensorData, SensorReading
+from datetime import datetime, timedelta
+from data_management.sensor_data import BufferView, SensorData, SensorReading
 
 
 class TestSensorData(unittest.TestCase):
@@ -50,6 +51,97 @@ class TestSensorData(unittest.TestCase):
         self.assertEqual(stats['temperature']['min'], 36.0)
         self.assertEqual(stats['temperature']['max'], 40.0)
     
+    def test_statistics_follow_eviction(self):
+        """Test running statistics against a full recomputation"""
+        import random
+        import statistics
+        rng = random.Random(7)
+        sensor_data = SensorData(max_memory_readings=50)
+        values = [rng.uniform(30, 42) for _ in range(500)]
+        for v in values:
+            sensor_data.add_reading({'temperature': v, 'ph': 7.0, 'glucose': 100})
+        
+        window = values[-50:]
+        stats = sensor_data.get_statistics()['temperature']
+        self.assertEqual(stats['min'], min(window))
+        self.assertEqual(stats['max'], max(window))
+        self.assertEqual(stats['count'], 50)
+        self.assertEqual(stats['last'], values[-1])
+        self.assertAlmostEqual(stats['avg'], statistics.fmean(window), places=9)
+        self.assertAlmostEqual(stats['stddev'], statistics.pstdev(window), places=9)
+    
+    def test_time_range_queries(self):
+        """Test binary-searched time range queries"""
+        base = datetime(2024, 1, 1, 12, 0, 0)
+        for i in range(20):
+            self.sensor_data.add_reading({
+                'timestamp': base + timedelta(seconds=5 * i),
+                'temperature': float(i)
+            })
+        
+        since = self.sensor_data.get_readings_since(base + timedelta(seconds=85))
+        self.assertEqual([r.temperature for r in since], [17.0, 18.0, 19.0])
+        between = self.sensor_data.get_readings_between(
+            base + timedelta(seconds=10), base + timedelta(seconds=20)
+        )
+        self.assertEqual([r.temperature for r in between], [2.0, 3.0, 4.0])
+    
+    def test_time_range_with_late_readings(self):
+        """Test that out-of-order inserts are returned in time order"""
+        sensor_data = SensorData(max_memory_readings=5)
+        base = datetime(2024, 1, 1, 12, 0, 0)
+        for offset in (0, 10, 20, 5, 30):
+            sensor_data.add_reading({
+                'timestamp': base + timedelta(seconds=offset),
+                'temperature': float(offset)
+            })
+        
+        between = sensor_data.get_readings_between(base, base + timedelta(seconds=20))
+        self.assertEqual([r.temperature for r in between], [0.0, 5.0, 10.0, 20.0])
+        
+        # Once the late reading's predecessor is evicted the ring is sorted again
+        for offset in (40, 50, 60):
+            sensor_data.add_reading({
+                'timestamp': base + timedelta(seconds=offset),
+                'temperature': float(offset)
+            })
+        self.assertEqual(len(sensor_data._descents), 0)
+        since = sensor_data.get_readings_since(base + timedelta(seconds=30))
+        self.assertEqual([r.temperature for r in since], [30.0, 40.0, 50.0, 60.0])
+    
+    def test_sorted_index_updated_in_place(self):
+        """Test late inserts and evictions are merged into the sorted index"""
+        sensor_data = SensorData(max_memory_readings=20)
+        rng = random.Random(7)
+        base = datetime(2024, 1, 1, 12).timestamp()
+        inserted = []
+        for i in range(300):
+            # Mostly in order, with late readings and duplicate timestamps
+            ts = base + i - (rng.randrange(30) if rng.random() < 0.2 else 0)
+            sensor_data.add_reading({'timestamp': ts, 'temperature': float(i)})
+            inserted.append((ts, float(i)))
+            expected = [temp for ts, temp in sorted(inserted[-20:], key=lambda row: row[0])]
+            between = sensor_data.get_readings_between(base - 60, base + 600)
+            self.assertEqual([r.temperature for r in between], expected)
+            if sensor_data._descents:
+                # The index survives inserts instead of being rebuilt per query
+                self.assertIsNotNone(sensor_data._order)
+    
+    def test_readings_property_is_live_view(self):
+        """Test the readings property reads the ring without copying it"""
+        sensor_data = SensorData(max_memory_readings=3)
+        view = sensor_data.readings
+        self.assertIsInstance(view, BufferView)
+        self.assertEqual(len(view), 0)
+        for i in range(5):
+            sensor_data.add_reading({'temperature': float(i)})
+        
+        self.assertEqual([r.temperature for r in view], [2.0, 3.0, 4.0])
+        self.assertEqual(view[-1].temperature, 4.0)
+        self.assertEqual([r.temperature for r in view[1:]], [3.0, 4.0])
+        with self.assertRaises(IndexError):
+            view[3]
+    
     def test_clear_readings(self):
         """Test clearing readings"""
         self.sensor_data.add_reading({'temperature': 36.5, 'ph': 7.0, 'glucose': 100})
@@ -57,7 +149,80 @@ class TestSensorData(unittest.TestCase):
         
         self.sensor_data.clear_readings()
         self.assertEqual(len(self.sensor_data.get_all_readings()), 0)
+    
+    def test_ring_buffer_eviction(self):
+        """Test that the oldest readings are overwritten once full"""
+        sensor_data = SensorData(max_memory_readings=4)
+        for i in range(10):
+            sensor_data.add_reading({'temperature': float(i), 'ph': 7.0, 'glucose': 100})
+        
+        readings = sensor_data.get_all_readings()
+        self.assertEqual(len(readings), 4)
+        self.assertEqual([r.temperature for r in readings], [6.0, 7.0, 8.0, 9.0])
+        self.assertEqual(readings[-1].temperature, 9.0)
+        self.assertEqual(
+            list(sensor_data.get_columns(2)['temperature']), [8.0, 9.0]
+        )
+        self.assertEqual(
+            [r.temperature for r in sensor_data.get_readings_slice(1, 3)], [7.0, 8.0]
+        )
+    
+    def test_readings_are_lazy_snapshots(self):
+        """Test that views keep their contents after new inserts"""
+        timestamp = datetime(2024, 1, 1, 12, 0, 0, 500)
+        self.sensor_data.add_reading({'timestamp': timestamp, 'temperature': 36.5})
+        view = self.sensor_data.get_recent_readings(5)
+        self.sensor_data.add_reading({'temperature': 37.0})
+        
+        self.assertEqual(len(view), 1)
+        self.assertIsInstance(view[0], SensorReading)
+        self.assertEqual(view[0].timestamp, timestamp)
+    
+    def test_subscribers_receive_new_readings(self):
+        """Test that subscribers get only the readings just added"""
+        received = []
+        self.sensor_data.add_reading({'temperature': 35.0})
+        self.sensor_data.subscribe(received.append)
+        self.sensor_data.add_reading({'temperature': 36.0})
+        self.sensor_data.add_readings([{'temperature': 37.0}, {'temperature': 38.0}])
+        self.sensor_data.unsubscribe(received.append)
+        self.sensor_data.add_reading({'temperature': 39.0})
+        
+        self.assertEqual(
+            [[r.temperature for r in batch] for batch in received], [[36.0], [37.0, 38.0]]
+        )
+    
+    def test_latest(self):
+        """Test the newest reading is returned without a buffer copy"""
+        self.assertIsNone(self.sensor_data.latest())
+        sensor_data = SensorData(max_memory_readings=3)
+        for i in range(5):
+            sensor_data.add_reading({'timestamp': datetime(2024, 1, 1, 12, 0, i), 'glucose': 100 + i})
+        
+        latest = sensor_data.latest()
+        self.assertEqual(latest.glucose, 104.0)
+        self.assertEqual(latest.timestamp, datetime(2024, 1, 1, 12, 0, 4))
 
+    
+    def test_add_columns(self):
+        """Test a column-wise batch lands in the buffer, stats and subscribers"""
+        received = []
+        sensor_data = SensorData(max_memory_readings=4)
+        sensor_data.subscribe(received.append)
+        start = datetime(2024, 1, 1, 12).timestamp()
+        added = sensor_data.add_columns({
+            'timestamp': [start + i for i in range(6)],
+            'temperature': [30.0 + i for i in range(6)],
+            'ph': [7.0] * 6,
+            'glucose': [100.0] * 6
+        })
+        
+        self.assertEqual(added, 4)
+        self.assertEqual([r.temperature for r in sensor_data.readings], [32.0, 33.0, 34.0, 35.0])
+        self.assertEqual(sensor_data.get_statistics()['temperature']['min'], 32.0)
+        self.assertEqual(len(received), 1)
+        self.assertEqual(list(received[0].temperature), [32.0, 33.0, 34.0, 35.0])
+        self.assertEqual(sensor_data.add_columns({'timestamp': []}), 0)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,100 @@
+"""
+Unit tests for SensorInterface push mode with the mock bridge
+"""
+
+import time
+import unittest
+import tempfile
+import shutil
+from datetime import datetime
+from android_jni.mock_bridge import MockSensorBridge
+from android_jni.sensor_interface import SensorInterface
+from data_management.csv_handler import CSVHandler
+from data_management.ingest import IngestPipeline
+from data_management.sensor_data import SensorData
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestSensorInterface(unittest.TestCase):
+    """Test event-driven acquisition"""
+
+    def test_push_readings(self):
+        """Test every mock tag read reaches the listener with its own timestamp"""
+        interface = SensorInterface(bridge=MockSensorBridge(rate=200, seed=3))
+        received = []
+        self.assertTrue(interface.start_listening(received.append))
+        self.assertTrue(interface.connected)
+        self.assertTrue(wait_for(lambda: len(received) >= 20))
+        interface.disconnect()
+        interface.stop_listening()
+
+        count = len(received)
+        time.sleep(0.05)
+        self.assertEqual(len(received), count)
+        self.assertEqual(count, interface.bridge.events_emitted)
+        timestamps = [datetime.fromisoformat(r['timestamp']) for r in received]
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertTrue(all(80 <= r['glucose'] <= 120 for r in received))
+
+    def test_no_push_without_bridge(self):
+        """Test callers are told to fall back to polling"""
+        interface = SensorInterface()
+        self.assertIsNone(interface.bridge)
+        self.assertFalse(interface.start_listening(lambda reading: None))
+        self.assertIsNotNone(interface.read_sensor_data())
+
+    def test_push_into_ingest_pipeline(self):
+        """Test tag reads flow through the writer queue into memory and storage"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            sensor_data = SensorData()
+            handler = CSVHandler(temp_dir, flush_rows=10)
+            pipeline = IngestPipeline(sensor_data, handler, batch_size=10)
+            pipeline.start()
+            interface = SensorInterface(bridge=MockSensorBridge(rate=500, seed=4))
+            interface.start_listening(pipeline.submit)
+            self.assertTrue(wait_for(lambda: len(sensor_data) >= 50))
+            interface.disconnect()
+            interface.stop_listening()
+            pipeline.stop()
+
+            self.assertEqual(len(sensor_data), interface.bridge.events_emitted)
+            self.assertEqual(len(handler.load_all_readings()), len(sensor_data))
+            handler.close()
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+    def test_logged_tag_arrives_as_one_batch(self):
+        """Test a tag's sample log reaches the batch callback as columns"""
+        bridge = MockSensorBridge(rate=50, seed=5, log_size=30, log_interval=10)
+        interface = SensorInterface(bridge=bridge)
+        singles, batches = [], []
+        interface.start_listening(singles.append, batches.append)
+        self.assertTrue(wait_for(lambda: len(batches) >= 2))
+        interface.disconnect()
+        interface.stop_listening()
+
+        self.assertEqual(singles, [])
+        self.assertEqual(len(batches), bridge.events_emitted)
+        timestamps = list(batches[0]['timestamp'])
+        self.assertEqual(len(timestamps), 30)
+        self.assertTrue(all(abs(b - a - 10) < 1e-6 for a, b in zip(timestamps, timestamps[1:])))
+        self.assertTrue(all(80 <= g <= 120 for g in batches[0]['glucose']))
+
+        # Without a batch callback the readings are delivered one by one
+        interface = SensorInterface(bridge=MockSensorBridge(rate=50, seed=5, log_size=3))
+        interface.start_listening(singles.append)
+        self.assertTrue(wait_for(lambda: len(singles) >= 3))
+        interface.disconnect()
+        interface.stop_listening()
+        self.assertEqual(len(singles), interface.bridge.readings_emitted)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Unit tests for the simulated NFC bridge
+"""
+
+import itertools
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from android_jni.sensor_interface import SensorInterface
+from android_jni.simulator import SimulatorBridge, replay_history, synthetic_signal
+from data_management.csv_handler import CSVHandler
+
+
+class TestSimulator(unittest.TestCase):
+    """Test simulated sources and playback"""
+
+    def test_synthetic_signal_is_deterministic(self):
+        """Test a seed reproduces the signal, including gaps and late readings"""
+        options = dict(seed=7, start=1704067200.0, interval=1.0, spike_rate=0.05,
+                       gap_rate=0.01, gap_seconds=600, late_rate=0.05)
+        first = list(itertools.islice(synthetic_signal(**options), 2000))
+        second = list(itertools.islice(synthetic_signal(**options), 2000))
+        self.assertEqual(first, second)
+
+        timestamps = [row[0] for row in first]
+        steps = [b - a for a, b in zip(timestamps, timestamps[1:])]
+        self.assertTrue(any(step < 0 for step in steps))  # Out of order
+        self.assertTrue(any(step > 500 for step in steps))  # Gaps
+        self.assertTrue(any(row[3] > 150 or row[3] < 50 for row in first))  # Spikes
+
+    def test_replay_history(self):
+        """Test recorded CSV and binary files replay in order, optionally rebased"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for day, file_format in ((1, 'binary'), (2, 'csv')):
+                with CSVHandler(temp_dir, file_format=file_format) as handler:
+                    for hour in range(3):
+                        handler.save_sensor_reading({
+                            'timestamp': datetime(2024, 1, day, hour).isoformat(),
+                            'temperature': 36.0, 'ph': 7.0, 'glucose': 100 + hour
+                        })
+            rows = list(replay_history(temp_dir, rebase=False))
+            self.assertEqual(len(rows), 6)
+            self.assertEqual(rows[3], (datetime(2024, 1, 2, 0).timestamp(), 36.0, 7.0, 100.0))
+
+            rebased = list(replay_history(temp_dir, start=datetime(2024, 1, 2).timestamp()))
+            self.assertEqual(len(rebased), 3)
+            self.assertAlmostEqual(rebased[0][0], time.time(), delta=5)
+            self.assertEqual(rebased[2][0] - rebased[0][0], 7200)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_rate_limit(self):
+        """Test playback is paced to the configured rate"""
+        source = synthetic_signal(seed=1, start=0.0)
+        bridge = SimulatorBridge(source, rate=2000, limit=300)
+        received = []
+        bridge.set_listener(lambda epoch, values: received.append(epoch))
+        started = time.monotonic()
+        bridge.connect({})
+        self.assertTrue(bridge.finished.wait(5))
+        elapsed = time.monotonic() - started
+        bridge.disconnect()
+
+        self.assertEqual(len(received), 300)
+        self.assertGreaterEqual(elapsed, 0.14)
+
+    def test_plugs_into_sensor_interface(self):
+        """Test a configured simulator replaces the bridge and delivers batches"""
+        interface = SensorInterface(simulator={
+            'source': 'synthetic', 'seed': 3, 'start': 0.0,
+            'rate': None, 'batch_size': 50, 'limit': 1000
+        })
+        batches = []
+        self.assertTrue(interface.start_listening(lambda reading: None, batches.append))
+        self.assertTrue(interface.bridge.finished.wait(5))
+        interface.stop_listening()
+        interface.disconnect()
+
+        self.assertEqual(len(batches), 20)
+        self.assertEqual(sum(len(batch['timestamp']) for batch in batches), 1000)
+        self.assertEqual(batches[1]['timestamp'][0], 50.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
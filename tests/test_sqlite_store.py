@@ -0,0 +1,154 @@
+"""
+Unit tests for the SQLite storage backend
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+from datetime import date, datetime, timedelta
+from data_management import archive
+from data_management.csv_handler import CSVHandler
+from data_management.sqlite_store import SQLiteHandler
+
+
+class TestSQLiteHandler(unittest.TestCase):
+    """Test SQLiteHandler against CSVHandler holding the same readings"""
+
+    def setUp(self):
+        self.csv_dir = tempfile.mkdtemp()
+        self.db_dir = tempfile.mkdtemp()
+        self.csv = CSVHandler(self.csv_dir)
+        self.db = SQLiteHandler(self.db_dir, flush_rows=10)
+        readings = [self._reading(day, minute) for day in (1, 2, 4) for minute in range(0, 600, 7)]
+        readings.append(self._reading(1, 3))  # Late reading
+        for handler in (self.csv, self.db):
+            handler.save_sensor_readings(readings[:100])
+            for reading in readings[100:]:
+                handler.save_sensor_reading(reading)
+
+    def tearDown(self):
+        self.csv.close()
+        self.db.close()
+        shutil.rmtree(self.csv_dir)
+        shutil.rmtree(self.db_dir)
+
+    def _reading(self, day, minute):
+        return {
+            'timestamp': (datetime(2024, 1, day, 20) + timedelta(minutes=minute)).isoformat(),
+            'temperature': 36.0 + minute / 100,
+            'ph': 7.0 + day / 10,
+            'glucose': float(minute % 13)
+        }
+
+    def assertColumnsEqual(self, first, second):
+        self.assertEqual(list(first), list(second))
+        for name in first:
+            self.assertEqual(list(first[name]), list(second[name]))
+
+    def test_wal_and_index(self):
+        """Test the database runs in WAL mode and range queries use the timestamp index"""
+        conn = sqlite3.connect(self.db.db_path)
+        self.assertEqual(conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        plan = conn.execute('EXPLAIN QUERY PLAN SELECT * FROM readings WHERE timestamp >= 0 '
+                            'AND timestamp <= 1 ORDER BY timestamp, rowid').fetchall()
+        self.assertIn('readings_timestamp', ' '.join(str(row) for row in plan))
+        conn.close()
+
+    def test_matches_csv_handler(self):
+        """Test range, day and streaming reads return what CSVHandler returns"""
+        start, end = datetime(2024, 1, 2, 3), datetime(2024, 1, 5, 1)
+        self.assertColumnsEqual(self.db.load_range(), self.csv.load_range())
+        self.assertColumnsEqual(self.db.load_range(start, end, ['timestamp', 'ph']),
+                                self.csv.load_range(start, end, ['timestamp', 'ph']))
+        self.assertColumnsEqual(self.db.load_sensor_readings('2024-01-02', output='columns'),
+                                self.csv.load_sensor_readings('2024-01-02', output='columns'))
+        self.assertEqual(self.db.load_sensor_readings(date(2024, 1, 1)),
+                         self.csv.load_sensor_readings(date(2024, 1, 1)))
+        self.assertEqual(len(self.db.load_all_readings(output='readings')), 3 * 86 + 1)
+        self.assertEqual(list(self.db.iter_readings(start, end, output='tuple')),
+                         sorted(self.csv.iter_readings(start, end, output='tuple'), key=lambda r: r[0]))
+        chunks = list(self.db.iter_readings(fields=['glucose'], output='columns'))
+        self.assertEqual(sum(len(chunk['glucose']) for chunk in chunks), 3 * 86 + 1)
+        with self.assertRaises(ValueError):
+            self.db.load_range(fields=['humidity'])
+
+    @unittest.skipUnless(os.path.isdir('/proc/self/fd'), "needs /proc/self/fd")
+    def test_reads_from_short_lived_threads(self):
+        """Test reads from many short-lived threads don't leave connections open"""
+        expected = self.db.get_available_dates()
+        results = []
+        before = len(os.listdir('/proc/self/fd'))
+        for _ in range(20):
+            thread = threading.Thread(target=lambda: results.append(self.db.get_available_dates()))
+            thread.start()
+            thread.join()
+        self.assertEqual(results, [expected] * 20)
+        self.assertLessEqual(len(os.listdir('/proc/self/fd')), before)
+
+    def test_dates_and_statistics(self):
+        """Test indexed date listing and aggregate statistics"""
+        self.assertEqual(self.db.get_available_dates(), self.csv.get_available_dates())
+        expected = self.csv.get_statistics('2024-01-02', '2024-01-04')
+        stats = self.db.get_statistics('2024-01-02', date(2024, 1, 4))
+        self.assertEqual(stats['first_timestamp'], expected['first_timestamp'])
+        self.assertEqual(stats['last_timestamp'], expected['last_timestamp'])
+        for name in ('temperature', 'ph', 'glucose'):
+            for key in ('min', 'max', 'count', 'last'):
+                self.assertEqual(stats[name][key], expected[name][key])
+            self.assertAlmostEqual(stats[name]['avg'], expected[name]['avg'])
+            self.assertAlmostEqual(stats[name]['stddev'], expected[name]['stddev'])
+        self.assertEqual(self.db.get_statistics('2023-01-01', '2023-01-02'), {})
+
+    def test_persistence_and_import(self):
+        """Test readings survive reopening and daily files import once"""
+        self.db.close()
+        with SQLiteHandler(self.db_dir) as reopened:
+            self.assertEqual(len(reopened.load_range()['timestamp']), 3 * 86 + 1)
+
+        self.csv.flush()
+        with SQLiteHandler(tempfile.mkdtemp()) as imported:
+            try:
+                self.assertEqual(imported.import_daily_files(self.csv_dir), 3 * 86 + 1)
+                self.assertEqual(imported.import_daily_files(self.csv_dir), 0)
+                # Archived files replace the rows of their originals
+                results = self.csv.archive_closed_days(before=date(2024, 1, 3))
+                archived = sum(len(self.csv.load_sensor_readings(archive.file_day(result.target)))
+                               for result in results)
+                self.assertEqual(imported.import_daily_files(self.csv_dir), archived)
+                self.assertColumnsEqual(imported.load_range(), self.csv.load_range())
+                self.assertEqual(imported.load_rollup(datetime(2024, 1, 1), datetime(2024, 1, 5),
+                                                      tier='1h')['count'],
+                                 self.csv.load_rollup(datetime(2024, 1, 1), datetime(2024, 1, 5),
+                                                      tier='1h')['count'])
+            finally:
+                shutil.rmtree(imported.storage_path)
+
+    def test_import_keeps_saved_readings(self):
+        """Test imports skip readings already saved and only replace their own file's rows"""
+        self.csv.flush()
+        # The database already holds every reading in the daily files
+        self.assertEqual(self.db.import_daily_files(self.csv_dir), 0)
+
+        extra = self._reading(4, 601)
+        self.db.save_sensor_reading(self._reading(4, 602))
+        self.csv.save_sensor_reading(extra)
+        self.csv.flush()
+        self.assertEqual(self.db.import_daily_files(self.csv_dir), 1)
+        self.assertEqual(self.db.import_daily_files(self.csv_dir), 0)
+        self.assertEqual(len(self.db.load_range()['timestamp']), 3 * 86 + 3)
+
+        # A rewritten file with the same row count is detected by size and mtime
+        path = next(p for p in self.csv.storage_path.glob('sensor_data_*.csv')
+                    if p.read_text().count(extra['timestamp']))
+        path.write_text(path.read_text().replace(extra['timestamp'], extra['timestamp'][:-2] + '59'))
+        self.assertEqual(self.db.import_daily_files(self.csv_dir), 1)
+        timestamps = list(self.db.load_range(datetime(2024, 1, 5))['timestamp'])
+        self.assertEqual(len(self.db.load_range()['timestamp']), 3 * 86 + 3)
+        self.assertIn(datetime.fromisoformat(extra['timestamp'][:-2] + '59').timestamp(), timestamps)
+
+
+if __name__ == '__main__':
+    unittest.main()